@@ -543,6 +543,7 @@ class NodeShapes(QWidget):
         config.set("cytoscape", "BND_shape", self.cyTRANS)
         with open(copied_config, 'w') as configfile:
             config.write(configfile)
+        reloadConfig()
         QtWidgets.QMessageBox.question(self, 'Information', 'The settings of node shapes have been saved !',
         QtWidgets.QMessageBox.Ok)
 
@@ -653,6 +654,7 @@ class NodeShapes(QWidget):
         config.set("cytoscape", "BND_shape", self.cyTRANS)
         with open(copied_config, 'w') as configfile:
             config.write(configfile)
+        reloadConfig()
         QtWidgets.QMessageBox.question(self, 'Information', 'The settings of node shapes have been initialized !',
         QtWidgets.QMessageBox.Ok)
 
@@ -759,6 +761,7 @@ class GraphModify(QWidget):
             config.set("nodes", "geneNodeOverlapCntThreshold", self.geneNodeOverlapCntThreshold)
             with open(copied_config, 'w') as configfile:
                 config.write(configfile)
+            reloadConfig()
             QtWidgets.QMessageBox.question(self, 'Information', 'The settings of graph modification have been saved !',
             QtWidgets.QMessageBox.Ok)
 
@@ -797,6 +800,7 @@ class GraphModify(QWidget):
 
         with open(copied_config, 'w') as configfile:
             config.write(configfile)
+        reloadConfig()
         QtWidgets.QMessageBox.question(self, 'Information', 'The settings of graph modification have been initialized !',
         QtWidgets.QMessageBox.Ok)
 
@@ -817,6 +821,9 @@ class Main(QMainWindow):
         self.chr = None
         self.start = None
         self.end = None
+        self.bubble = None
+        self.bubbleWindow = None
+        self.bubbleFlank = 100
         self.shape = 'dot'
         self.enable = 'no'
         self.node = None
@@ -900,6 +907,9 @@ class Main(QMainWindow):
         #=================== plot panel ==================
         self.ui.plotGraph.clicked.connect(self.beginShowGraph)
         self.ui.clearGraphPlot.clicked.connect(self.plotClean)
+        QtWidgets.QShortcut(QtGui.QKeySequence('Ctrl+]'), self, self.nextBubble)
+        QtWidgets.QShortcut(QtGui.QKeySequence('Ctrl+['), self, self.prevBubble)
+        self.ui.plotGraph.setToolTip('Ctrl+] / Ctrl+[ : plot the next / previous SV')
 
         #=================== node panel ==================
         self.ui.addNode.clicked.connect(self.addNodes)
@@ -1030,10 +1040,10 @@ class Main(QMainWindow):
         self.ui.comboBoxSample.clear()
         self.ui.nodesComboBox.clear()
         if sys.platform == 'win32':
-            gfa = QFileDialog.getOpenFileName(self, 'Select graphical fragment assembly', '','gfa (*.gfa)')
+            gfa = QFileDialog.getOpenFileName(self, 'Select graphical fragment assembly', '','gfa (*.gfa *.gfa.gz)')
             self.gfa=codecs.decode(str(gfa)[1:-1].split(',')[0][1:-1],'unicode_escape')
         else:
-            self.gfa = QFileDialog.getOpenFileName(self, 'Select graphical fragment assembly', '','gfa (*.gfa)')[0]
+            self.gfa = QFileDialog.getOpenFileName(self, 'Select graphical fragment assembly', '','gfa (*.gfa *.gfa.gz)')[0]
         self.gfa = os.path.abspath(self.gfa)
 
         if checkFile(self.gfa) == -1:
@@ -1539,6 +1549,39 @@ class Main(QMainWindow):
                     self.workerShowGraph.signals.finished.connect(self.completePlot)
                     self.workerShowGraph.signals.progress.connect(self.showProgress)
 
+    def nextBubble(self): # plot the next SV site
+        self.gotoBubble(1)
+
+    def prevBubble(self): # plot the previous SV site
+        self.gotoBubble(-1)
+
+    def gotoBubble(self, step): # look up the SV site next to the last one, or to the Start/End Position, in the rGFA index
+        if self.run == None or not self.ui.plotGraph.isEnabled() or not self.ui.startPosition.isEnabled():
+            return
+        self.backbone = self.ui.comboBoxSample.currentText()
+        self.Chr()
+        if self.backbone in [None, ''] or self.chr in [None, '']:
+            return
+
+        window = (self.ui.startPosition.text(), self.ui.endPosition.text())
+        if self.bubble and window == self.bubbleWindow:
+            pos = self.bubble['start']
+        else:
+            text = window[0] if step > 0 else window[1] or window[0]
+            pos = int(text) if text.isdigit() else 0
+
+        bubble = self.run.nextBubble(self.run.backbone['name'], self.chr, pos, step)
+        if not bubble:
+            self.ui.plotStatusLabel.setStyleSheet('color: blue')
+            self.ui.plotStatusLabel.setText(f"No {'next' if step > 0 else 'previous'} SV on {self.chr}")
+            return
+
+        self.bubble = bubble
+        self.ui.startPosition.setText(str(max(1, bubble['start'] - self.bubbleFlank)))
+        self.ui.endPosition.setText(str(bubble['end'] + self.bubbleFlank))
+        self.bubbleWindow = (self.ui.startPosition.text(), self.ui.endPosition.text())
+        self.beginShowGraph()
+
     def beginShowGraphByNodeId(self): # compute and show the graph
         self.backbone = self.ui.comboBoxSample.currentText()
         if self.backbone == '' or self.backbone == None:
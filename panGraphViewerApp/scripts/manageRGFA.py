@@ -26,6 +26,11 @@ from bisect import bisect_left
 
 import threading
 
+try:
+    from scripts.rGFAParser import *
+except ModuleNotFoundError:
+    from rGFAParser import *
+
 #============================= Function =================================
 ##logging info
 DEBUG="" #change it when debugging
@@ -85,16 +90,14 @@ class ManageRGFA:
         gtf_list = {}
         vcf_list = {}
 
-        with open(gfa_file) as f:
+        parser = RGFAParser(self.field_delim)
+        with open(gfa_file, 'rb') as f:
             for line in f:
-                if line[0] != 'S':
+                if line[:1] != b'S':
                     continue
 
-                row = line.strip().split('\t')
-                nodeId = row[1]
-                seq = row[2]
-                tags = {val.split(':')[0]:val.split(':')[2] for val in row[3:]}
-                sample, chr = tags['SN'].split(self.field_delim)[0:2]
+                nodeId, seq, seqFieldLen, tags = parser.parseS(line)
+                sample, chr = parser.splitSN(tags)[0:2]
                 inf = tags['INF'] if 'INF' in tags else ''
                 node_type = inf.split(self.field_delim)[0]  # GENE / SV / REF
 
@@ -114,20 +117,18 @@ class ManageRGFA:
         nodeIdMap = {}
         sample_dict = {}
 
-        with open(gfa_file) as f:
+        parser = RGFAParser(self.field_delim, withSeq=True)
+        with open(gfa_file, 'rb') as f:
             for line in f:
-                if line[0] == 'S':
-                    row = line.strip().split('\t')
+                if line[:1] == b'S':
+                    nodeId, seq, seqFieldLen, tags = parser.parseS(line)
 
-                    nodeId = row[1]
                     if id_offset:
                         match = re.match(r'(\D+)(\d+)', nodeId)
                         if match:
                             nodeIdMap[nodeId] = f'{match.group(1)}{int(match.group(2))+id_offset}'
                             nodeId = nodeIdMap[nodeId]
 
-                    seq = row[2]
-                    tags = {val.split(':')[0]:val.split(':')[2] for val in row[3:]}
                     # set tags default value if not found
                     if 'LN' not in tags:
                         tags['LN'] = len(seq)
@@ -141,17 +142,19 @@ class ManageRGFA:
                     #rank = int(tags['SR'])
                     rank = int(tags['SR']) if 'SR' in tags else 0
                     tags['SR'] = rank
-                    if self.field_delim in tags['SN']:
-                        bb, chr = tags['SN'].split(self.field_delim)[0:2]
+                    sn = tags['SN'].split(self.field_delim)
+                    if len(sn) >= 2:
+                        bb, chr = sn[0:2]
                     else:
                         bb, chr = 'backbone', tags['SN']
 
                     sample = ''
                     sv_id = ''
-                    if rank != '0' and 'INF' in tags and len(tags['INF'].split('||')) >= 7:
+                    inf_fields = tags['INF'].split('||') if 'INF' in tags else []
+                    if rank != '0' and len(inf_fields) >= 7:
                         #sample = tags['INF'].split('||')[6].split('~')
-                        sv_id = tags['INF'].split('||')[6]
-                        sample_dict.update({s:1 for s in tags['INF'].split('||')[7].split('~')})
+                        sv_id = inf_fields[6]
+                        sample_dict.update({s:1 for s in inf_fields[7].split('~')})
 
                     start, end = int(tags['SO']), int(tags['SO'])+int(tags['LN'])-1
 
@@ -199,16 +202,15 @@ class ManageRGFA:
                     #if node_type == 'SV' and sample not in sample_dict:
                     #    sample_dict[sample] = 1
 
-                elif line[0] == 'L':
-                    row = line.strip().split('\t')
-                    fromNodeId, fromStrand, toNodeId, toStrand, cigar = row[1:6]
+                elif line[:1] == b'L':
+                    fromNodeId, fromStrand, toNodeId, toStrand, cigar, edgeTags = parser.parseL(line)
 
                     if id_offset:
                       fromNodeId = nodeIdMap[fromNodeId]
                       toNodeId = nodeIdMap[toNodeId]
 
                     tags = {'from_strand':fromStrand, 'to_strand':toStrand, 'cigar':cigar}
-                    tags.update({val.split(':')[0]:int(val.split(':')[2]) for val in row[6:]})
+                    tags.update({name:int(value) for name, value in edgeTags.items()})
 
                     #edges.append({'from':fromNodeId,'fromStrand':'+','to':toNodeId,'toStrand':'+','tag':tags})
                     edge_info = {'from':fromNodeId,'fromStrand':'+','to':toNodeId,'toStrand':'+','tag':tags}
@@ -1,5 +1,4 @@
 from argparse import ArgumentParser
-import networkx as nx
 import sys
 import math
 import logging
@@ -10,7 +9,7 @@ import os
 from pathlib import Path
 from configparser import ConfigParser
 
-from random import choice
+from random import choice, Random
 import json
 from natsort import natsorted, ns
 
@@ -19,7 +18,7 @@ from bokeh.resources import CDN
 from bokeh.plotting._tools import process_tools_arg
 from dna_features_viewer import GraphicFeature, GraphicRecord
 
-from shutil import copyfile
+from shutil import copyfile, rmtree
 
 import datetime
 from bisect import bisect_left
@@ -29,16 +28,38 @@ import subprocess
 import re
 
 import zipfile
+import itertools
+import hashlib
+from multiprocessing import Pool
+
+import numpy as np
 
 try:
     from scripts.gfa2rGFA import *
     from scripts.utilities import *
+    from scripts.rGFAIndex import *
+    from scripts.rGFAParser import *
+    from scripts.rGFAFile import *
+    from scripts.rGFAGraph import *
+    from scripts.rGFAPyramid import *
 except ModuleNotFoundError:
     try:
         from gfa2rGFA import *
         from utilities import *
+        from rGFAIndex import *
+        from rGFAParser import *
+        from rGFAFile import *
+        from rGFAGraph import *
+        from rGFAPyramid import *
     except ModuleNotFoundError:
         from pangraphviewer.utilities import *
+        from pangraphviewer.rGFAIndex import *
+        from pangraphviewer.rGFAParser import *
+        from pangraphviewer.rGFAFile import *
+        from pangraphviewer.rGFAGraph import *
+        from pangraphviewer.rGFAPyramid import *
+
+from array import array
 
 from enum import IntEnum
 class NODE(IntEnum):
@@ -55,6 +76,123 @@ class NODE(IntEnum):
     posStart = 9
     posEnd = 10
 
+# columnar store of the loaded nodes, with the same fields as NODE;
+# nodes[nodeId] gives a row view read and written through the NODE fields
+class NodeTable:
+    def __init__(self):
+        self.rows = {}
+        self.seqDesc, self.seqLastDesc = [], []
+        self.len, self.lenBefore, self.posStart, self.posEnd = array('q'), array('q'), array('q'), array('q')
+        self.rank = array('h')
+        self.sample, self.chr, self.svType, self.inf = array('i'), array('i'), array('i'), array('i')
+        self.sampleNames, self.chrNames, self.svTypeNames, self.infRaw = {}, {}, {}, []
+
+    def append(self, nodeId, seqDesc, seqLastDesc, seqLen, sample, contig, lenBefore, rank, inf):
+        self.rows[nodeId] = len(self.rows)
+        self.seqDesc.append(seqDesc)
+        self.seqLastDesc.append(seqLastDesc)
+        self.len.append(seqLen)
+        self.lenBefore.append(lenBefore)
+        self.posStart.append(-1)
+        self.posEnd.append(-1)
+        self.rank.append(int(rank) if rank != '' else -1)
+        self.sample.append(self.sampleNames.setdefault(sample, len(self.sampleNames)))
+        self.chr.append(self.chrNames.setdefault(contig, len(self.chrNames)))
+        self.svType.append(self.svTypeNames.setdefault(inf['sv_type'], len(self.svTypeNames)) if inf else -1)
+        self.inf.append(len(self.infRaw) if inf else -1)
+        if inf:
+            self.infRaw.append(inf['raw'])
+
+    # convert the appended columns to arrays
+    def finalize(self):
+        self.seqDesc, self.seqLastDesc = np.array(self.seqDesc, dtype=str), np.array(self.seqLastDesc, dtype=str)
+        self.len, self.lenBefore = np.array(self.len, dtype=np.int64), np.array(self.lenBefore, dtype=np.int64)
+        self.posStart, self.posEnd = np.array(self.posStart, dtype=np.int64), np.array(self.posEnd, dtype=np.int64)
+        self.rank = np.array(self.rank, dtype=np.int16)
+        self.sample, self.chr = np.array(self.sample, dtype=np.int32), np.array(self.chr, dtype=np.int32)
+        self.svType, self.inf = np.array(self.svType, dtype=np.int32), np.array(self.inf, dtype=np.int32)
+        self.sampleNames, self.chrNames, self.svTypeNames = list(self.sampleNames), list(self.chrNames), list(self.svTypeNames)
+
+        return self
+
+    # table of the given node IDs only
+    def take(self, nodeIds):
+        table = NodeTable()
+        idx = self.find(nodeIds)
+
+        table.rows = {nodeId:i for i, nodeId in enumerate(nodeIds)}
+        for col in ['seqDesc', 'seqLastDesc', 'len', 'lenBefore', 'posStart', 'posEnd', 'rank', 'sample', 'chr', 'svType', 'inf']:
+            setattr(table, col, getattr(self, col)[idx])
+        table.sampleNames, table.chrNames, table.svTypeNames, table.infRaw = self.sampleNames, self.chrNames, self.svTypeNames, self.infRaw
+
+        return table
+
+    # row indices of the given node IDs
+    def find(self, nodeIds):
+        return np.array([self.rows[nodeId] for nodeId in nodeIds], dtype=np.int64)
+
+    # code of a sample or contig name, -1 if not loaded
+    def sampleCode(self, sample):
+        return self.sampleNames.index(sample) if sample in self.sampleNames else -1
+
+    def chrCode(self, contig):
+        return self.chrNames.index(contig) if contig in self.chrNames else -1
+
+    def rankStr(self, idx):
+        rank = self.rank[idx]
+        return str(rank) if rank >= 0 else ''
+
+    def infDict(self, idx):
+        if self.inf[idx] < 0:
+            return {}
+
+        return {'sv_type':self.svTypeNames[self.svType[idx]], 'raw':self.infRaw[self.inf[idx]]}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, nodeId):
+        return nodeId in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def keys(self):
+        return self.rows.keys()
+
+    def __getitem__(self, nodeId):
+        return NodeRow(self, self.rows[nodeId])
+
+class NodeRow:
+    def __init__(self, table, idx):
+        self.table = table
+        self.idx = idx
+
+    def __getitem__(self, field):
+        table, idx = self.table, self.idx
+
+        if field == NODE.seqDesc: return str(table.seqDesc[idx])
+        if field == NODE.seqLastDesc: return str(table.seqLastDesc[idx])
+        if field == NODE.len: return int(table.len[idx])
+        if field == NODE.seq: return None
+        if field == NODE.sample: return table.sampleNames[table.sample[idx]]
+        if field == NODE.chr: return table.chrNames[table.chr[idx]]
+        if field == NODE.lenBefore: return int(table.lenBefore[idx])
+        if field == NODE.rank: return table.rankStr(idx)
+        if field == NODE.inf: return table.infDict(idx)
+        if field == NODE.posStart: return int(table.posStart[idx]) if table.posStart[idx] >= 0 else None
+        if field == NODE.posEnd: return int(table.posEnd[idx]) if table.posEnd[idx] >= 0 else None
+
+        raise IndexError(field)
+
+    def __setitem__(self, field, value):
+        if field == NODE.posStart:
+            self.table.posStart[self.idx] = value if value is not None else -1
+        elif field == NODE.posEnd:
+            self.table.posEnd[self.idx] = value if value is not None else -1
+        else:
+            raise IndexError(field)
+
 class EDGE(IntEnum):
     #type = 0
     fromNodeId = 0
@@ -78,6 +216,7 @@ class DrawGraphResult:
         output['plotErrorSignal'] = panGraph.plotErrorSignal
         output['emptyGraphSignal'] = panGraph.emptyGraphSignal
         output['overNodeLimitSignal'] = panGraph.overNodeLimitSignal
+        output['summarySignal'] = panGraph.summarySignal
         output['subNodesCount'] = len(panGraph.subNodes)
         output['outHtml'] = drawGraphResult['outHtml']
 
@@ -88,6 +227,7 @@ class DrawGraphResult:
         panGraph.plotErrorSignal = obj['plotErrorSignal']
         panGraph.emptyGraphSignal = obj['emptyGraphSignal']
         panGraph.overNodeLimitSignal = obj['overNodeLimitSignal']
+        panGraph.summarySignal = obj['summarySignal']
         panGraph.subNodesCount = obj['subNodesCount']
         panGraph.drawGraphResult = {'outHtml':obj['outHtml']}
 
@@ -98,9 +238,40 @@ class FormatException(Exception):
 
 class PanGraph:
     seqDescLen = 10
-    SN_delim = getVar(copied, 'nodes', 'SN_delim', mustHave=True)
-    maxNodesLimit = int(getVar(copied, 'nodes', 'maxNodesLimit', mustHave=True))
-    maxNodesDisplay = int(getVar(copied, "nodes", "maxNodesDisplay"))
+    SN_delim = ConfigVar('nodes', 'SN_delim', mustHave=True)
+    maxNodesLimit = ConfigVar('nodes', 'maxNodesLimit', int, mustHave=True)
+    maxNodesDisplay = ConfigVar('nodes', 'maxNodesDisplay', int)
+    maxNodesSummary = ConfigVar('nodes', 'maxNodesSummary', int, 0)
+    autoBuildIndex = ConfigVar('index', 'autoBuild', lambda value: value != 'No', True)
+    nthread = ConfigVar('parse', 'nthread', int, 1)
+    presetLayout = ConfigVar('canvas', 'presetLayout', lambda value: value == 'Yes', False)
+
+    # loaded contig graphs kept for other windows of the same contig, least recently used first,
+    # keyed by (gfa, fileStat, SN_delim, backbone, contig, sampleList)
+    graphCache = {}
+    graphCacheSize = 2
+    # False in one-shot processes (panGraph.py -a drawGraph), where a cached contig would never
+    # be used again and only the window is loaded, as by loadRGFA()
+    keepContigGraphs = True
+
+    # static files of the HTML templates, unpacked once per version of static.zip; hashes of
+    # the zip files keyed by (zipFile, size, mtime)
+    staticCacheDir = os.path.join(os.path.expanduser('~'), '.cache', 'panGraphViewer', 'static')
+    staticHashes = {}
+
+    # tiles of a backbone contig for viewers loading the graph piece by piece: tile k covers
+    # [k*tileSize+1, (k+1)*tileSize] and holds the nodes starting there (see updateNodes()), so
+    # that a tile is the same whatever region is viewed
+    tileSize = 100000
+
+    # spacing of the positions given by nodePositions()
+    layoutColumnWidth = 100
+    layoutLaneHeight = 60
+
+    # HTML templates split at their {%name%} placeholders, keyed by (template, mtime)
+    templateCache = {}
+    # lists are written into the graph data files this many items at a time
+    jsonBlockSize = 4096
 
     def __init__(self, gfa, outdir, parseRGFA=True, nodeIdDict=None):
         self.gfa = gfa
@@ -111,7 +282,7 @@ class PanGraph:
         except:
             pass
 
-        self.nodes = {}
+        self.nodes = NodeTable()
         self.edges = []
         self.inf = None
         self.nameCols = {}
@@ -119,11 +290,17 @@ class PanGraph:
         self.backbone = None
         self.nodesInfo = None
         self.G = None
+        self.index = None
+        self.pyramid = None
+        self.coordinatesLoaded = False
+        self.loadedNodes = None
+        self.positionIndex = {}
 
         self.illegalrGFA = 0
         self.plotErrorSignal = 0
         self.overNodeLimitSignal = 0
         self.emptyGraphSignal = 0
+        self.summarySignal = 0
         self.noOverlap = False
 
         self.error_unknown = 0
@@ -149,16 +326,46 @@ class PanGraph:
 
         return ret.stdout.strip().split('\n') if ret.stdout else ret.stdout
 
-    # assign color
-    def colorPalettes(self):
+    # sidecar index of the rGFA file, if present and up to date
+    def getIndex(self, build=False):
+        if not self.index:
+            try:
+                self.index = RGFAIndex.open(self.gfa, build=build, nthread=self.nthread)
+            except Exception as e:
+                logging.warning(f'rGFA index not used: {e}')
+                self.index = None
+
+        return self.index
+
+    def buildIndex(self):
+        self.index = RGFAIndex(self.gfa)
+        self.index.build(nthread=self.nthread)
+
+    # saved zoom levels of the rGFA file, False if there are none
+    def getPyramid(self):
+        if self.pyramid is None:
+            try:
+                self.pyramid = RGFAPyramid.open(self.gfa, self.SN_delim) or False
+            except Exception as e:
+                logging.warning(f'Zoom levels not used: {e}')
+                self.pyramid = False
+
+        return self.pyramid
+
+    def buildPyramid(self):
+        self.pyramid = RGFAPyramid(self.gfa)
+        self.pyramid.build(self.SN_delim, nthread=self.nthread)
+
+    # assign color; the same seed gives the same colors
+    def colorPalettes(self, seed=None):
         self.nameCols = {s:None for s in self.inf['samples']}
         self.num = len(self.nameCols)
         cols = [f'#{s}' for s in getVar(copied, 'nodes', 'colors').replace('\n','').split(',')]
-        #seed(1)
+        pick = Random(seed).choice if seed is not None else choice
         sequence = [i for i in range(len(cols))]
         self.cols = list()
         for _ in range(self.num):
-            select = choice(sequence)
+            select = pick(sequence)
             self.cols.append(cols[select])
 
         i = 0
@@ -172,74 +379,41 @@ class PanGraph:
         neededGFA = False
         #backbone = {'name':None, 'contigs':{}}
         backbone = {}
-        nodeIdDDlist = []
-
-        rawNodeData = {}
-        rawEdgeData = []
-        fileOffset = 0
 
-        with open(self.gfa) as f:
-            try:
-                for lineNum, line in enumerate(f):
-                    if line[0] == 'S':
-                        row = line.strip().split('\t')
-
-                        nodeId = row[1]
-
-                        if nodeIdDict and nodeId not in nodeIdDict:
-                            fileOffset += len(line)
-                            continue
-
-                        if lineNum <= self.maxNodeCount:
-                            nodeIdDDlist.append(nodeId)
-                        else:
-                            self.exceedNodeIdCount = True
-
-                        tags = {}
-                        for val in row[3:]:
-                            lst = val.split(':')
-                            tags[lst[0]] = lst[2]
-
-                        seqLen = int(tags['LN']) if 'LN' in tags else len(row[2])
-                        rank = tags['SR'] if 'SR' in tags else ''
-                        res = tags['SN'] if 'SN' in tags else ''
-                        if len(res.split(self.SN_delim)) >= 2:
-                            sample = res.split(self.SN_delim)[0]
-                            contig = self.SN_delim.join(res.split(self.SN_delim)[1:])
-                        else:
-                            #neededGFA = True
-                            #sample = rank
-                            #contig = res
-                            raise FormatException()
-                        lenBefore = int(tags['SO']) if 'SO' in tags else 0
-
-                        samples[sample] = 1
-                        if rank == '0':
-                            if sample not in backbone:
-                                backbone[sample] = {'name':'', 'contigs':{}}
-                            backbone[sample]['contigs'][contig] = 1
-                            backbone[sample]['name'] = sample
-
-                        # not needed (TBC)
-                        #rawNodeData[nodeId] = [fileOffset, len(line), rank, contig, lenBefore, seqLen]
-                    elif line[0] == 'L':
-                        row = line.split()
-                        fromNodeId, fromNodeStrand, toNodeId, toNodeStrand = row[1:5]
-
-                        if nodeIdDict and (fromNodeId not in nodeIdDict or toNodeId not in nodeIdDict):
-                            continue
-
-                        # not needed (TBC)
-                        #str = f'{fromNodeId}|{fromNodeStrand}|{toNodeId}|{toNodeStrand}'
-                        #rawEdgeData.append(str)
-
-                    fileOffset += len(line)
-            except FormatException as e:
-                neededGFA = 1
-            except Exception as e:
-                logging.error(f'!!!!! Parsing aborted: invalid format at line: {lineNum}')
-                neededGFA = -1
-                print(e)
+        index = self.getIndex(build=self.autoBuildIndex)
+        if index:
+            samples, backbone, neededGFA, rawNodeData, rawEdgeData = self.parseRGFAIndex(index, nodeIdDict)
+        else:
+            # large files are cut into byte ranges parsed in a process pool
+            ranges = RGFAParser.splitRanges(self.gfa, self.nthread)
+            if len(ranges) > 1:
+                logging.info(f'Parsing {len(ranges)} ranges of the rGFA file in parallel')
+                with Pool(len(ranges)) as pool:
+                    parts = pool.starmap(PanGraph.parseRGFARange, [(self.gfa, self.SN_delim, nodeIdDict, start, end) for start, end in ranges])
+            else:
+                parts = [self.parseRGFARange(self.gfa, self.SN_delim, nodeIdDict)]
+
+            # merged in file order as parseRGFARange() would have read the whole file: the nodes
+            # stop at the part with the first invalid S line, the edges at the part that aborted
+            nodeParts = []
+            rawEdgeData = RawEdgeData()
+            for partSamples, partBackbone, partNeededGFA, partNodeData, partEdgeData in parts:
+                if not neededGFA:
+                    samples.update(partSamples)
+                    for sample in partBackbone:
+                        if sample not in backbone:
+                            backbone[sample] = {'name':sample, 'contigs':{}}
+                        backbone[sample]['contigs'].update(partBackbone[sample]['contigs'])
+                    nodeParts.append(partNodeData)
+                rawEdgeData.extend(partEdgeData)
+
+                if partNeededGFA and neededGFA != -1:
+                    neededGFA = partNeededGFA
+                if neededGFA == -1:
+                    break
+
+            rawNodeData = RawNodeData.concat(nodeParts)
+            rawEdgeData.finalize(rawNodeData)
 
         if neededGFA == 1:
             if self.illegalrGFA == 0:
@@ -255,18 +429,119 @@ class PanGraph:
         #nodeIdDDlist = natsorted(nodeIdDDlist)
         if len(rawNodeData) > self.maxNodeCount:
             self.exceedNodeIdCount = True
-        nodeIdDDlist = natsorted(list(rawNodeData.keys())[:self.maxNodeCount])
+        nodeIdDDlist = natsorted(rawNodeData.nodeId[:self.maxNodeCount].astype(str).tolist())
 
         self.rawNodeData = rawNodeData
         self.rawEdgeData = rawEdgeData
 
         return {'NodeID':nodeIdDDlist,'samples':samples,'neededGFA':neededGFA,'backbone':backbone}
 
+    # samples, backbone, neededGFA and the node/edge data (edges not finalized) of the
+    # lines in [start, end) of an rGFA file, for parseRGFA(); S lines after the first one
+    # without sample and contig in SN are dropped, the L lines are still read so that the
+    # edges are the same as those parseRGFAIndex() takes from the index
+    @staticmethod
+    def parseRGFARange(gfa, SN_delim, nodeIdDict=None, start=0, end=None):
+        samples = {}
+        neededGFA = False
+        backbone = {}
+
+        rawNodeData = RawNodeData()
+        rawEdgeData = RawEdgeData()
+
+        parser = RGFAParser(SN_delim, withEdgeTags=False)
+        lineOffset = start
+        try:
+            for lineNum, lineOffset, lineLen, lineType, fields in parser.scan(gfa, start, end):
+                if lineType == 'S':
+                    nodeId, seq, seqFieldLen, tags = fields
+
+                    if neededGFA or (nodeIdDict and nodeId not in nodeIdDict):
+                        continue
+
+                    seqLen = int(tags['LN']) if 'LN' in tags else seqFieldLen
+                    rank = tags['SR'] if 'SR' in tags else ''
+                    sn = parser.splitSN(tags)
+                    if len(sn) >= 2:
+                        sample = sn[0]
+                        contig = SN_delim.join(sn[1:])
+                    else:
+                        #neededGFA = True
+                        #sample = rank
+                        #contig = res
+                        neededGFA = 1
+                        continue
+                    lenBefore = int(tags['SO']) if 'SO' in tags else 0
+
+                    samples[sample] = 1
+                    if rank == '0':
+                        if sample not in backbone:
+                            backbone[sample] = {'name':'', 'contigs':{}}
+                        backbone[sample]['contigs'][contig] = 1
+                        backbone[sample]['name'] = sample
+
+                    rawNodeData.append(nodeId, lineOffset, lineLen, rank, sample, contig, lenBefore, seqLen)
+                elif lineType == 'L':
+                    fromNodeId, fromNodeStrand, toNodeId, toNodeStrand, overlap, tags = fields
+
+                    if nodeIdDict and (fromNodeId not in nodeIdDict or toNodeId not in nodeIdDict):
+                        continue
+
+                    rawEdgeData.append(fromNodeId, fromNodeStrand, toNodeId, toNodeStrand)
+        except Exception as e:
+            logging.error(f'!!!!! Parsing aborted: invalid format at byte offset: {lineOffset}: {e}')
+            neededGFA = -1
+
+        return samples, backbone, neededGFA, rawNodeData.finalize(), rawEdgeData
+
+    # same as parseRGFA(), but from the sidecar index
+    def parseRGFAIndex(self, index, nodeIdDict):
+        samples = {}
+        neededGFA = False
+        backbone = {}
+
+        data = index.data
+        if nodeIdDict:
+            nodeIdx = np.sort(index.findNodes(list(nodeIdDict.keys())))
+            nodeIdx = nodeIdx[nodeIdx >= 0]
+        else:
+            nodeIdx = np.arange(len(index))
+
+        if len(nodeIdx) > self.maxNodeCount:
+            self.exceedNodeIdCount = True
+
+        snList = [res.split(self.SN_delim) for res in index.meta['SN']]
+
+        # stop at the first node without sample and contig in SN
+        snValid = np.array([len(lst) >= 2 for lst in snList], dtype=bool)
+        invalid = np.flatnonzero(~snValid[data['sn'][nodeIdx]])
+        if len(invalid):
+            nodeIdx = nodeIdx[:invalid[0]]
+            neededGFA = 1
+
+        # SN values in the order of first appearance
+        sn = data['sn'][nodeIdx]
+        codes, first = np.unique(sn, return_index=True)
+        for code in codes[np.argsort(first)]:
+            samples[snList[code][0]] = 1
+
+        codes, first = np.unique(sn[data['rank'][nodeIdx] == 0], return_index=True)
+        for code in codes[np.argsort(first)]:
+            sample, contig = snList[code][0], self.SN_delim.join(snList[code][1:])
+            if sample not in backbone:
+                backbone[sample] = {'name':sample, 'contigs':{}}
+            backbone[sample]['contigs'][contig] = 1
+
+        rawNodeData = RawNodeData.fromIndex(index, nodeIdx, [lst[0] for lst in snList], [self.SN_delim.join(lst[1:]) for lst in snList])
+        rawEdgeData = RawEdgeData.fromIndex(index, nodeIdx, rawNodeData)
+
+        return samples, backbone, neededGFA, rawNodeData, rawEdgeData
+
     def buildGraph(self, targetChr, targetStart=None, targetEnd=None, sampleList=None, nodeIdDict=None):
-        G = nx.DiGraph()
+        nodeIds, edgeFrom, edgeTo, edgeStrand = [], [], [], []
         count = 0
         rawNodeData = self.rawNodeData
-        rawEdgaData = self.rawEdgeData
+        rawEdgeData = self.rawEdgeData
 
         #backbone = {'name':None, 'contigs':{}, 'nodes':{}}
         backbone = {}
@@ -275,23 +550,15 @@ class PanGraph:
             if nodeIdDict and nodeId not in nodeIdDict:
                 continue
 
-            field = rawNodeData[nodeId]
-            rank, contig, lenBefore, seqLen = field[RAWNODEDATA.rank], field[RAWNODEDATA.contig], field[RAWNODEDATA.lenBefore], field[RAWNODEDATA.seqLen]
-
-            if rank == '0':
-                count += 1
-                #if contig != targetChr or \
-                #   (targetStart and targetStart > lenBefore + seqLen) or \
-                #   (targetEnd and targetEnd < lenBefore+1): continue
-
-            G.add_node(nodeId)
+            nodeIds.append(nodeId)
+        rows = {nodeId:idx for idx, nodeId in enumerate(nodeIds)}
 
-        backbone['nodes'] = [nodeId for nodeId in rawNodeData if rawNodeData[nodeId][RAWNODEDATA.rank] == '0']
+        backboneIdx = np.flatnonzero(rawNodeData.rank == 0)
+        backbone['name'] = rawNodeData.sampleNames[rawNodeData.sample[backboneIdx[0]]] if len(backboneIdx) else None
+        backbone['nodes'] = {nodeId:1 for nodeId in rawNodeData.nodeId[backboneIdx].astype(str).tolist()}
 
-        for edge in self.rawEdgeData:
-            fromNodeId, fromStrand, toNodeId, toStrand = edge.split('|')
-
-            if fromNodeId not in G.nodes or toNodeId not in G.nodes:
+        for fromNodeId, fromStrand, toNodeId, toStrand in rawEdgeData:
+            if fromNodeId not in rows or toNodeId not in rows:
                  continue
 
             if (fromStrand == '-' and toStrand == '+' and fromNodeId in backbone['nodes']) or \
@@ -314,7 +581,11 @@ class PanGraph:
                     G.add_node(toNodeId)
             """
 
-            G.add_edge(fromNodeId, toNodeId, strands=f'{fromStrand}{toStrand}')
+            edgeFrom.append(rows[fromNodeId])
+            edgeTo.append(rows[toNodeId])
+            edgeStrand.append((fromStrand == '-') | (toStrand == '-') << 1)
+
+        G = CSRGraph(nodeIds, edgeFrom, edgeTo, edgeStrand)
 
         #self.firstNodeId = {}
         #self.firstNodeId[targetChr] = min([id for id in G.nodes if '*' not in id and rawNodeData[id][RAWNODEDATA.rank] == '0'],
@@ -322,46 +593,36 @@ class PanGraph:
 
         #G = G.subgraph(list(nx.node_connected_component(G.to_undirected(), self.firstNodeId[targetChr])))
 
-        self.nodes = {}
-        with open(self.gfa, 'rb') as f:
-            for nodeId in G.nodes:
-
-                rawNodeId = nodeId if nodeId[-1] != '*' else nodeId[:-1]
-
-                node = rawNodeData[rawNodeId]
-                fileOffset, lineLen = node[0], node[1]
-                f.seek(node[RAWNODEDATA.fileOffset])
-                line = f.read(node[RAWNODEDATA.lineLen])
-                row = line.decode('ascii').split()
+        self.nodes = NodeTable()
+        nodeIdx = rawNodeData.find([nodeId if nodeId[-1] != '*' else nodeId[:-1] for nodeId in G.nodeIds])
+        positions = zip(rawNodeData.fileOffset[nodeIdx].tolist(), rawNodeData.lineLen[nodeIdx].tolist())
+        SN_delim = self.SN_delim
+        parser = RGFAParser(SN_delim)
+        with openRGFA(self.gfa) as f:
+            for line in readLinesAt(f, positions):
+                nodeId, seq, seqFieldLen, tags = parser.parseS(line)
                 #node[RAWNODEDATA.seq] = field[2]
 
-                # to-be-refined
-                seq = row[2]
-                tags = {}
-                for val in row[3:]:
-                    lst = val.split(':')
-                    tags[lst[0]] = lst[2]
-
-                seqLen = int(tags['LN']) if 'LN' in tags else len(seq)
-                seqDesc = seq[0:self.seqDescLen]
-                seqLastDesc = seq[-self.seqDescLen:]
+                seqLen = int(tags['LN']) if 'LN' in tags else seqFieldLen
+                seqDesc, seqLastDesc = parser.seqEnds(line, self.seqDescLen)
                 rank = tags['SR'] if 'SR' in tags else ''
-                res = tags['SN'] if 'SN' in tags else ''
-                if len(res.split(self.SN_delim)) == 2:
-                    sample = res.split(self.SN_delim)[0]
-                    contig = res.split(self.SN_delim)[1]
+                sn = parser.splitSN(tags)
+                if len(sn) == 2:
+                    sample, contig = sn
                 else:
                     sample = tags['SR'] if 'SR' in tags else ''
-                    contig = res
+                    contig = tags['SN'] if 'SN' in tags else ''
                 lenBefore = int(tags['SO']) if 'SO' in tags else 0
-                inf = {'sv_type':tags['INF'].split(self.SN_delim)[0],'raw':tags['INF']} if 'INF' in tags else {}
+                inf = {'sv_type':tags['INF'].split(SN_delim)[0],'raw':tags['INF']} if 'INF' in tags else {}
                 if inf and inf['sv_type'] == 'SV':
-                    inf['sv_type'] = tags['INF'].split(self.SN_delim)[1]
+                    inf['sv_type'] = tags['INF'].split(SN_delim)[1]
 
-                seq = None
-                self.nodes[nodeId] = [seqDesc, seqLastDesc, seqLen, seq, sample, contig, lenBefore, rank, inf, None, None]
+                self.nodes.append(nodeId, seqDesc, seqLastDesc, seqLen, sample, contig, lenBefore, rank, inf)
 
+        self.nodes.finalize()
         self.G = G
+        self.backbone = backbone
+        self.loadedNodes, self.positionIndex = None, {}
 
     def parseVCF(self, vcf, backbone):
         samples = {}
@@ -403,9 +664,10 @@ class PanGraph:
 
     # load nodes and edges
     def loadRGFA(self, targetBb, targetChr=None, targetStart=None, targetEnd=None, sampleList=None, nodeIdList=None):
-        G = nx.DiGraph()
-        self.nodes = {}
-        edges = []
+        self.nodes = NodeTable()
+        nodeIds, rows = [], {}
+        edgeFrom, edgeTo, edgeStrand, edgeTags = [], [], [], []
+        unionFind = UnionFind()
         firstNodeId, firstLenBefore = {}, {}
 
         # data same as parseRGFA
@@ -417,47 +679,41 @@ class PanGraph:
         nodeFileInfo = {}
 
         # find target node
-        with open(self.gfa) as f:
+        index = self.getIndex()
+        if index:
+            G, samples, backbone, firstNodeId = self.loadGraphFromIndex(index, targetBb, targetChr, targetStart, targetEnd, sampleList, nodeIdList)
+        else:
+            SN_delim = self.SN_delim
+            parser = RGFAParser(SN_delim)
+            lineNum = 0
             try:
-                for lineNum, line in enumerate(f):
-                    if line[0] == 'S':
-                        row = line.strip().split('\t')
-
-                        nodeId = row[1]
+                for lineNum, lineOffset, lineLen, lineType, fields in parser.scan(self.gfa):
+                    if lineType == 'S':
+                        nodeId, seq, seqFieldLen, tags = fields
 
                         if nodeIdList and nodeId not in nodeIdList:
                             continue
 
-                        seq = row[2]
-
-                        # get tag values
-                        tags = {}
-                        for val in row[3:]:
-                            lst = val.split(':')
-                            tags[lst[0]] = lst[2]
-
-                        seqLen = int(tags['LN']) if 'LN' in tags else len(seq)
+                        seqLen = int(tags['LN']) if 'LN' in tags else seqFieldLen
                         #seqDesc = seq[0:self.seqDescLen]
                         #seqLastDesc = seq[-self.seqDescLen:]
                         rank = tags['SR'] if 'SR' in tags else ''
                         res = tags['SN'] if 'SN' in tags else ''
 
                         """
-                        if len(res.split(self.SN_delim)) == 2:
-                            sample = res.split(self.SN_delim)[0]
-                            contig = res.split(self.SN_delim)[1]
+                        if len(res.split(SN_delim)) == 2:
+                            sample = res.split(SN_delim)[0]
+                            contig = res.split(SN_delim)[1]
                         else:
                             sample = tags['SR'] if 'SR' in tags else ''
                             contig = res
                         """
-                        if len(res.split(self.SN_delim)) >= 2:
-                            if 'SR' in tags:
-                                sample = res.split(self.SN_delim)[0] if tags['SR'] == '0' else 'Samples'
-                            else:
-                                sample = res.split(self.SN_delim)[0]
-                            contig = res.split(self.SN_delim)[1]
+                        sn = res.split(SN_delim)
+                        if len(sn) >= 2:
+                            sample = sn[0] if rank in ['0', ''] else 'Samples'
+                            contig = sn[1]
                         else:
-                            sample = res.split(self.SN_delim)[0]
+                            sample = sn[0]
                             contig = res
 
                         lenBefore = int(tags['SO']) if 'SO' in tags else 0
@@ -487,13 +743,16 @@ class PanGraph:
                             backbone['nodes'][nodeId] = 1
 
                         samples[sample] = 1
-                        G.add_node(nodeId)
-                    elif line[0] == 'L':
-                        row = line.strip().split('\t')
-                        fromNodeId, fromStrand, toNodeId, toStrand = row[1:5]
-                        tags = {val.split(':')[0]:val.split(':')[2] for val in row[6:]}
+                        if nodeId not in rows:
+                            rows[nodeId] = unionFind.add()
+                            nodeIds.append(nodeId)
 
-                        if fromNodeId not in G.nodes or toNodeId not in G.nodes:
+                        # record S line position for loading node detail
+                        nodeFileInfo[nodeId] = (lineOffset, lineLen)
+                    elif lineType == 'L':
+                        fromNodeId, fromStrand, toNodeId, toStrand, overlap, tags = fields
+
+                        if fromNodeId not in rows or toNodeId not in rows:
                             continue
 
                         if (fromStrand == '-' and toStrand == '+' and fromNodeId in backbone['nodes']) or \
@@ -516,20 +775,22 @@ class PanGraph:
                                     G.add_node(toNodeId)
                         """
 
-                        G.add_edge(fromNodeId, toNodeId, strands=f'{fromStrand}{toStrand}', tags=tags)
+                        edgeFrom.append(rows[fromNodeId])
+                        edgeTo.append(rows[toNodeId])
+                        edgeStrand.append((fromStrand == '-') | (toStrand == '-') << 1)
+                        edgeTags.append(tags)
+                        unionFind.union(rows[fromNodeId], rows[toNodeId])
 
             except Exception as e:
-                logging.error(f'!!!!! Loading aborted: invalid format at line: {lineNum}: {line}')
+                logging.error(f'!!!!! Loading aborted: invalid format at line: {lineNum+1}')
                 neededGFA = -1
                 raise
                 #print(e)
 
-        H = G.to_undirected()
-        subNodes = {}
-        for nodeId in nx.node_connected_component(H, firstNodeId[targetChr]):
-            subNodes[nodeId] = 1
+            G = CSRGraph(nodeIds, edgeFrom, edgeTo, edgeStrand, edgeTags, labels=unionFind.labels())
 
-        self.G = G.subgraph(list(subNodes.keys()))
+        self.G = G.componentGraph(G.rows[firstNodeId[targetChr]])
+        subNodes = {nodeId:1 for nodeId in self.G.nodeIds}
         self.firstNodeId = firstNodeId
 
         backbone['contigs'] = list(backbone['contigs'].keys())
@@ -549,117 +810,269 @@ class PanGraph:
                     self.illegalrGFA == 0
 
         # load node detail ONLY
-        with open(self.gfa) as f:
-            try:
-                for lineNum, line in enumerate(f):
-                    if line[0] == 'S':
-                        row = line.strip().split('\t')
+        self.coordinatesLoaded = False
+        self.loadedNodes, self.positionIndex = None, {}
+        if index:
+            self.loadNodeDetailFromIndex(index, subNodes)
+        else:
+            # only read the S lines of nodes in the connected component
+            rawSubNodes = {nodeId[:-1] if nodeId[-1] == '*' else nodeId:1 for nodeId in subNodes}
+            positions = [nodeFileInfo[nodeId] for nodeId in rawSubNodes if nodeId in nodeFileInfo]
+
+            parser = RGFAParser(SN_delim)
+            with openRGFA(self.gfa) as f:
+                try:
+                    for lineNum, line in enumerate(readLinesAt(f, positions)):
+                        if line[:1] == b'S':
+                            nodeId, seq, seqFieldLen, tags = parser.parseS(line)
+
+                            if nodeId not in subNodes and f'{nodeId}*' not in subNodes: continue
+
+                            seqLen = int(tags['LN']) if 'LN' in tags else seqFieldLen
+                            seqDesc, seqLastDesc = parser.seqEnds(line, self.seqDescLen)
+                            rank = tags['SR'] if 'SR' in tags else ''
+                            res = tags['SN'] if 'SN' in tags else ''
+
+                            """
+                            if len(res.split(SN_delim)) == 2:
+                                sample = res.split(SN_delim)[0]
+                                contig = res.split(SN_delim)[1]
+                            else:
+                                sample = tags['SR'] if 'SR' in tags else ''
+                                contig = res
+                            """
+                            sn = res.split(SN_delim)
+                            if len(sn) >= 2:
+                                sample = sn[0] if rank in ['0', ''] else 'Samples'
+                                contig = sn[1]
+                            else:
+                                sample = sn[0]
+                                contig = res
+
+                            lenBefore = int(tags['SO']) if 'SO' in tags else 0
+                            inf = {'sv_type':tags['INF'].split(SN_delim)[0],'raw':tags['INF']} if 'INF' in tags else {}
+                            if inf and inf['sv_type'] == 'SV':
+                                inf['sv_type'] = tags['INF'].split(SN_delim)[1]
+
+                            if nodeId in subNodes:
+                                self.nodes.append(nodeId,seqDesc,seqLastDesc,seqLen,sample,contig,lenBefore,rank,inf)
+                            if f'{nodeId}*' in subNodes:
+                                self.nodes.append(f'{nodeId}*',self.revComp(seqLastDesc),self.revComp(seqDesc),seqLen,sample,contig,lenBefore,rank,inf)
+                except Exception as e:
+                    logging.error(f'!!!!! Loading aborted: invalid format at line: {lineNum}: {line}')
+                    neededGFA = -1
+                    raise
+                    #print(e)
+
+        self.nodes.finalize()
+
+        # coordinates worked out over the whole file when the index was built, the same
+        # whichever region is drawn
+        if index:
+            nodeIdx = index.findNodes([nodeId[:-1] if nodeId[-1] == '*' else nodeId for nodeId in self.nodes.rows])
+            self.nodes.posStart, self.nodes.posEnd = index.data['posStart'][nodeIdx], index.data['posEnd'][nodeIdx]
+            self.coordinatesLoaded = True
+
+    # same as the first pass of loadRGFA(), but from the sidecar index
+    def loadGraphFromIndex(self, index, targetBb, targetChr=None, targetStart=None, targetEnd=None, sampleList=None, nodeIdList=None):
+        samples = {}
+        backbone = {'name':None, 'contigs':{}, 'nodes':{}}
+        firstNodeId = {}
+
+        data = index.data
+        rank, sn, lenBefore, seqLen = data['rank'], data['sn'], data['lenBefore'], data['seqLen']
+
+        # sample and contig of each SN value; non-backbone nodes with SR are grouped as 'Samples'
+        snList = [res.split(self.SN_delim) for res in index.meta['SN']]
+        sampleNames, contigNames = [], {}
+        snContig = []
+        for lst in snList:
+            sampleNames += [lst[0], 'Samples' if len(lst) >= 2 else lst[0]]
+            contig = lst[1] if len(lst) >= 2 else self.SN_delim.join(lst)
+            snContig.append(contigNames.setdefault(contig, len(contigNames)))
+        contigNames = list(contigNames.keys())
+        snContig = np.array(snContig, dtype=np.int32)
+
+        # candidate nodes: the given node IDs, or nodes of the target chr overlapping the target region
+        if nodeIdList:
+            nodeIdx = index.findNodes(list(nodeIdList))
+            nodeIdx = np.unique(nodeIdx[nodeIdx >= 0])
+        elif targetChr:
+            snCodes = np.flatnonzero((np.array(contigNames, dtype=object) == targetChr)[snContig])
+            nodeIdx = index.findNodesInRange(snCodes, targetStart, targetEnd)
+        else:
+            nodeIdx = np.arange(len(index))
+
+        isBackbone = rank[nodeIdx] == 0
+        sampleKey = sn[nodeIdx].astype(np.int64) * 2 + (rank[nodeIdx] > 0)
+
+        # check backbone and sample name
+        backboneOK = np.array([sample == targetBb for sample in sampleNames], dtype=bool)
+        sampleOK = np.array([not sampleList or sample in sampleList for sample in sampleNames], dtype=bool)
+        keep = np.where(isBackbone, backboneOK[sampleKey], sampleOK[sampleKey])
+
+        # check chr and pos
+        if targetChr:
+            keep &= (np.array(contigNames, dtype=object) == targetChr)[snContig][sn[nodeIdx]]
+        if targetStart:
+            keep &= targetStart <= lenBefore[nodeIdx] + seqLen[nodeIdx]
+        if targetEnd:
+            keep &= targetEnd >= lenBefore[nodeIdx] + 1
+
+        nodeIdx, isBackbone, sampleKey = nodeIdx[keep], isBackbone[keep], sampleKey[keep]
+        nodeIds = data['nodeId'][nodeIdx].astype(str).tolist()
+
+        keys, first = np.unique(sampleKey, return_index=True)
+        for key in keys[np.argsort(first)]:
+            samples[sampleNames[key]] = 1
+
+        # update backbone info
+        backboneIdx = np.flatnonzero(isBackbone)
+        contigs, first = np.unique(snContig[sn[nodeIdx[backboneIdx]]], return_index=True)
+        for contig in contigs[np.argsort(first)]:
+            contigIdx = backboneIdx[snContig[sn[nodeIdx[backboneIdx]]] == contig]
+            backbone['contigs'][contigNames[contig]] = 1
+            firstNodeId[contigNames[contig]] = nodeIds[contigIdx[np.argmin(lenBefore[nodeIdx[contigIdx]])]]
+        if len(backboneIdx):
+            backbone['name'] = targetBb
+        backbone['nodes'] = {nodeIds[i]:1 for i in backboneIdx}
+
+        # only nodes in the same component of the whole file as the first backbone node can
+        # be in its component here
+        if targetChr in firstNodeId:
+            firstIdx = index.findNodes([firstNodeId[targetChr]])[0]
+            keep = data['component'][nodeIdx] == data['component'][firstIdx]
+            nodeIdx, isBackbone = nodeIdx[keep], isBackbone[keep]
+            nodeIds = [nodeIds[i] for i in np.flatnonzero(keep)]
+
+        edgeFrom, edgeTo, edgeStrand = data['edgeFrom'], data['edgeTo'], data['edgeStrand']
+        edgeIdx = index.findEdgesWithin(nodeIdx)
+        fromIdx, toIdx, strand = edgeFrom[edgeIdx], edgeTo[edgeIdx], edgeStrand[edgeIdx]
+        fromRev, toRev = (strand & 1) > 0, (strand & 2) > 0
+        fromPos, toPos = np.searchsorted(nodeIdx, fromIdx), np.searchsorted(nodeIdx, toIdx)
+
+        # same orientation rules as in loadRGFA()
+        swap = (fromRev & ~toRev & isBackbone[fromPos]) | (toRev & ~fromRev & isBackbone[toPos]) | (fromRev & toRev)
+        fromPos, toPos = np.where(swap, toPos, fromPos), np.where(swap, fromPos, toPos)
+
+        # '--' edges were swapped to '++'; tags are only read for the edges shown
+        strand = np.where(strand == 3, 0, strand)
+        G = CSRGraph(nodeIds, fromPos, toPos, strand, lambda i: index.edgeTags(edgeIdx[i]))
+
+        return G, samples, backbone, firstNodeId
+
+    # same as the second pass of loadRGFA(), but only reading the needed S lines
+    def loadNodeDetailFromIndex(self, index, subNodes):
+        rawNodeIds = {nodeId[:-1] if nodeId[-1] == '*' else nodeId:1 for nodeId in subNodes}
+        nodeIdx = index.findNodes(list(rawNodeIds.keys()))
+        nodeIdx = np.sort(nodeIdx[nodeIdx >= 0])
+
+        with openRGFA(self.gfa) as f:
+            for idx in nodeIdx:
+                nodeId = index.nodeIdStr(idx)
+
+                seqDesc, seqLastDesc = index.readSeqDesc(f, idx, self.seqDescLen)
+                seqLen = int(index.data['seqLen'][idx])
+                rank = index.rankStr(idx)
+                res = index.snStr(idx)
+                sn = res.split(self.SN_delim)
+                if len(sn) >= 2:
+                    sample = sn[0] if rank in ['0', ''] else 'Samples'
+                    contig = sn[1]
+                else:
+                    sample = sn[0]
+                    contig = res
 
-                        nodeId = row[1]
+                lenBefore = int(index.data['lenBefore'][idx])
+                raw = index.infStr(idx)
+                inf = {'sv_type':raw.split(self.SN_delim)[0],'raw':raw} if raw else {}
+                if inf and inf['sv_type'] == 'SV':
+                    inf['sv_type'] = raw.split(self.SN_delim)[1]
 
-                        if nodeId not in subNodes and f'{nodeId}*' not in subNodes: continue
+                if nodeId in subNodes:
+                    self.nodes.append(nodeId,seqDesc,seqLastDesc,seqLen,sample,contig,lenBefore,rank,inf)
+                if f'{nodeId}*' in subNodes:
+                    self.nodes.append(f'{nodeId}*',self.revComp(seqLastDesc),self.revComp(seqDesc),seqLen,sample,contig,lenBefore,rank,inf)
 
-                        seq = row[2]
+    def loadLenBeforeDict(self, chromList):
+        lenBeforeDict = {}
 
-                        # get tag values
-                        tags = {}
-                        for val in row[3:]:
-                            lst = val.split(':')
-                            tags[lst[0]] = lst[2]
+        index = self.getIndex()
+        if index:
+            self.lenBeforeDict = self.loadLenBeforeDictFromIndex(index, chromList)
+            return
 
-                        seqLen = int(tags['LN']) if 'LN' in tags else len(seq)
-                        seqDesc = seq[0:self.seqDescLen]
-                        seqLastDesc = seq[-self.seqDescLen:]
-                        rank = tags['SR'] if 'SR' in tags else ''
-                        res = tags['SN'] if 'SN' in tags else ''
+        SN_delim = self.SN_delim
+        parser = RGFAParser(SN_delim, withEdgeTags=False)
+        try:
+            for lineNum, lineOffset, lineLen, lineType, fields in parser.scan(self.gfa):
+                if lineType == 'S':
+                    nodeId, seq, seqFieldLen, tags = fields
 
-                        """
-                        if len(res.split(self.SN_delim)) == 2:
-                            sample = res.split(self.SN_delim)[0]
-                            contig = res.split(self.SN_delim)[1]
-                        else:
-                            sample = tags['SR'] if 'SR' in tags else ''
-                            contig = res
-                        """
-                        if len(res.split(self.SN_delim)) >= 2:
-                            if 'SR' in tags:
-                                sample = res.split(self.SN_delim)[0] if tags['SR'] == '0' else 'Samples'
-                            else:
-                                sample = res.split(self.SN_delim)[0]
-                            contig = res.split(self.SN_delim)[1]
-                        else:
-                            sample = res.split(self.SN_delim)[0]
-                            contig = res
+                    rank = tags['SR'] if 'SR' in tags else ''
+                    res = tags['SN'] if 'SN' in tags else ''
+                    sn = res.split(SN_delim)
+                    if len(sn) == 2:
+                        sample, contig = sn
+                    else:
+                        sample = tags['SR'] if 'SR' in tags else ''
+                        contig = res
+                    lenBefore = int(tags['SO']) if 'SO' in tags else 0
 
-                        lenBefore = int(tags['SO']) if 'SO' in tags else 0
-                        inf = {'sv_type':tags['INF'].split(self.SN_delim)[0],'raw':tags['INF']} if 'INF' in tags else {}
-                        if inf and inf['sv_type'] == 'SV':
-                            inf['sv_type'] = tags['INF'].split(self.SN_delim)[1]
-
-                        seq = None
-                        if nodeId in subNodes:
-                            self.nodes[nodeId] = [seqDesc,seqLastDesc,seqLen,seq,sample,contig,lenBefore,rank,inf,None,None]
-                        if f'{nodeId}*' in subNodes:
-                            self.nodes[f'{nodeId}*'] = [self.revComp(seqLastDesc),self.revComp(seqDesc),seqLen,seq,sample,contig,lenBefore,rank,inf,None,None]
-            except Exception as e:
-                logging.error(f'!!!!! Loading aborted: invalid format at line: {lineNum}: {line}')
-                neededGFA = -1
-                raise
-                #print(e)
+                    if rank != '0' or contig not in chromList:  continue
+                    if contig not in lenBeforeDict:
+                        lenBeforeDict[contig] = {}
 
-    def loadLenBeforeDict(self, chromList):
-        lenBeforeDict = {}
-        with open(self.gfa) as f:
-            try:
-                for lineNum, line in enumerate(f):
-                    if line[0] == 'S':
-                        row = line.strip().split('\t')
+                    lenBeforeDict[contig][nodeId] = lenBefore
 
-                        nodeId = row[1]
-                        tags = {}
-                        for val in row[3:]:
-                            lst = val.split(':')
-                            tags[lst[0]] = lst[2]
+        except Exception as e:
+            raise
+            #print(e)
 
-                        rank = tags['SR'] if 'SR' in tags else ''
-                        res = tags['SN'] if 'SN' in tags else ''
-                        if len(res.split(self.SN_delim)) == 2:
-                            sample = res.split(self.SN_delim)[0]
-                            contig = res.split(self.SN_delim)[1]
-                        else:
-                            sample = tags['SR'] if 'SR' in tags else ''
-                            contig = res
-                        lenBefore = int(tags['SO']) if 'SO' in tags else 0
+        self.lenBeforeDict = lenBeforeDict
 
-                        if rank != '0' or contig not in chromList:  continue
-                        if contig not in lenBeforeDict:
-                            lenBeforeDict[contig] = {}
+    def loadLenBeforeDictFromIndex(self, index, chromList):
+        lenBeforeDict = {}
 
-                        lenBeforeDict[contig][nodeId] = lenBefore
+        data = index.data
+        snContig = []
+        for res in index.meta['SN']:
+            lst = res.split(self.SN_delim)
+            snContig.append(lst[1] if len(lst) == 2 else res)
+        snOK = np.array([contig in chromList for contig in snContig], dtype=bool)
 
-            except Exception as e:
-                raise
-                #print(e)
+        for idx in np.flatnonzero((data['rank'] == 0) & snOK[data['sn']]):
+            contig = snContig[data['sn'][idx]]
+            if contig not in lenBeforeDict:
+                lenBeforeDict[contig] = {}
 
-        self.lenBeforeDict = lenBeforeDict
+            lenBeforeDict[contig][index.nodeIdStr(idx)] = int(data['lenBefore'][idx])
+
+        return lenBeforeDict
 
     def drawGraph(self, backbone, sampleList, targetChr, targetStart, targetEnd, isGenHtml=True, nodeIdDict=None):
         self.error_unknown = 0
         self.drawgraph_by_nodeids = False
 
         try:
-            logging.info("Loading rGFA ...")
-            self.loadRGFA(targetBb=backbone, targetChr=targetChr, targetStart=targetStart, targetEnd=targetEnd, sampleList=sampleList, nodeIdList=nodeIdDict)
+            posDict = {targetChr:{'posFrom':targetStart,'posTo':targetEnd}}
+            if not nodeIdDict and self.genPyramidGraph(backbone, sampleList, targetChr, targetStart, targetEnd):
+                logging.info("Subgraph taken from the zoom levels")
+            else:
+                if nodeIdDict or not self.keepContigGraphs:
+                    logging.info("Loading rGFA ...")
+                    self.loadRGFA(targetBb=backbone, targetChr=targetChr, targetStart=targetStart, targetEnd=targetEnd, sampleList=sampleList, nodeIdList=nodeIdDict)
 
-            logging.info("Updating nodes ...")
-            self.updateNodes()
+                    logging.info("Updating nodes ...")
+                    self.updateNodes()
+                else:
+                    self.loadContigGraph(backbone, targetChr, sampleList)
 
-            logging.info("Generating subgraph ...")
-            sampleList = list(self.inf['samples'].keys())
-            posDict = {targetChr:{'posFrom':targetStart,'posTo':targetEnd}}
-            self.genSubGraph(sampleList, posDict)
+                logging.info("Generating subgraph ...")
+                sampleList = list(self.inf['samples'].keys())
+                self.genSubGraph(sampleList, posDict)
 
-            logging.info(f"No. of nodes: {len(self.subGraph.nodes)}, no. of edges: {len(self.subGraph.edges)}")
+            logging.info(f"No. of nodes: {len(self.subGraph)}, no. of edges: {self.subGraph.numberOfEdges()}")
 
             if self.emptyGraphSignal == 1:
                 return -1
@@ -679,6 +1092,203 @@ class PanGraph:
             raise e
             return None
 
+    # loadRGFA() and updateNodes() of a whole contig, or the same from graphCache, so that
+    # other windows of the contig only need genSubGraph()
+    def loadContigGraph(self, backbone, targetChr, sampleList=None):
+        stat = os.stat(self.gfa)
+        key = (os.path.realpath(self.gfa), stat.st_size, stat.st_mtime_ns, self.SN_delim, backbone, targetChr, tuple(sampleList) if sampleList else None)
+
+        cache = PanGraph.graphCache
+        if key in cache:
+            logging.info("Using loaded rGFA ...")
+            cache[key] = cache.pop(key)
+            self.G, self.loadedNodes, self.positionIndex, self.firstNodeId, self.inf = cache[key]
+            self.nodes, self.backbone, self.neededGFA = self.loadedNodes, self.inf['backbone'], self.inf['neededGFA']
+            self.coordinatesLoaded = True
+            self.colorPalettes()
+            return
+
+        logging.info("Loading rGFA ...")
+        self.loadRGFA(targetBb=backbone, targetChr=targetChr, sampleList=sampleList)
+
+        logging.info("Updating nodes ...")
+        self.updateNodes()
+        self.loadedNodes, self.coordinatesLoaded = self.nodes, True
+
+        if len(cache) >= self.graphCacheSize:
+            del cache[next(iter(cache))]
+        cache[key] = (self.G, self.loadedNodes, self.positionIndex, self.firstNodeId, self.inf)
+
+    # subgraph of the bins of a zoom level (see RGFAPyramid) instead of the nodes of a region
+    # with more nodes than maxNodesSummary (maxNodesLimit if 0), the level being the finest with
+    # at most maxNodesDisplay bins in the region; False if there are no zoom levels for the
+    # region or it has few enough nodes to be loaded. a bin is drawn as a backbone node of
+    # sv_type SUM named after the bin, with the number of nodes of each sample and SV type
+    def genPyramidGraph(self, backbone, sampleList, targetChr, targetStart, targetEnd):
+        pyramid = self.getPyramid()
+        if not pyramid or backbone not in pyramid.meta['backbones'] or targetChr not in pyramid.meta['contigs']:
+            return False
+
+        backbones = pyramid.meta['backbones']
+        samples = [backbone] + [sample for sample in pyramid.meta['samples'] if sample not in backbones and (not sampleList or sample in sampleList)]
+        if pyramid.nodeCount(targetChr, targetStart, targetEnd, samples) <= (self.maxNodesSummary or self.maxNodesLimit):
+            return False
+
+        level, rows = pyramid.pickLevel(targetChr, targetStart, targetEnd, self.maxNodesDisplay)
+        binSize = pyramid.meta['binSizes'][level]
+        logging.info(f'Using zoom level {level}: {len(rows)} bins of {binSize} bp')
+
+        data, prefix = pyramid.data, f'L{level}_'
+        sampleNames, svTypeNames = pyramid.meta['samples'], pyramid.meta['svTypes']
+
+        # node counts of each bin by sample and SV type
+        binCounts = {}
+        countIdx = pyramid.countsOf(level, rows, samples)
+        for row, sample, svType, count in zip(*(data[f'{prefix}{key}'][countIdx].tolist() for key in ['countBin', 'countSample', 'countSvType', 'count'])):
+            binCounts.setdefault(row, {}).setdefault(sampleNames[sample], {})[svTypeNames[svType]] = count
+
+        nodes = NodeTable()
+        posList = []
+        for row in rows.tolist():
+            binIdx = int(data[f'{prefix}bin'][row])
+            start, end = int(data[f'{prefix}start'][row]), int(data[f'{prefix}end'][row])
+
+            counts = binCounts.get(row, {})
+            total = sum(count for svTypes in counts.values() for count in svTypes.values())
+            raw = f'{total} nodes; ' + '; '.join(f'{sample}: ' + ', '.join(f'{svType} {svTypes[svType]}' for svType in sorted(svTypes, key=lambda svType: (svType != 'BB', svType)))
+                                                 for sample, svTypes in counts.items())
+
+            nodes.append(f'{targetChr}:{binIdx*binSize+1}-{(binIdx+1)*binSize}', '*', '*', end - start + 1, backbone, targetChr, start - 1, '0', {'sv_type':'SUM', 'raw':raw})
+            posList.append((start, end))
+        nodes.finalize()
+        if posList:
+            nodes.posStart[:], nodes.posEnd[:] = zip(*posList)
+
+        # links between the bins of the region; rows are consecutive
+        lo, hi = (rows[0], rows[-1] + 1) if len(rows) else (0, 0)
+        edgeFrom, edgeTo = data[f'{prefix}edgeFrom'], data[f'{prefix}edgeTo']
+        keep = (edgeFrom >= lo) & (edgeFrom < hi) & (edgeTo >= lo) & (edgeTo < hi)
+        subGraph = CSRGraph(nodes.rows.keys(), edgeFrom[keep] - lo, edgeTo[keep] - lo, np.zeros(keep.sum(), dtype=np.uint8))
+
+        self.backbone = {'name':backbone, 'contigs':[targetChr], 'nodes':{}}
+        self.inf = {'samples':{sample:1 for sample in samples}, 'neededGFA':0, 'backbone':self.backbone}
+        self.neededGFA = 0
+
+        self.summarySignal = 1
+        self.subNodes = subGraph.nodeIds
+        if len(subGraph) > self.maxNodesDisplay:
+            self.overNodeLimitSignal = 1
+        if len(subGraph) == 0:
+            self.emptyGraphSignal = 1
+
+        self.nodes = nodes
+        self.subGraph = subGraph
+
+        return True
+
+    # SV sites (bubbles, see rGFAGraph.bubbles()) of a backbone contig overlapping [targetStart, targetEnd],
+    # from the index, in position order: [{'source', 'sink', 'start', 'end', 'type', 'members'}, ...]
+    def listBubbles(self, backbone, targetChr, targetStart=None, targetEnd=None):
+        index = self.getIndex(build=self.autoBuildIndex)
+        if not index:
+            logging.warning('listBubbles(): SV sites need the rGFA index')
+            return []
+
+        snCodes = self.backboneSnCodes(index, backbone, targetChr)
+        return [self.bubbleInfo(index, idx) for idx in index.findBubblesInRange(snCodes, targetStart, targetEnd).tolist()]
+
+    # the first SV site of a backbone contig starting after pos (before pos if step < 0), None if there is none
+    def nextBubble(self, backbone, targetChr, pos, step=1):
+        index = self.getIndex(build=self.autoBuildIndex)
+        if not index:
+            logging.warning('nextBubble(): SV sites need the rGFA index')
+            return None
+
+        idx = index.findBubbleNextTo(self.backboneSnCodes(index, backbone, targetChr), pos or 0, step)
+        return self.bubbleInfo(index, idx) if idx is not None else None
+
+    def prevBubble(self, backbone, targetChr, pos):
+        return self.nextBubble(backbone, targetChr, pos, step=-1)
+
+    # SN codes of the index for the given backbone and contig
+    def backboneSnCodes(self, index, backbone, targetChr):
+        snCodes = []
+        for code, res in enumerate(index.meta['SN']):
+            sn = res.split(self.SN_delim)
+            contig = sn[1] if len(sn) >= 2 else res
+            if sn[0] == backbone and contig == targetChr:
+                snCodes.append(code)
+
+        return snCodes
+
+    # the type of an SV site is from the INF of its members, or DEL for a deletion edge
+    def bubbleInfo(self, index, idx):
+        data = index.data
+        members = index.bubbleMembers(idx).tolist()
+
+        svTypes = set()
+        for member in members:
+            raw = index.infStr(member)
+            sv_type = raw.split(self.SN_delim)[0] if raw else 'other'
+            if sv_type == 'SV':
+                sv_type = raw.split(self.SN_delim)[1]
+            svTypes.add(sv_type)
+
+        return {'source':index.nodeIdStr(data['bubbleSource'][idx]), 'sink':index.nodeIdStr(data['bubbleSink'][idx]),
+                'start':int(data['bubbleStart'][idx]), 'end':int(data['bubbleEnd'][idx]),
+                'type':','.join(sorted(svTypes)) if members else 'DEL', 'members':[index.nodeIdStr(member) for member in members]}
+
+    # P and W paths of the rGFA file from the index: [{'name', 'start', 'length', 'steps'}, ...]
+    def listPaths(self):
+        index = self.getIndex(build=self.autoBuildIndex)
+        if not index:
+            logging.warning('listPaths(): paths need the rGFA index')
+            return []
+
+        data = index.data
+        paths = []
+        for path, name in enumerate(index.meta['paths']):
+            lo, hi = data['pathOffset'][path:path+2]
+            length = int(data['pathLenBefore'][hi-1] + data['seqLen'][data['pathNode'][hi-1]]) if hi > lo else 0
+            paths.append({'name':name, 'start':int(data['pathStart'][path]), 'length':length, 'steps':int(hi - lo)})
+
+        return paths
+
+    # the steps of a path overlapping [start, end] of its own coordinates (W lines start at their seqStart);
+    # see pathInfo() for the result, None if there is no such path
+    def getPath(self, pathName, start=None, end=None):
+        index = self.getIndex(build=self.autoBuildIndex)
+        path = index.findPath(pathName) if index else None
+        if path is None:
+            logging.warning(f'getPath(): path {pathName} not found')
+            return None
+
+        return self.pathInfo(index, path, *index.findPathStepsInRange(path, start, end))
+
+    # the steps of a path from its first to its last node drawn in [targetStart, targetEnd] of a backbone contig
+    def getPathInRegion(self, pathName, backbone, targetChr, targetStart=None, targetEnd=None):
+        index = self.getIndex(build=self.autoBuildIndex)
+        path = index.findPath(pathName) if index else None
+        if path is None:
+            logging.warning(f'getPathInRegion(): path {pathName} not found')
+            return None
+
+        snCodes = self.backboneSnCodes(index, backbone, targetChr)
+        return self.pathInfo(index, path, *index.findPathStepsInRegion(path, snCodes, targetStart, targetEnd))
+
+    # steps [lo, hi) of a path: {'name', 'start', 'end', 'nodes', 'strands'}, start and end being the
+    # path coordinates of the steps
+    def pathInfo(self, index, path, lo, hi):
+        data = index.data
+        nodeIdx = data['pathNode'][lo:hi]
+        lenBefore = data['pathLenBefore'][lo:hi] + data['pathStart'][path]
+
+        return {'name':index.meta['paths'][path],
+                'start':int(lenBefore[0]) + 1 if hi > lo else None,
+                'end':int(lenBefore[-1] + data['seqLen'][nodeIdx[-1]]) if hi > lo else None,
+                'nodes':[nodeId.decode() for nodeId in data['nodeId'][nodeIdx].tolist()],
+                'strands':['-' if isRev else '+' for isRev in index.pathStrands(lo, hi).tolist()]}
+
     def checkNodeIds(self, nodeIdDict, targetChr):
         count = {'total':0, 'targetChr':0}
 
@@ -715,7 +1325,7 @@ class PanGraph:
             posDict = {}
             self.subGraph = self.G
 
-            logging.info(f"No. of nodes: {len(self.subGraph.nodes)}, no. of edges: {len(self.subGraph.edges)}")
+            logging.info(f"No. of nodes: {len(self.subGraph)}, no. of edges: {self.subGraph.numberOfEdges()}")
 
             if self.emptyGraphSignal == 1:
                 return -1
@@ -728,7 +1338,7 @@ class PanGraph:
 
             logging.info("The graph is generated")
 
-            self.subNodesCount = len(self.subGraph.nodes)
+            self.subNodesCount = len(self.subGraph)
 
             return self.drawGraphResult
         except Exception as e:
@@ -860,12 +1470,12 @@ class PanGraph:
         posDict[geneChr] = {'posFrom':geneStart,'posTo':geneEnd}
         self.genSubGraph(list(self.inf['samples'].keys()), posDict)
 
-        if not self.subGraph.nodes:
+        if not self.subGraph:
             logging.info(f'No overlapped nodes with Gene {geneId}')
             self.noOverlap = True
             return
 
-        newList = natsorted(self.subGraph.nodes.keys())
+        newList = natsorted(self.subGraph.nodeIds)
         startNode = newList[0]
         endNode = newList[-1]
 
@@ -874,13 +1484,13 @@ class PanGraph:
         self.features=[]
         plotNodes=[]
         if startNode == endNode:
-            node = self.subGraph.nodes[startNode]
-            self.features.append(GraphicFeature(start=node['posStart'], end=node['posEnd'], strand=0,
-                                                color=self.nameCols[node['sample']], label=startNode))
+            node = self.nodes[startNode]
+            self.features.append(GraphicFeature(start=node[NODE.posStart], end=node[NODE.posEnd], strand=0,
+                                                color=self.nameCols[node[NODE.sample]], label=startNode))
 
         else:
             connectedNodes = {}
-            for nodeId in self.subGraph.nodes:
+            for nodeId in self.subGraph.nodeIds:
                 node = self.nodes[nodeId]
                 if nodeId not in plotNodes:
                     plotNodes.append(nodeId)
@@ -918,44 +1528,40 @@ class PanGraph:
         nodeIdDict = {nodeId.strip():1 for nodeId in nodeIdList}
         nodes = {}
 
-        with open(self.gfa) as f:
+        SN_delim = self.SN_delim
+        parser = RGFAParser(SN_delim, withSeq=getSeq)
+        with openRGFA(self.gfa) as f:
+            # only read the S lines of the wanted nodes if indexed
+            lines = f
+            index = self.getIndex()
+            if index:
+                nodeIdx = index.findNodes(list(nodeIdDict.keys()))
+                lines = index.iterLines(nodeIdx[nodeIdx >= 0])
+
             try:
-                for lineNum, line in enumerate(f):
-                    row = line.strip().split('\t')
-                    if row[0] != 'S': continue
+                for lineNum, line in enumerate(lines):
+                    if line[:1] != b'S': continue
 
-                    nodeId = row[1]
+                    nodeId, seq, seqFieldLen, tags = parser.parseS(line)
                     if nodeId not in nodeIdDict:
                         continue
 
-                    seq = row[2]
-                    tags = {}
-                    for val in row[3:]:
-                        lst = val.split(':')
-                        tags[lst[0]] = lst[2]
-
-                    seqLen = int(tags['LN']) if 'LN' in tags else len(seq)
-                    seqDesc = seq[0:self.seqDescLen]
-                    seqLastDesc = seq[-self.seqDescLen:]
+                    seqLen = int(tags['LN']) if 'LN' in tags else seqFieldLen
+                    seqDesc, seqLastDesc = parser.seqEnds(line, self.seqDescLen)
                     rank = tags['SR'] if 'SR' in tags else ''
                     res = tags['SN'] if 'SN' in tags else ''
-                    if len(res.split(self.SN_delim)) >= 2:
-                        if 'SR' in tags:
-                            sample = res.split(self.SN_delim)[0] if tags['SR'] == '0' else 'Samples'
-                        else:
-                            sample = res.split(self.SN_delim)[0]
-                        contig = res.split(self.SN_delim)[1]
+                    sn = res.split(SN_delim)
+                    if len(sn) >= 2:
+                        sample = sn[0] if rank in ['0', ''] else 'Samples'
+                        contig = sn[1]
                     else:
-                        sample = res.split(self.SN_delim)[0]
+                        sample = sn[0]
                         contig = res
 
                     lenBefore = int(tags['SO']) if 'SO' in tags else 0
-                    inf = {'sv_type':tags['INF'].split(self.SN_delim)[0],'raw':tags['INF']} if 'INF' in tags else {}
+                    inf = {'sv_type':tags['INF'].split(SN_delim)[0],'raw':tags['INF']} if 'INF' in tags else {}
                     if inf and inf['sv_type'] == 'SV':
-                        inf['sv_type'] = tags['INF'].split(self.SN_delim)[1]
-
-                    if not getSeq:
-                        seq = None
+                        inf['sv_type'] = tags['INF'].split(SN_delim)[1]
 
                     nodes[nodeId] = [seqDesc,seqLastDesc,seqLen,seq,sample,contig,lenBefore,rank,inf,None,None]
 
@@ -990,100 +1596,188 @@ class PanGraph:
         trans = str.maketrans('ACGTN*', 'TGCAN*')
         return seq.translate(trans)[::-1]
 
+    # drawing coordinates of the loaded nodes; they come with the nodes when loaded from
+    # the index, and are worked out over the loaded graph otherwise
     def updateNodes(self):
-        G = self.G
-
-        for contig in self.firstNodeId:
-            nodeId = self.firstNodeId[contig]
-
-            # init firstNodeId
-            node = self.nodes[nodeId]
-            if node[NODE.sample] == self.backbone['name'] and node[NODE.chr] == contig:
-                node[NODE.posStart] = node[NODE.lenBefore] + 1
-                node[NODE.posEnd] = node[NODE.posStart] + node[NODE.len] - 1
-
-            nextPos = 0
-            lastNode = None
-
-            for tuple in list(nx.bfs_edges(G, source=nodeId)):
-                fromNode = self.nodes[tuple[0]]
-                toNode = self.nodes[tuple[1]]
-
-                if fromNode[NODE.sample] == self.backbone['name'] and fromNode[NODE.chr] == contig:
-                    fromNode[NODE.posStart] = fromNode[NODE.lenBefore] + 1
-                    fromNode[NODE.posEnd] = fromNode[NODE.posStart] + fromNode[NODE.len] - 1
-                    nextPos = fromNode[NODE.posEnd] + 1
+        if self.coordinatesLoaded:
+            return
 
-                if toNode[NODE.sample] == self.backbone['name'] and toNode[NODE.chr] == contig:
-                    toNode[NODE.posStart] = toNode[NODE.lenBefore] + 1
-                    toNode[NODE.posEnd] = toNode[NODE.posStart] + toNode[NODE.len] - 1
-                    nextPos = toNode[NODE.posEnd] + 1
-                else:
-                    toNode[NODE.posStart] = nextPos
-                    toNode[NODE.posEnd] = toNode[NODE.posStart]
+        G = self.G
+        nodes = self.nodes
 
-                lastNode = toNode
+        # backbone nodes of the loaded contigs take their positions from SO
+        contigCodes = [nodes.chrCode(contig) for contig in self.firstNodeId]
+        isBackbone = (nodes.sample == nodes.sampleCode(self.backbone['name'])) & np.isin(nodes.chr, contigCodes)
 
-            if lastNode and lastNode[NODE.sample] == self.backbone['name']:
-                lastNode[NODE.posStart] = lastNode[NODE.lenBefore] + 1
-
-        self.G = G
+        # node table row of each graph node
+        tableIdx = nodes.find(G.nodeIds)
+        posStart, posEnd = G.nodeCoordinates(isBackbone[tableIdx], nodes.lenBefore[tableIdx] + 1, nodes.lenBefore[tableIdx] + nodes.len[tableIdx])
+        nodes.posStart[tableIdx], nodes.posEnd[tableIdx] = posStart, posEnd
 
     # e.g. posDict = {'Chr01':{'posFrom':1,'posTo':2}}
     def genSubGraph(self, sampleList, posDict):
         if not self.G:
             logging.error(f'genSubGraph(): need to run genGraph() first')
-            return nx.DiGraph()
+            return CSRGraph([], [], [], [])
 
+        # nodes of the loaded graph, kept for other windows of the same graph
+        if self.loadedNodes is None:
+            self.loadedNodes = self.nodes
         G = self.G
-        H = self.G.to_undirected()
+        nodes = self.loadedNodes
 
         subNodes = []
-        notConnectCount = 0
-        connectCount = 0
-
-        nodeCount = 0
         for contig in posDict:
             if contig != 'all':
                 posFrom = posDict[contig]['posFrom']
                 posTo = posDict[contig]['posTo']
-                anyNodeId = self.firstNodeId[contig]
-
-                nodeIdDict = {}
-                for nodeId in nx.node_connected_component(H, anyNodeId):
-                    nodeIdDict[nodeId] = self.nodes[nodeId][NODE.lenBefore]
-                sortedDict = {k: v for k, v in sorted(nodeIdDict.items(), key=lambda item: item[1])}
 
-                for nodeId in sortedDict:
-                    node = self.nodes[nodeId]
+                graphIdx = self.contigPositionIndex(contig).overlap(posFrom, posTo)
+                if sampleList:
+                    idx = nodes.find([G.nodeIds[i] for i in graphIdx.tolist()])
+                    sampleOK = np.array([sample in sampleList for sample in nodes.sampleNames], dtype=bool)
+                    graphIdx = graphIdx[(nodes.rank[idx] == 0) | sampleOK[nodes.sample[idx]]]
 
-                    # note: links from out-of-region nodes
-                    if node[NODE.posStart] is None:
-                        node[NODE.posStart] = 0
-                        node[NODE.posEnd] = 0
-
-                    if sampleList and (node[NODE.rank] != '0' and node[NODE.sample] != self.backbone and node[NODE.sample] not in sampleList):
-                        continue
-
-                    if (not posTo or node[NODE.posStart] <= posTo) and (not posFrom or node[NODE.posEnd] >= posFrom):
-                        subNodes.append(nodeId)
+                subNodes.append(graphIdx)
             else:
                 for contig in self.firstNodeId:
-                    anyNodeId = self.firstNodeId[contig]
-                    for nodeId in nx.node_connected_component(H, anyNodeId):
-                        subNodes.append(nodeId)
-
-        subGraph = G.subgraph(subNodes)
-        self.subNodes = subGraph.nodes
-        if len(subGraph.nodes) > self.maxNodesDisplay:
+                    subNodes.append(G.component(G.rows[self.firstNodeId[contig]]))
+
+        subGraph = G.subgraph(np.concatenate(subNodes) if subNodes else [])
+        subNodesTable = nodes.take(subGraph.nodeIds)
+
+        # level of detail: regions over maxNodesSummary nodes are drawn as summary nodes
+        self.summarySignal = 0
+        if self.maxNodesSummary and len(subGraph) > self.maxNodesSummary:
+            summary = self.summarizeGraph(subGraph, subNodesTable, self.maxNodesSummary)
+            if summary:
+                logging.info(f'subGraph: {len(subGraph)} nodes summarized into {len(summary[0])} nodes')
+                subGraph, subNodesTable = summary
+                self.summarySignal = 1
+
+        self.subNodes = subGraph.nodeIds
+        if len(subGraph) > self.maxNodesDisplay:
             self.overNodeLimitSignal = 1
-        if len(subGraph.nodes) == 0:
+        if len(subGraph) == 0:
             self.emptyGraphSignal = 1
-        logging.info(f'subGraph: number of nodes: {len(subGraph.nodes)}, number of edges: {len(subGraph.edges)}')
+        logging.info(f'subGraph: number of nodes: {len(subGraph)}, number of edges: {subGraph.numberOfEdges()}')
 
-        self.nodes = {nodeId:self.nodes[nodeId] for nodeId in subGraph.nodes}
+        self.nodes = subNodesTable
         self.subGraph = subGraph
-        self.G = None
+
+    # nodes of the component of a contig by position, set up on the first window
+    def contigPositionIndex(self, contig):
+        if contig not in self.positionIndex:
+            G, nodes = self.G, self.loadedNodes
+            graphIdx = G.component(G.rows[self.firstNodeId[contig]])
+            idx = nodes.find([G.nodeIds[i] for i in graphIdx.tolist()])
+
+            # note: links from out-of-region nodes
+            unset = idx[nodes.posStart[idx] < 0]
+            nodes.posStart[unset], nodes.posEnd[unset] = 0, 0
+
+            self.positionIndex[contig] = PositionIndex(graphIdx, nodes.posStart[idx], nodes.posEnd[idx])
+
+        return self.positionIndex[contig]
+
+    # drawGraphResult of a tile of a backbone contig (see tileSize): the nodes of the tile and the
+    # edges from them, which may lead to nodes of other tiles. the Cytoscape data of the nodes
+    # also has their position 'pos' and 'lane' (see rGFAGraph.nodeLanes()); colors are the same
+    # for all tiles of the contig
+    def drawGraphTile(self, backbone, sampleList, targetChr, tile):
+        tileStart = tile * self.tileSize + 1
+        tileEnd = tileStart + self.tileSize - 1
+
+        self.loadContigGraph(backbone, targetChr, sampleList)
+        G, nodes = self.G, self.loadedNodes
+
+        tileIdx = np.zeros(0, dtype=np.int64)
+        if targetChr in self.firstNodeId:
+            tileIdx = self.contigPositionIndex(targetChr).starting(max(tileStart, 1), tileEnd)
+
+        # nodes linked to from the tile, if they are in a tile
+        edges = gatherRanges(G.outOffset[tileIdx], G.outOffset[tileIdx+1])
+        toIdx = np.unique(G.edgeTo[edges])
+        toIdx = toIdx[nodes.posStart[nodes.find([G.nodeIds[i] for i in toIdx.tolist()])] > 0] if len(toIdx) else toIdx
+
+        graphIdx = np.union1d(tileIdx, toIdx)
+        subGraph = G.subgraph(graphIdx)
+        self.nodes = nodes.take(subGraph.nodeIds)
+        self.colorPalettes(seed=f'{backbone}{self.SN_delim}{targetChr}')
+
+        nodesData, edgesData, cyNodes, cyEdges = self.formatGraphOutput(subGraph)
+
+        inTile = np.isin(graphIdx, tileIdx)
+        idx = self.nodes.find(subGraph.nodeIds)
+        posStart = self.nodes.posStart[idx]
+        lane = nodeLanes(posStart, self.nodes.sample[idx] == self.nodes.sampleCode(self.backbone['name']))
+        for i, pos, nodeLane in zip(np.flatnonzero(inTile).tolist(), posStart[inTile].tolist(), lane[inTile].tolist()):
+            cyNodes[i]['data'].update({'pos':pos, 'lane':nodeLane})
+
+        keep = np.flatnonzero(inTile).tolist()
+        keepEdges = np.flatnonzero(inTile[subGraph.edgeFrom]).tolist()
+        self.drawGraphResult = {'error':False, 'tile':tile, 'start':tileStart, 'end':tileEnd,
+                                'nodes_data':[nodesData[i] for i in keep], 'edges_data':[edgesData[i] for i in keepEdges],
+                                'cy_data':[cyNodes[i] for i in keep] + [cyEdges[i] for i in keepEdges]}
+
+        return self.drawGraphResult
+
+    # (graph, nodes) with the unbranched backbone runs and simple SV bubbles of a graph collapsed
+    # into summary nodes until there are at most budget nodes, or None if nothing can be
+    # collapsed. a summary node has the span of its nodes and sv_type SUM, its Info giving
+    # the number of nodes of each SV type; nodes left alone are kept as they are
+    def summarizeGraph(self, graph, nodes, budget):
+        tableIdx = nodes.find(graph.nodeIds)
+        bbCode = nodes.sampleCode(self.backbone['name'])
+        isBackbone = nodes.sample[tableIdx] == bbCode
+        posStart, posEnd = nodes.posStart[tableIdx], nodes.posEnd[tableIdx]
+
+        groups = summaryGroups(len(graph), graph.edgeFrom, graph.edgeTo, isBackbone, posStart, budget)
+        if groups is None or groups.max() + 1 >= len(graph):
+            return None
+
+        members = np.argsort(groups, kind='stable')
+        bounds = np.flatnonzero(np.diff(groups[members])) + 1
+
+        table = NodeTable()
+        posList = []
+        for group in np.split(members, bounds):
+            if len(group) == 1:
+                idx = tableIdx[group[0]]
+                table.append(graph.nodeIds[group[0]], nodes.seqDesc[idx], nodes.seqLastDesc[idx], nodes.len[idx], nodes.sampleNames[nodes.sample[idx]],
+                             nodes.chrNames[nodes.chr[idx]], nodes.lenBefore[idx], nodes.rankStr(idx), nodes.infDict(idx))
+                posList.append((nodes.posStart[idx], nodes.posEnd[idx]))
+                continue
+
+            # named after its first and last nodes by position
+            ends = group[isBackbone[group]] if isBackbone[group].any() else group
+            ends = ends[np.argsort(posStart[ends], kind='stable')]
+            nodeId = f'{graph.nodeIds[ends[0]]}..{graph.nodeIds[ends[-1]]}'
+
+            placed = group[posStart[group] > 0]
+            start = int(posStart[placed].min()) if len(placed) else 0
+            end = int(posEnd[placed].max()) if len(placed) else 0
+
+            svTypes = {}
+            for idx in tableIdx[group].tolist():
+                svType = nodes.svTypeNames[nodes.svType[idx]] if nodes.svType[idx] >= 0 else 'BB' if nodes.sample[idx] == bbCode else 'other'
+                svTypes[svType] = svTypes.get(svType, 0) + 1
+            raw = f'{len(group)} nodes: ' + ', '.join(f'{svType} {svTypes[svType]}' for svType in sorted(svTypes, key=lambda svType: (svType != 'BB', svType)))
+
+            idx = tableIdx[ends[0]]
+            table.append(nodeId, '*', '*', end - start + 1 if start else int(nodes.len[tableIdx[group]].sum()), nodes.sampleNames[nodes.sample[idx]],
+                         nodes.chrNames[nodes.chr[idx]], max(start - 1, 0), nodes.rankStr(idx), {'sv_type':'SUM', 'raw':raw})
+            posList.append((start, end))
+
+        table.finalize()
+        table.posStart[:], table.posEnd[:] = zip(*posList)
+
+        # edges between the groups, with the strands and tags of the last edge of each pair
+        keep = np.flatnonzero(groups[graph.edgeFrom] != groups[graph.edgeTo])
+        tags = None if graph.tags is None else lambda i: graph.edgeTags(keep[i])
+        summaryGraph = CSRGraph(table.rows.keys(), groups[graph.edgeFrom[keep]], groups[graph.edgeTo[keep]], graph.edgeStrand[keep], tags)
+
+        return summaryGraph, table
 
     def formatNodeOutput(self, nodeId, node, showSeqDesc=True):
         shape = getVar(copied, 'nodes',f"{node[NODE.inf]['sv_type']}_shape") if 'sv_type' in node[NODE.inf] else getVar(copied, 'nodes', 'BB_shape')
@@ -1093,92 +1787,273 @@ class PanGraph:
         size = 1 if not node[NODE.len] else float(f"{math.log(abs(node[NODE.len]), 10)*8 + 1:.1f}")
         color = self.nameCols[node[NODE.sample]] if node[NODE.sample] in self.nameCols else '#A2A2A2'
         sample = node[NODE.sample]
-        pos = node[NODE.lenBefore] if node[NODE.lenBefore] else 0
         inf = node[NODE.inf]['raw'] if 'raw' in node[NODE.inf] else ''
-        seqDesc = f"{node[NODE.seqDesc]}..." if node[NODE.len] > len(node[NODE.seqDesc]) and node[NODE.seqDesc] != '*' else node[NODE.seqDesc]
-
-        title = f"NodeId: {nodeId}; Resource: {node[NODE.sample]}_{node[NODE.chr]}; Len: {node[NODE.len]}"
-        if sample == self.backbone['name']: title += f"; Pos: {pos} - {pos + node[NODE.len] - 1}"
-        if inf: title += f"; Info: {inf}"
-        if showSeqDesc: title += f"; Seq: {seqDesc}"
+        title = self.nodeTitle(nodeId, sample, node[NODE.chr], node[NODE.len], node[NODE.lenBefore], inf, node[NODE.seqDesc], showSeqDesc)
 
         return {'color':color,'id':nodeId,'label':nodeId,'shape':shape,'size':size,'title':title,'shape_cy':shape_cy,'sample':sample,'sv_type':sv_type}
 
-    def formatEdgeOutput(self, edge):
-        sourceLabel = '*' if 'strands' in edge[2] and edge[2]['strands'][0] == '-' else ''
-        targetLabel = '*' if 'strands' in edge[2] and edge[2]['strands'][1] == '-' else ''
-
-        label = f'({sourceLabel},{targetLabel})' if sourceLabel or targetLabel else ''
+    def nodeTitle(self, nodeId, sample, contig, seqLen, lenBefore, inf, seqDesc, showSeqDesc=True):
+        pos = lenBefore if lenBefore else 0
+        seqDesc = f"{seqDesc}..." if seqLen > len(seqDesc) and seqDesc != '*' else seqDesc
 
-        return {'from':edge[0],'to':edge[1],'arrows':'to','sourceLabel':sourceLabel,'targetLabel':targetLabel,'label':label,'color':'red','labelHighlightBold':'true'}
+        title = f"NodeId: {nodeId}; Resource: {sample}_{contig}; Len: {seqLen}"
+        if sample == self.backbone['name']: title += f"; Pos: {pos} - {pos + seqLen - 1}"
+        if inf: title += f"; Info: {inf}"
+        if showSeqDesc: title += f"; Seq: {seqDesc}"
 
-    def genDrawGraphResult(self, graph, posDict):
+        return title
+
+    # vis.js nodes and edges of a graph with their Cytoscape elements, formatted column by column:
+    # the colour of each sample, the shape of each SV type and the size of each node length are
+    # worked out once instead of per node
+    def formatGraphOutput(self, graph):
+        table = self.nodes
+        nodeIds = graph.nodeIds
+        idx = table.find(nodeIds)
+
+        # per-code tables; nodes without INF have SV type -1, i.e. the last entry
+        colorTable = [self.nameCols.get(sample, '#A2A2A2') for sample in table.sampleNames]
+        svTypeTable = table.svTypeNames + ['']
+        shapeTable = [getVar(copied, 'nodes', f'{sv_type}_shape') for sv_type in table.svTypeNames] + [getVar(copied, 'nodes', 'BB_shape')]
+        shapeCyTable = [getVar(copied, 'cytoscape', f'{sv_type}_shape') for sv_type in table.svTypeNames] + [getVar(copied, 'cytoscape', 'BB_shape')]
+        infTable = table.infRaw + ['']
+
+        seqLen = table.len[idx]
+        lens, lenIdx = np.unique(seqLen, return_inverse=True)
+        sizeTable = [1 if not seqLen else float(f"{math.log(abs(seqLen), 10)*8 + 1:.1f}") for seqLen in lens.tolist()]
+
+        sample, svType = table.sample[idx].tolist(), table.svType[idx].tolist()
+        nodes, cyNodes = [], []
+        for nodeId, code, contig, length, lenBefore, infIdx, seqDesc, typeCode, sizeIdx in \
+                zip(nodeIds, sample, table.chr[idx].tolist(), seqLen.tolist(), table.lenBefore[idx].tolist(), table.inf[idx].tolist(),
+                    table.seqDesc[idx].tolist(), svType, lenIdx.reshape(-1).tolist()):
+            sampleName = table.sampleNames[code]
+            color, size = colorTable[code], sizeTable[sizeIdx]
+            shape_cy = shapeCyTable[typeCode]
+            title = self.nodeTitle(nodeId, sampleName, table.chrNames[contig], length, lenBefore, infTable[infIdx], seqDesc)
+
+            nodes.append({'color':color,'id':nodeId,'label':nodeId,'shape':shapeTable[typeCode],'size':size,'title':title,'shape_cy':shape_cy,'sample':sampleName,'sv_type':svTypeTable[typeCode]})
+            cyNodes.append({'data':{'id':nodeId,'name':nodeId,'weight':1,'size':size,'color':color,'shape':shape_cy,'title':title}})
+
+        # edge labels by strand code (see rGFAGraph.strandNames)
+        sourceLabels, targetLabels = ['', '*', '', '*'], ['', '', '*', '*']
+        labels = ['', '(*,)', '(,*)', '(*,*)']
+
+        # edges take the colour of their source sample, darkened, or red if a strand is reversed
+        edgeColorTable = [self.edgeColor(color) for color in colorTable]
+        edgeColor = [edgeColorTable[code] for code in table.sample[idx][graph.edgeFrom].tolist()]
+
+        edges, cyEdges = [], []
+        for fromIdx, toIdx, strand, color in zip(graph.edgeFrom.tolist(), graph.edgeTo.tolist(), graph.edgeStrand.tolist(), edgeColor):
+            fromNodeId, toNodeId = nodeIds[fromIdx], nodeIds[toIdx]
+            sourceLabel, targetLabel = sourceLabels[strand], targetLabels[strand]
+
+            edges.append({'from':fromNodeId,'to':toNodeId,'arrows':'to','sourceLabel':sourceLabel,'targetLabel':targetLabel,'label':labels[strand],'color':'red','labelHighlightBold':'true'})
+            cyEdges.append({'data':{'source':fromNodeId,'target':toNodeId,'weight':1,'color':'red' if strand else color,'arrow':'triangle-backcurve','sourceLabel':sourceLabel,'targetLabel':targetLabel}})
+
+        return nodes, edges, cyNodes, cyEdges
+
+    # avoid too light color for edges
+    @staticmethod
+    def edgeColor(color):
+        return f'#{int(color[1:3],16)//2:02x}{int(color[3:5],16)//2:02x}{int(color[5:],16)//2:02x}' if color[0] == '#' else color
+
+    # (x, y) of the nodes of a graph for drawing them without a layout run: a column for each
+    # posStart (see updateNodes()) in position order, SV nodes being half a column before the
+    # backbone node they lead to, and a row for each lane (see rGFAGraph.nodeLanes()), the SV
+    # nodes of each sample having lanes of their own below the backbone
+    def nodePositions(self, graph):
+        idx = self.nodes.find(graph.nodeIds)
+        posStart, sample = self.nodes.posStart[idx], self.nodes.sample[idx]
+        isBackbone = sample == self.nodes.sampleCode(self.backbone['name'])
+
+        column = np.unique(posStart, return_inverse=True)[1].reshape(-1)
+        x = column * self.layoutColumnWidth - np.where(isBackbone, 0, self.layoutColumnWidth // 2)
+        y = nodeLanes(posStart, isBackbone, sample) * self.layoutLaneHeight
+
+        return x, y
+
+    # positions (see nodePositions()) are added to the nodes if withPositions, or by default if
+    # presetLayout is set in config.ini, for the pages to draw the graph as it is
+    def genDrawGraphResult(self, graph, posDict, withPositions=None):
         self.colorPalettes()
 
-        nodes = [self.formatNodeOutput(nodeId, self.nodes[nodeId]) for nodeId in graph.nodes]
-        edges = [self.formatEdgeOutput(edge) for edge in graph.edges(data=True)]
+        nodeIds = graph.nodeIds
+        nodes, edges, cyNodes, cyEdges = self.formatGraphOutput(graph)
+
+        if withPositions is None:
+            withPositions = self.presetLayout
+        if withPositions:
+            x, y = (values.tolist() for values in self.nodePositions(graph))
+            for node, cyNode, nodeX, nodeY in zip(nodes, cyNodes, x, y):
+                node['x'], node['y'] = nodeX, nodeY
+                cyNode['position'] = {'x':nodeX, 'y':nodeY}
 
-        inNodeIdList = [n for n,d in graph.in_degree() if d == 0]
-        outNodeIdList = [n for n,d in graph.out_degree() if d == 0]
+        inNodeIdList = [nodeIds[idx] for idx in np.flatnonzero(graph.inDegree() == 0)]
+        outNodeIdList = [nodeIds[idx] for idx in np.flatnonzero(graph.outDegree() == 0)]
 
+        # first and last backbone nodes by position
         startNodeId, endNodeId = None, None
-        try:
-            startNodeId = min([id for id in graph.nodes if self.nodes[id][NODE.sample] == self.backbone['name'] and self.nodes[id][NODE.posStart]], key=lambda id:self.nodes[id][NODE.posStart])
-            endNodeId = max([id for id in graph.nodes if self.nodes[id][NODE.sample] == self.backbone['name'] and self.nodes[id][NODE.posEnd]], key=lambda id:self.nodes[id][NODE.posEnd])
-        except:
-            pass
+        idx = self.nodes.find(nodeIds)
+        if len(idx):
+            isBackbone = self.nodes.sample[idx] == self.nodes.sampleCode(self.backbone['name'])
+            posStart, posEnd = self.nodes.posStart[idx], self.nodes.posEnd[idx]
+            startIdx = np.flatnonzero(isBackbone & (posStart > 0))
+            endIdx = np.flatnonzero(isBackbone & (posEnd > 0))
+            if len(startIdx):
+                startNodeId = nodeIds[startIdx[np.argmin(posStart[startIdx])]]
+            if len(endIdx):
+                endNodeId = nodeIds[endIdx[np.argmax(posEnd[endIdx])]]
+
+        # start/end markers, linked by edges in the colour of their other end and put a column
+        # before or after it
+        def addMarker(labelNodeId, color, fromNodeId, toNodeId):
+            nodes.append({'color':color,'id':labelNodeId,'label':labelNodeId,'shape':'star','size':20,'title':labelNodeId,'shape_cy':'star'})
+            cyNodes.append({'data':{'id':labelNodeId,'name':labelNodeId,'weight':1,'size':20,'color':color,'shape':'star','title':labelNodeId}})
+
+            if withPositions:
+                row = graph.rows[toNodeId if fromNodeId == labelNodeId else fromNodeId]
+                nodes[-1]['x'] = x[row] + (-self.layoutColumnWidth if fromNodeId == labelNodeId else self.layoutColumnWidth)
+                nodes[-1]['y'] = y[row]
+                cyNodes[-1]['position'] = {'x':nodes[-1]['x'], 'y':nodes[-1]['y']}
+
+            fromColor = color if fromNodeId == labelNodeId else nodes[graph.rows[fromNodeId]]['color']
+            edges.append({'from':fromNodeId,'to':toNodeId,'arrows':'to'})
+            cyEdges.append({'data':{'source':fromNodeId,'target':toNodeId,'weight':1,'color':self.edgeColor(fromColor),'arrow':'triangle-backcurve','sourceLabel':'','targetLabel':''}})
 
         if startNodeId:
-            nodes.append({'color':'green','id':f'start','label':'start','shape':'star','size':20,'title':'start','shape_cy':'star'})
-            edges.append({'from':f'start','to':startNodeId,'arrows':'to'})
+            addMarker('start', 'green', 'start', startNodeId)
 
         if endNodeId:
-            nodes.append({'color':'red','id':f'end','label':'end','shape':'star','size':20,'title':'end','shape_cy':'star'})
-            edges.append({'from':endNodeId,'to':f'end','arrows':'to'})
+            addMarker('end', 'red', endNodeId, 'end')
 
         for idx, nodeId in enumerate(inNodeIdList):
             if nodeId == startNodeId: continue
             labelNodeId = f'other_start_{idx+1}'
-            nodes.append({'color':'gray','id':labelNodeId,'label':labelNodeId,'shape':'star','size':20,'title':labelNodeId,'shape_cy':'star'})
-            edges.append({'from':labelNodeId,'to':nodeId,'arrows':'to'})
+            addMarker(labelNodeId, 'gray', labelNodeId, nodeId)
 
         for idx, nodeId in enumerate(outNodeIdList):
             if nodeId == endNodeId: continue
             labelNodeId = f'other_end_{idx+1}'
-            nodes.append({'color':'gray','id':labelNodeId,'label':labelNodeId,'shape':'star','size':20,'title':labelNodeId,'shape_cy':'star'})
-            edges.append({'from':nodeId,'to':labelNodeId,'arrows':'to'})
+            addMarker(labelNodeId, 'gray', nodeId, labelNodeId)
 
-        self.drawGraphResult = {'error':False, 'nodes_data':nodes,'edges_data':edges}
+        self.drawGraphResult = {'error':False, 'nodes_data':nodes,'edges_data':edges,'cy_data':cyNodes + cyEdges}
 
+    # Cytoscape elements of a drawGraphResult, made by genDrawGraphResult() along with the vis.js data
     def genCyDataFromDrawGraphResult(self, drawGraphResult):
-        cyData = []
-        outputNodeInfo = {}
-
-        nodes = drawGraphResult['nodes_data']
-        edges = self.drawGraphResult['edges_data']
-
-        for node in nodes:
-            size = node['size']
-            ele = {'data':{'id':node['id'],'name':node['id'],'weight':1,'size':size,'color':node['color'],'shape':node['shape_cy'],'title':node['title']}}
-            cyData.append(ele)
-
-            outputNodeInfo[node['id']] = ele
-
-        for edge in edges:
-            sourceLabel = edge['sourceLabel'] if 'sourceLabel' in edge else ''
-            targetLabel = edge['targetLabel'] if 'targetLabel' in edge else ''
-            color = outputNodeInfo[edge['from']]['data']['color']
-            # avoid too light color for edges
-            color = f'#{int(color[1:3],16)//2:02x}{int(color[3:5],16)//2:02x}{int(color[5:],16)//2:02x}' if color[0] == '#' else color
+        return drawGraphResult['cy_data']
+
+    # put the static files of static.zip in outdir for the HTML files to load: the zip is unpacked
+    # once into staticCacheDir/<zip hash> and its files are hard-linked into outdir (copied across
+    # file systems); outdir/static/.pgvstatic records the hash so that later plots skip this
+    def prepareStatic(self, zipFile):
+        stat = os.stat(zipFile)
+        key = (zipFile, stat.st_size, stat.st_mtime_ns)
+        if key not in self.staticHashes:
+            with open(zipFile, 'rb') as f:
+                self.staticHashes[key] = hashlib.sha1(f.read()).hexdigest()[:16]
+        zipHash = self.staticHashes[key]
+
+        marker = os.path.join(self.outdir, 'static', '.pgvstatic')
+        if os.path.isfile(marker):
+            with open(marker) as f:
+                if f.read() == zipHash:
+                    return
+
+        cacheDir = os.path.join(self.staticCacheDir, zipHash)
+        try:
+            if not os.path.isdir(cacheDir):
+                tmpDir = f'{cacheDir}.{os.getpid()}.tmp'
+                with zipfile.ZipFile(zipFile, 'r') as zip:
+                    zip.extractall(tmpDir)
+                try:
+                    os.rename(tmpDir, cacheDir)
+                except OSError:
+                    # unpacked by another process meanwhile
+                    rmtree(tmpDir, ignore_errors=True)
+        except OSError as e:
+            logging.warning(f'Static file cache not used: {e}')
+            with zipfile.ZipFile(zipFile, 'r') as zip:
+                zip.extractall(self.outdir)
+            return
 
-            if sourceLabel or targetLabel:
-                color = 'red'
+        for root, dirs, files in os.walk(cacheDir):
+            outRoot = os.path.join(self.outdir, os.path.relpath(root, cacheDir))
+            os.makedirs(outRoot, exist_ok=True)
+            for name in files:
+                src, dst = os.path.join(root, name), os.path.join(outRoot, name)
+                if os.path.lexists(dst):
+                    os.remove(dst)
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    copyfile(src, dst)
+
+        with open(marker, 'w') as f:
+            f.write(zipHash)
+
+    # literal text and placeholder names of a template, alternating, read once per template version
+    def templateParts(self, templateHtml):
+        key = (templateHtml, os.stat(templateHtml).st_mtime_ns)
+        if key not in self.templateCache:
+            with open(templateHtml) as f:
+                self.templateCache[key] = re.split(r'\{%(\w+)%\}', f.read())
+
+        return self.templateCache[key]
+
+    # write a template to outHtml with its placeholders filled in: str values as they are, other
+    # values as JSON
+    def renderTemplate(self, templateHtml, outHtml, values):
+        with open(outHtml, 'w') as f:
+            for i, part in enumerate(self.templateParts(templateHtml)):
+                if not i % 2:
+                    f.write(part)
+                elif part not in values:
+                    f.write(f'{{%{part}%}}')
+                elif isinstance(values[part], str):
+                    f.write(values[part])
+                else:
+                    self.writeJson(f, values[part])
 
-            arrow = 'triangle-backcurve'
-            ele = {'data':{'source':edge['from'],'target':edge['to'],'weight':1,'color':color,'arrow':arrow,'sourceLabel':sourceLabel,'targetLabel':targetLabel}}
-            cyData.append(ele)
+    # compact JSON of a value written straight into f, lists block by block so that the JSON of a
+    # whole graph is never held in memory
+    def writeJson(self, f, value):
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        blockSize = self.jsonBlockSize
 
-        return cyData
+        if isinstance(value, list) and len(value) > blockSize:
+            f.writelines(itertools.chain((('[' if not start else ',') + encode(value[start:start+blockSize])[1:-1]
+                                          for start in range(0, len(value), blockSize)), [']']))
+        else:
+            f.write(encode(value))
+
+    # the data file of a plot: a script calling loadGraphData() of the page with the given values;
+    # a script rather than a JSON file so that pages opened from disk can load it
+    def writeGraphData(self, dataJs, values):
+        with open(dataJs, 'w') as f:
+            f.write('loadGraphData({')
+            for i, key in enumerate(values):
+                f.write(f'{"," if i else ""}{json.dumps(key)}:')
+                self.writeJson(f, values[key])
+            f.write('});\n')
+
+    # the page of a plot, which only depends on the template and the settings: rendered once into
+    # outdir/static and hard-linked (or copied) to outHtml
+    def linkShell(self, templateHtml, outHtml, values):
+        key = json.dumps([templateHtml, os.stat(templateHtml).st_mtime_ns, values], sort_keys=True)
+        name = os.path.splitext(os.path.basename(templateHtml))[0]
+        shellHtml = os.path.join(self.outdir, 'static', f'{name}_{hashlib.sha1(key.encode()).hexdigest()[:16]}.html')
+
+        if not os.path.isfile(shellHtml):
+            self.renderTemplate(templateHtml, f'{shellHtml}.tmp', values)
+            os.replace(f'{shellHtml}.tmp', shellHtml)
+
+        if os.path.lexists(outHtml):
+            os.remove(outHtml)
+        try:
+            os.link(shellHtml, outHtml)
+        except OSError:
+            copyfile(shellHtml, outHtml)
 
     def genHtml(self, graph, posDict={}, outHtmlPrefix=None):
         genHtmlInfo = {'vis':{'template':os.path.join(os.path.dirname(os.path.realpath(__file__)),'template','htmlTemplate.html')}, \
@@ -1230,6 +2105,9 @@ class PanGraph:
                 modification.append('manipulation')
             filterInfo = f'true, "filter": {modification}'
 
+        zipFile = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'template', 'static.zip')
+        self.prepareStatic(zipFile)
+
         for libraryName in genHtmlInfo:
             htmlInfo = genHtmlInfo[libraryName]
 
@@ -1245,41 +2123,22 @@ class PanGraph:
 
             #logging.info(f'The template HTML file is: {templateHtml}')
 
-            zipFile = 'static.zip'
-            zipFile = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'template', zipFile)
-            with zipfile.ZipFile(zipFile, 'r') as zip:
-                zip.extractall(self.outdir)
+            # the graph goes to <page>.data.js, loaded by the page once it is shown
+            dataJs = f'{os.path.splitext(outHtml)[0]}.data.js'
+
+            if libraryName == 'vis' and len(graph) <= self.maxNodesDisplay:
+                self.writeGraphData(dataJs, {'title':title, 'nodes':nodes, 'edges':edges, 'colors':colors, 'shapes':shapes, 'has_reversed':hasReversed})
+                self.linkShell(templateHtml, outHtml, {'INFO':filterInfo, 'canvas_height':canvas_height, 'canvas_width':canvas_width})
+                logging.info(f'The output HTML file is: {outHtml}')
 
-            if libraryName == 'vis' and len(graph.nodes) <= self.maxNodesDisplay:
-                with open(templateHtml) as f_in, open(outHtml,'w') as f_out:
-                    data = f_in.read()
-                    data = data.replace('{%title%}', title)
-                    data = data.replace('{%INFO%}', filterInfo)
-                    data = data.replace('{%canvas_height%}', canvas_height)
-                    data = data.replace('{%canvas_width%}', canvas_width)
-                    data = data.replace('{%nodes%}', json.dumps(nodes))
-                    data = data.replace('{%edges%}', json.dumps(edges))
-                    data = data.replace('{%colors%}', json.dumps(colors))
-                    data = data.replace('{%shapes%}', json.dumps(shapes))
-                    data = data.replace('{%has_reversed%}', json.dumps(hasReversed))
-                    f_out.write(data)
-                    logging.info(f'The output HTML file is: {outHtml}')
-
-            if libraryName == 'cytoscape' and len(graph.nodes) > self.maxNodesDisplay:
-                with open(templateHtml) as f_in, open(outHtml,'w') as f_out:
-                    data = f_in.read()
-                    cyData = self.genCyDataFromDrawGraphResult(self.drawGraphResult)
-
-                    data = data.replace('{%title%}', title)
-                    data = data.replace('{%data%}', json.dumps(cyData, indent=4, sort_keys=True))
-                    data = data.replace('{%colors%}', json.dumps(colors))
-                    data = data.replace('{%shapes%}', json.dumps(shapes_cy))
-                    data = data.replace('{%has_reversed%}', json.dumps(hasReversed))
-                    f_out.write(data)
-                    logging.info(f'The output HTML file is: {outHtml}')
+            if libraryName == 'cytoscape' and len(graph) > self.maxNodesDisplay:
+                cyData = self.genCyDataFromDrawGraphResult(self.drawGraphResult)
+                self.writeGraphData(dataJs, {'title':title, 'data':cyData, 'colors':colors, 'shapes':shapes_cy, 'has_reversed':hasReversed})
+                self.linkShell(templateHtml, outHtml, {})
+                logging.info(f'The output HTML file is: {outHtml}')
 
         #return outFile
-        if len(graph.nodes) <= self.maxNodesDisplay:
+        if len(graph) <= self.maxNodesDisplay:
             return outFile['vis']
         else:
             return outFile['cytoscape']
@@ -1339,11 +2198,16 @@ if __name__=="__main__":
     parser.add_argument('-n', dest='nodeidlist', nargs='*', help='nodeID list', type=str)
     parser.add_argument('-b', dest='backbone', help='backbone', type=str)
 
-    parser.add_argument('-a', dest='action', help='action [parseRGFA, drawGraph]', type = str)
+    parser.add_argument('-a', dest='action', help='action [parseRGFA, drawGraph, buildIndex, buildPyramid]', type = str)
 
     args = parser.parse_args()
+    PanGraph.keepContigGraphs = False
 
-    if None not in [args.gfa, args.outdir]:
+    if args.action == 'buildIndex' and args.gfa:
+        RGFAIndex(args.gfa).build(nthread=PanGraph.nthread)
+    elif args.action == 'buildPyramid' and args.gfa:
+        RGFAPyramid(args.gfa).build(PanGraph.SN_delim, nthread=PanGraph.nthread)
+    elif None not in [args.gfa, args.outdir]:
         if args.action == 'drawGraph':
             panGraph = PanGraph(args.gfa, args.outdir, parseRGFA=False)
             #panGraph = PanGraph(args.gfa, args.outdir)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import mmap
+import time
+import logging
+import tempfile
+import tracemalloc
+
+from argparse import ArgumentParser
+
+try:
+    from scripts.rGFAFile import *
+except ModuleNotFoundError:
+    try:
+        from rGFAFile import *
+    except ModuleNotFoundError:
+        from pangraphviewer.rGFAFile import *
+
+#============================= Function =================================
+##logging info
+DEBUG="" #change it when debugging
+logFormat = "%(asctime)s [%(levelname)s] %(message)s"
+level = "DEBUG" if DEBUG != "" else "INFO"
+logging.basicConfig( stream=sys.stderr, level=level, format=logFormat )
+#========================================================================
+
+# S and L line parser shared by the rGFA readers
+#
+# lines are bytes as read from a file opened in 'rb' mode; the sequence field is
+# skipped without being decoded unless withSeq is set:
+#   parser = RGFAParser()
+#   nodeId, seq, seqFieldLen, tags = parser.parseS(line)
+#   fromNodeId, fromStrand, toNodeId, toStrand, overlap, tags = parser.parseL(line)
+# tag values are str; SN is split by SN_delim once with parser.splitSN(tags)
+#
+# P and W lines give (pathName, stepIds, stepStrands, pathStart) with RGFAParser.parsePath(line)
+#
+# parser.scan(gfa) walks a whole file and yields the parsed S and L lines with their
+# offsets; ordinary lines are read through the file buffer, lines longer than a block
+# are parsed in place through mmap so memory stays flat however long the S lines are.
+# RGFAParser(withEdgeTags=False) skips the L line tags for readers that do not need them
+#
+# RGFAParser.splitRanges(gfa, n) cuts a file at line boundaries into up to n byte
+# ranges to be scanned in parallel with parser.scan(gfa, start, end)
+
+class RGFAParser:
+    # S lines shorter than this are split whole, which is cheaper than locating the fields
+    shortLineLen = 1024
+    # scan() copies the file out of the mmap in blocks of whole lines of at most this size
+    blockSize = 1 << 22
+    # splitRanges() does not cut a file into ranges smaller than this
+    minRangeSize = 1 << 25
+
+    def __init__(self, SN_delim='||', withSeq=False, withEdgeTags=True):
+        self.SN_delim = SN_delim
+        self.withSeq = withSeq
+        self.withEdgeTags = withEdgeTags
+
+    @staticmethod
+    def parseTags(fields):
+        tags = {}
+        for val in fields:
+            lst = val.split(':', 2)
+            tags[lst[0]] = lst[2]
+
+        return tags
+
+    # (nodeId, seq, seqFieldLen, tags) of an S line; seq is None unless withSeq
+    def parseS(self, line):
+        if len(line) >= self.shortLineLen:
+            return self.parseLongS(line, 0, len(line))
+
+        # only the node ID and the tag segment are decoded
+        row = line.split(b'\t', 3)
+        tags = {}
+        if len(row) > 3:
+            seq = row[2]
+            # same as parseTags(), inlined for short lines
+            for val in row[3].decode().rstrip().split('\t'):
+                lst = val.split(':', 2)
+                tags[lst[0]] = lst[2]
+        else:
+            seq = row[2].rstrip()
+
+        return row[1].decode(), seq.decode() if self.withSeq else None, len(seq), tags
+
+    # (fromNodeId, fromStrand, toNodeId, toStrand, overlap, tags) of an L line; tags is
+    # empty unless withEdgeTags
+    def parseL(self, line):
+        if not self.withEdgeTags:
+            row = line.decode().rstrip().split('\t', 6)
+            return row[1], row[2], row[3], row[4], row[5] if len(row) > 5 else '', {}
+
+        row = line.decode().strip().split('\t')
+
+        tags = {}
+        for val in row[6:]:
+            lst = val.split(':', 2)
+            tags[lst[0]] = lst[2]
+
+        return row[1], row[2], row[3], row[4], row[5] if len(row) > 5 else '', tags
+
+    # (pathName, stepIds, stepStrands, pathStart) of a P or W line: the step node IDs as bytes,
+    # stepStrands having 1 for each '-' (or '<') step; W lines are named sample#hapIndex#seqId
+    # and start at their seqStart, P lines at 0
+    @staticmethod
+    def parsePath(line):
+        row = line.rstrip().split(b'\t')
+        if row[0] == b'P':
+            steps = row[2].split(b',') if row[2] != b'*' else []
+            return row[1].decode(), [step[:-1] for step in steps], bytes(step[-1:] == b'-' for step in steps), 0
+
+        walk = re.split(rb'([<>])', row[6])
+        return b'#'.join(row[1:4]).decode(), walk[2::2], bytes(strand == b'<' for strand in walk[1::2]), \
+               int(row[4]) if row[4] != b'*' else 0
+
+    # SN value split by SN_delim
+    def splitSN(self, tags):
+        return tags['SN'].split(self.SN_delim) if 'SN' in tags else ['']
+
+    # (lineNum, lineOffset, lineLen, lineType, fields) of each S and L line of a file,
+    # fields being the parseS() or parseL() tuple; lines of the other types in rawTypes
+    # (such as b'LPW') are yielded too, fields being the line itself. start and end must
+    # be line boundaries and lineNum counts from start
+    def scan(self, path, start=0, end=None, rawTypes=b''):
+        if not os.path.getsize(path):
+            return
+
+        rawTypes = [rawTypes[i:i+1] for i in range(len(rawTypes))]
+
+        # compressed files are read block by block
+        if isGzip(path):
+            for lineNum, (lineOffset, line) in enumerate(scanLines(path, start, end)):
+                lineType = line[:1]
+                if lineType in rawTypes:
+                    yield lineNum, lineOffset, len(line), lineType.decode(), line
+                elif lineType == b'S':
+                    yield lineNum, lineOffset, len(line), 'S', self.parseS(line)
+                elif lineType == b'L':
+                    yield lineNum, lineOffset, len(line), 'L', self.parseL(line)
+            return
+
+        # lines are read through the file buffer; the mmap tells whether the next block has
+        # a line end, a line longer than a block being parsed in place instead
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm) if end is None else min(end, len(mm))
+            lineNum, pos = 0, start
+            while pos < size:
+                blockEnd = mm.rfind(b'\n', pos, min(pos+self.blockSize, size)) + 1
+
+                if not blockEnd:
+                    lineEnd = mm.find(b'\n', pos, size)
+                    lineEnd = size if lineEnd < 0 else lineEnd + 1
+                    lineType = mm[pos:pos+1]
+                    if lineType in rawTypes:
+                        yield lineNum, pos, lineEnd - pos, lineType.decode(), mm[pos:lineEnd]
+                    elif lineType == b'S':
+                        yield lineNum, pos, lineEnd - pos, 'S', self.parseLongS(mm, pos, lineEnd)
+                    elif lineType == b'L':
+                        yield lineNum, pos, lineEnd - pos, 'L', self.parseL(mm[pos:lineEnd])
+
+                    lineNum += 1
+                    pos = lineEnd
+                    continue
+
+                f.seek(pos)
+                for line in f:
+                    lineLen = len(line)
+                    lineType = line[:1]
+                    if lineType in rawTypes:
+                        yield lineNum, pos, lineLen, lineType.decode(), line
+                    elif lineType == b'S':
+                        yield lineNum, pos, lineLen, 'S', self.parseS(line)
+                    elif lineType == b'L':
+                        yield lineNum, pos, lineLen, 'L', self.parseL(line)
+
+                    lineNum += 1
+                    pos += lineLen
+                    if pos >= blockEnd:
+                        break
+
+    # up to n (start, end) byte ranges covering a file, cut at line boundaries;
+    # virtual offsets for BGZF files
+    @classmethod
+    def splitRanges(cls, path, n):
+        size = os.path.getsize(path)
+        n = max(1, min(n, size // cls.minRangeSize))
+
+        bounds = [0]
+        if isBgzf(path):
+            with BgzfReader(path) as f:
+                for i in range(1, n):
+                    bounds.append(max(f.lineStartAfter(size * i // n), bounds[-1]))
+            bounds.append(size << 16)
+        else:
+            with open(path, 'rb') as f:
+                for i in range(1, n):
+                    f.seek(max(size * i // n, bounds[-1]))
+                    f.readline()
+                    if f.tell() < size:
+                        bounds.append(f.tell())
+            bounds.append(size)
+
+        return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if start < end]
+
+    # same as parseS() for the S line at buf[start:end], only the id and tags being copied out of buf
+    def parseLongS(self, buf, start, end):
+        idEnd = buf.find(b'\t', start+2, end)
+        seqEnd = buf.find(b'\t', idEnd+1, end)
+        tags = {}
+        if seqEnd < 0:
+            seqEnd = end
+            while seqEnd > idEnd+1 and buf[seqEnd-1] in b' \t\r\n':
+                seqEnd -= 1
+        else:
+            for val in buf[seqEnd+1:end].decode().rstrip().split('\t'):
+                lst = val.split(':', 2)
+                tags[lst[0]] = lst[2]
+
+        seq = buf[idEnd+1:seqEnd].decode() if self.withSeq else None
+
+        return buf[start+2:idEnd].decode(), seq, seqEnd - idEnd - 1, tags
+
+    # first and last n bases of the sequence field of an S line
+    @staticmethod
+    def seqEnds(line, n):
+        idEnd = line.index(b'\t', 2)
+        seqEnd = line.find(b'\t', idEnd+1)
+        if seqEnd < 0:
+            seqEnd = len(line.rstrip())
+
+        seqStart = idEnd + 1
+        return line[seqStart:min(seqStart+n, seqEnd)].decode(), line[max(seqEnd-n, seqStart):seqEnd].decode()
+
+# per-line time of the former split loops of the readers and of RGFAParser
+def benchmark(gfa=None, nLines=200000, seqLen=1000, SN_delim='||', repeat=5):
+    if gfa:
+        with open(gfa, 'rb') as f:
+            lines = [line for _, line in zip(range(nLines), f) if line[:1] in b'SL']
+    else:
+        seq = b'ACGT' * (seqLen // 4)
+        lines = [b'S\ts%d\t%s\tLN:i:%d\tSN:Z:bk||Chr01\tSO:i:%d\tSR:i:0\n' % (i, seq, len(seq), i*len(seq)) for i in range(nLines)]
+        lines += [b'L\ts%d\t+\ts%d\t+\t0M\tSR:i:0\n' % (i, i+1) for i in range(nLines)]
+
+    # the S line handling of loadRGFA() before RGFAParser
+    def splitLoop(lines):
+        for line in lines:
+            row = line.decode().strip().split('\t')
+            if row[0] == 'S':
+                tags = {}
+                for val in row[3:]:
+                    lst = val.split(':')
+                    tags[lst[0]] = lst[2]
+
+                seqLen = int(tags['LN']) if 'LN' in tags else len(row[2])
+                res = tags['SN'] if 'SN' in tags else ''
+                if len(res.split(SN_delim)) >= 2:
+                    if 'SR' in tags:
+                        sample = res.split(SN_delim)[0] if tags['SR'] == '0' else 'Samples'
+                    else:
+                        sample = res.split(SN_delim)[0]
+                    contig = res.split(SN_delim)[1]
+                else:
+                    sample = res.split(SN_delim)[0]
+                    contig = res
+            else:
+                tags = {val.split(':')[0]:val.split(':')[2] for val in row[6:]}
+
+    parser = RGFAParser(SN_delim)
+    def parserLoop(lines):
+        for line in lines:
+            if line[:1] == b'S':
+                nodeId, seq, seqFieldLen, tags = parser.parseS(line)
+
+                seqLen = int(tags['LN']) if 'LN' in tags else seqFieldLen
+                sn = tags['SN'].split(SN_delim) if 'SN' in tags else ['']
+                if len(sn) >= 2:
+                    sample = sn[0] if tags.get('SR', '0') == '0' else 'Samples'
+                    contig = sn[1]
+                else:
+                    sample, contig = sn[0], sn[0]
+            else:
+                parser.parseL(line)
+
+    results = {}
+    for name in ['S', 'L']:
+        typeLines = [line for line in lines if line[:1] == name.encode()]
+        if not typeLines: continue
+
+        # best of repeat interleaved runs, so that a busy machine does not favour either loop
+        for _ in range(repeat):
+            for method, func in [('split', splitLoop), ('parser', parserLoop)]:
+                start = time.perf_counter()
+                func(typeLines)
+                perLine = (time.perf_counter() - start) / len(typeLines) * 1e6
+                results[(name, method)] = min(results.get((name, method), perLine), perLine)
+
+        logging.info(f'{name} lines: {len(typeLines)}, split loop: {results[(name, "split")]:.2f} us/line, '
+                     f'RGFAParser: {results[(name, "parser")]:.2f} us/line, '
+                     f'speedup: {results[(name, "split")] / results[(name, "parser")]:.2f}x')
+
+    # whole file tag-only pass: the former text mode loop, binary line iteration and scan()
+    if gfa:
+        scanFile = gfa
+    else:
+        with tempfile.NamedTemporaryFile(suffix='.gfa', delete=False) as f:
+            f.writelines(lines)
+        scanFile = f.name
+
+    # the line handling of parseRGFA() before RGFAParser, which did not need the L line tags
+    def textLoop(path):
+        with open(path) as f:
+            for line in f:
+                if line[0] == 'S':
+                    row = line.strip().split('\t')
+                    tags = {}
+                    for val in row[3:]:
+                        lst = val.split(':')
+                        tags[lst[0]] = lst[2]
+                elif line[0] == 'L':
+                    row = line.split()
+
+    scanParser = RGFAParser(SN_delim, withEdgeTags=False)
+    def readLoop(path):
+        with open(path, 'rb') as f:
+            for line in f:
+                if line[:1] == b'S':
+                    scanParser.parseS(line)
+                elif line[:1] == b'L':
+                    scanParser.parseL(line)
+
+    def scanLoop(path):
+        for _ in scanParser.scan(path): pass
+
+    methods = [('text', textLoop), ('read', readLoop), ('scan', scanLoop)]
+    try:
+        # times are taken without tracemalloc, which slows down allocation heavy loops
+        for _ in range(repeat):
+            for method, func in methods:
+                start = time.perf_counter()
+                func(scanFile)
+                elapsed = time.perf_counter() - start
+                results[('file', method)] = min(results.get(('file', method), elapsed), elapsed)
+
+        for method, func in methods:
+            tracemalloc.start()
+            func(scanFile)
+            results[('peak', method)] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        logging.info('file pass: ' + ', '.join(f'{name}: {results[("file", method)]:.2f} s, peak {results[("peak", method)]/1e6:.1f} MB'
+                                              for name, method in [('text mode loop', 'text'), ('binary loop', 'read'), ('scan', 'scan')]))
+    finally:
+        if not gfa:
+            os.remove(scanFile)
+
+    return results
+
+def main():
+    parser = ArgumentParser(description='Micro-benchmark of the rGFA line parser')
+    parser.add_argument("-g", dest="gfa", help="rGFA file to take lines from; synthetic lines if not given")
+    parser.add_argument("-n", dest="nLines", type=int, default=200000, help="number of lines")
+    parser.add_argument("-s", dest="seqLen", type=int, default=1000, help="sequence length of synthetic S lines")
+    parser.add_argument("-r", dest="repeat", type=int, default=5, help="number of timed runs of each loop, the best being reported")
+    args = parser.parse_args()
+
+    if args.gfa and not os.path.isfile(args.gfa):
+        logging.error(f'{args.gfa} does not exist')
+        sys.exit(1)
+
+    benchmark(args.gfa, args.nLines, args.seqLen, repeat=args.repeat)
+
+if __name__ == "__main__":
+    sys.exit(main())
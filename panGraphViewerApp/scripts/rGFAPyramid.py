@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import logging
+
+import numpy as np
+
+try:
+    from scripts.rGFAIndex import *
+    from scripts.rGFAGraph import *
+except ModuleNotFoundError:
+    try:
+        from rGFAIndex import *
+        from rGFAGraph import *
+    except ModuleNotFoundError:
+        from pangraphviewer.rGFAIndex import *
+        from pangraphviewer.rGFAGraph import *
+
+#============================= Function =================================
+##logging info
+DEBUG="" #change it when debugging
+logFormat = "%(asctime)s [%(levelname)s] %(message)s"
+level = "DEBUG" if DEBUG != "" else "INFO"
+logging.basicConfig( stream=sys.stderr, level=level, format=logFormat )
+#========================================================================
+
+# zoom levels of an rGFA file for whole-contig views, saved as <gfa>.pgvpyr and built
+# offline from the index (panGraph.py -a buildPyramid)
+#
+# for each bin size of binSizes the backbone contigs are cut into bins [k*binSize+1,
+# (k+1)*binSize]; a node is counted in the bin of its drawing position (see
+# rGFAGraph.nodeCoordinates()) on the contig of the backbone node it is placed after, and
+# nodes no backbone node leads to are left out. arrays of level i:
+#   L<i>_contig, L<i>_bin: the non-empty bins, sorted by contig and bin; the bins of contig c
+#     are [L<i>_contigOffset[c], L<i>_contigOffset[c+1])
+#   L<i>_start, L<i>_end: span of the nodes of each bin
+#   L<i>_countBin, L<i>_countSample, L<i>_countSvType, L<i>_count: number of nodes of each
+#     bin, sample and SV type
+#   L<i>_edgeFrom, L<i>_edgeTo, L<i>_edgeCount: bins linked by edges, with the number of edges
+# samples are named as in PanGraph, rank > 0 nodes with a two-part SN being 'Samples'; the SV
+# type is from INF, 'BB' for backbone nodes and 'other' for other nodes without INF
+
+class RGFAPyramid:
+    ext = '.pgvpyr'
+    version = 1
+    binSizes = [1000000, 100000, 10000]
+
+    # recently loaded pyramids, keyed by pyramid file
+    cache = {}
+    cacheSize = 2
+
+    def __init__(self, gfa):
+        self.gfa = gfa
+        self.pyramidFile = f'{gfa}{self.ext}'
+        self.meta = None
+        self.data = None
+
+    # the saved pyramid of an rGFA file if it is up to date, else None; pyramids are only
+    # built on request, by build()
+    @classmethod
+    def open(cls, gfa, SN_delim):
+        if not gfa or not os.path.isfile(gfa):
+            return None
+
+        pyramid = cls(gfa)
+        fileStat = pyramid.fileStat()
+
+        cached = cls.cache.get(pyramid.pyramidFile)
+        if cached and cached.meta['fileStat'] == fileStat and cached.meta['SN_delim'] == SN_delim:
+            return cached
+
+        if not os.path.isfile(pyramid.pyramidFile):
+            return None
+
+        try:
+            pyramid.load()
+        except Exception as e:
+            logging.warning(f'Cannot load zoom levels {pyramid.pyramidFile}: {e}')
+            return None
+
+        meta = pyramid.meta
+        if meta['version'] != cls.version or meta['fileStat'] != fileStat or meta['SN_delim'] != SN_delim:
+            logging.info(f'Zoom levels {pyramid.pyramidFile} are out of date; rebuild them with "panGraph.py -a buildPyramid"')
+            return None
+
+        if len(cls.cache) >= cls.cacheSize:
+            del cls.cache[next(iter(cls.cache))]
+        cls.cache[pyramid.pyramidFile] = pyramid
+
+        return pyramid
+
+    def fileStat(self):
+        stat = os.stat(self.gfa)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def build(self, SN_delim, nthread=1, save=True):
+        index = RGFAIndex.open(self.gfa, build=True, nthread=nthread)
+        logging.info(f'Building zoom levels for {self.gfa}')
+
+        data = index.data
+        n = len(index)
+        rank, sn, lenBefore, seqLen = data['rank'], data['sn'], data['lenBefore'], data['seqLen']
+        isBackbone = rank == 0
+
+        # sample and contig of each SN value
+        sampleNames, contigNames = {}, {}
+        snSample, snOtherSample, snContig = [], [], []
+        for res in index.meta['SN']:
+            lst = res.split(SN_delim)
+            snSample.append(sampleNames.setdefault(lst[0], len(sampleNames)))
+            snOtherSample.append(sampleNames.setdefault('Samples', len(sampleNames)) if len(lst) >= 2 else snSample[-1])
+            snContig.append(contigNames.setdefault(lst[1] if len(lst) >= 2 else res, len(contigNames)))
+        snSample, snOtherSample, snContig = (np.array(lst, dtype=np.int64) for lst in [snSample, snOtherSample, snContig])
+        sample = np.where(rank > 0, snOtherSample[sn], snSample[sn])
+
+        # SV type of each node
+        svTypeNames = {'BB':0, 'other':1}
+        svType = np.where(isBackbone, 0, 1)
+        infOffset, infData = data['infOffset'], data['infData'].tobytes()
+        for idx in np.flatnonzero(np.diff(infOffset)).tolist():
+            lst = infData[infOffset[idx]:infOffset[idx+1]].decode().split(SN_delim)
+            name = lst[1] if lst[0] == 'SV' and len(lst) >= 2 else lst[0]
+            svType[idx] = svTypeNames.setdefault(name, len(svTypeNames))
+
+        # drawing position and contig of each node
+        edgeFrom, edgeTo = drawingEdges(data['edgeFrom'], data['edgeTo'], data['edgeStrand'], isBackbone)
+        posStart, posEnd, anchor = nodeCoordinates(n, edgeFrom, edgeTo, isBackbone, lenBefore + 1, lenBefore + seqLen, withAnchor=True)
+        placed = np.flatnonzero(anchor >= 0)
+        contig = snContig[sn[anchor[placed]]]
+
+        self.meta = {'version':self.version, 'fileStat':self.fileStat(), 'SN_delim':SN_delim,
+                     'binSizes':self.binSizes, 'contigs':list(contigNames), 'samples':list(sampleNames), 'svTypes':list(svTypeNames),
+                     'backbones':sorted({index.meta['SN'][code].split(SN_delim)[0] for code in np.unique(sn[isBackbone]).tolist()})}
+        self.data = {}
+
+        for level, binSize in enumerate(self.binSizes):
+            # bins of the placed nodes
+            binKey = contig * (int(posStart.max()) // binSize + 1) + (posStart[placed] - 1) // binSize
+            keys, row = np.unique(binKey, return_inverse=True)
+            row = row.reshape(-1)
+            binContig = contig[np.unique(row, return_index=True)[1]]
+            binStart = np.full(len(keys), np.iinfo(np.int64).max, dtype=np.int64)
+            binEnd = np.zeros(len(keys), dtype=np.int64)
+            np.minimum.at(binStart, row, posStart[placed])
+            np.maximum.at(binEnd, row, posEnd[placed])
+
+            # nodes per bin, sample and SV type
+            countKey = (row * len(sampleNames) + sample[placed]) * len(svTypeNames) + svType[placed]
+            countKey, count = np.unique(countKey, return_counts=True)
+
+            # edges between bins
+            nodeRow = np.full(n, -1, dtype=np.int64)
+            nodeRow[placed] = row
+            fromRow, toRow = nodeRow[edgeFrom], nodeRow[edgeTo]
+            keep = (fromRow >= 0) & (toRow >= 0) & (fromRow != toRow)
+            edgeKey, edgeCount = np.unique(fromRow[keep] * len(keys) + toRow[keep], return_counts=True)
+
+            prefix = f'L{level}_'
+            self.data.update({
+                f'{prefix}contig':binContig,
+                f'{prefix}bin':(binStart - 1) // binSize,
+                f'{prefix}contigOffset':np.searchsorted(binContig, np.arange(len(contigNames)+1)),
+                f'{prefix}start':binStart,
+                f'{prefix}end':binEnd,
+                f'{prefix}countBin':countKey // len(svTypeNames) // len(sampleNames),
+                f'{prefix}countSample':countKey // len(svTypeNames) % len(sampleNames),
+                f'{prefix}countSvType':countKey % len(svTypeNames),
+                f'{prefix}count':count,
+                f'{prefix}edgeFrom':edgeKey // max(len(keys), 1),
+                f'{prefix}edgeTo':edgeKey % max(len(keys), 1),
+                f'{prefix}edgeCount':edgeCount,
+            })
+            logging.info(f'zoom level {level}: {binSize} bp bins, {len(keys)} bins, {len(edgeKey)} links')
+
+        if save:
+            self.save()
+
+    def save(self):
+        tmpFile = f'{self.pyramidFile}.tmp'
+        try:
+            with open(tmpFile, 'wb') as f:
+                meta = np.frombuffer(json.dumps(self.meta).encode(), dtype=np.uint8)
+                np.savez(f, meta=meta, **self.data)
+            os.replace(tmpFile, self.pyramidFile)
+            logging.info(f'Zoom levels saved to {self.pyramidFile}')
+        except OSError as e:
+            logging.warning(f'Cannot save zoom levels {self.pyramidFile}: {e}')
+            try:
+                os.remove(tmpFile)
+            except OSError:
+                pass
+
+    def load(self):
+        with np.load(self.pyramidFile) as npz:
+            data = {key:npz[key] for key in npz.files}
+
+        self.meta = json.loads(data.pop('meta').tobytes().decode())
+        self.data = data
+
+    # bin rows of a level overlapping [start, end] of a contig, a missing bound not being checked
+    def bins(self, level, contig, start=None, end=None):
+        if contig not in self.meta['contigs']:
+            return np.zeros(0, dtype=np.int64)
+
+        prefix, binSize = f'L{level}_', self.meta['binSizes'][level]
+        code = self.meta['contigs'].index(contig)
+        lo, hi = self.data[f'{prefix}contigOffset'][code:code+2]
+        binIdx = self.data[f'{prefix}bin'][lo:hi]
+        if end:
+            hi = lo + np.searchsorted(binIdx, (end - 1) // binSize, side='right')
+        if start:
+            lo += np.searchsorted(binIdx, (start - 1) // binSize, side='left')
+
+        return np.arange(lo, max(lo, hi))
+
+    # number of nodes of the given samples (all if None) in a region, from the finest level
+    def nodeCount(self, contig, start=None, end=None, sampleList=None):
+        level = len(self.meta['binSizes']) - 1
+        rows = self.bins(level, contig, start, end)
+        countIdx = self.countsOf(level, rows, sampleList)
+
+        return int(self.data[f'L{level}_count'][countIdx].sum())
+
+    # indices into the count arrays of a level for the given bin rows and samples
+    def countsOf(self, level, rows, sampleList=None):
+        prefix = f'L{level}_'
+        countBin = self.data[f'{prefix}countBin']
+        countIdx = gatherRanges(np.searchsorted(countBin, rows, side='left'), np.searchsorted(countBin, rows, side='right'))
+        if sampleList is not None:
+            sampleOK = np.array([sample in sampleList for sample in self.meta['samples']], dtype=bool)
+            countIdx = countIdx[sampleOK[self.data[f'{prefix}countSample'][countIdx]]]
+
+        return countIdx
+
+    # the finest level with at most maxBins bins in a region, else the coarsest, with the bin rows
+    def pickLevel(self, contig, start=None, end=None, maxBins=None):
+        for level in reversed(range(len(self.meta['binSizes']))):
+            rows = self.bins(level, contig, start, end)
+            if not maxBins or len(rows) <= maxBins or not level:
+                return level, rows
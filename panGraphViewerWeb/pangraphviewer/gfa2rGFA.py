@@ -13,11 +13,17 @@ import json
 # to_be_fix
 try:
     from scripts.utilities import *
+    from scripts.rGFAParser import *
+    from scripts.rGFAFile import *
 except ModuleNotFoundError:
     try:
         from utilities import *
+        from rGFAParser import *
+        from rGFAFile import *
     except ModuleNotFoundError:
         from pangraphviewer.utilities import *
+        from pangraphviewer.rGFAParser import *
+        from pangraphviewer.rGFAFile import *
 
 #============================= Function =================================
 ##logging info
@@ -36,7 +42,7 @@ class GFA2rGFA:
 
     #@staticmethod
     def checkGfaFormat(self):
-        formats = {'RGFA':{'headers':'SLW','tags':['LN','SN','SO','SR','INF'],'must_headers':'S','must_tags':['SN','SO','SR']},
+        formats = {'RGFA':{'headers':'SLPW','tags':['LN','SN','SO','SR','INF'],'must_headers':'S','must_tags':['SN','SO','SR']},
                    'GFA1':{'headers':'#HSLCPW','tags':['LN','RC','FC','KC','SH','UR'],'must_headers':'S','must_tags':[]}}
         headers, tags = {}, {}
 
@@ -45,9 +51,10 @@ class GFA2rGFA:
         except:
             nLines = 10
 
-        with open(self.in_gfa) as f:
+        with openRGFA(self.in_gfa) as f:
             n = 0
             for line in f:
+                line = line.decode()
                 if not line.strip() or line[0] == '#':
                     continue
 
@@ -78,46 +85,43 @@ class GFA2rGFA:
         return_code = {'error':''}
 
         defaultName = {'backbone':'backbone','non-backbone':'non-backbone','contig':'contig'}
-        S, L, P  = {}, [], {}
+        S, L, P, W  = {}, [], {}, []
 
         rect = 0
-        with open(self.in_gfa) as f:
+        parser = RGFAParser(self.SN_delim, withSeq=True)
+        with openRGFA(self.in_gfa) as f:
             lineNum = 0
             try:
                 for line in f:
                     lineNum += 1
 
-                    if not line.strip() or line[0] == '#':
-                        continue
-                    row = line.strip().split()
-                    if not row or row[0] not in ['L','S','P']:
+                    if line[:1] not in [b'L',b'S',b'P',b'W']:
                         continue
 
-                    if row[0] == 'S':
-                        if len(row) < 3:
+                    if line[:1] == b'S':
+                        if line.strip().count(b'\t') < 2:
                             logging.error(f'missing field in line {lineNum}. Abort!')
                             rect = 4
 
-                        nodeId, seq = row[1], row[2]
+                        nodeId, seq, seqFieldLen, tag = parser.parseS(line)
 
                         S[nodeId] = {'seq':seq}
-                        tag = {}
-                        for col in row[3:]:
-                            tag[col.split(':')[0]] = col.split(':')[2]
 
                         if seq == '*' and 'LN' not in tag:
                             logging.error(f'both seq and LN tag are missing in line {lineNum}. Abort!')
                             rect = 5
 
                         S[nodeId]['len'] = int(tag['LN']) if 'LN' in tag else len(S[nodeId]['seq'])
-                    elif row[0] == 'L':
-                        try:
-                            cigar = row[5]
-                        except:
-                            cigar = ''
-                        L.append({'fromNodeId':f'{row[1]}{row[2]}','toNodeId':f'{row[3]}{row[4]}','cigar':cigar})
-                    elif row[0] == 'P':
-                        P[row[1]] = {'path':row[2].split(','),'cigar':row[3].split(',')}
+                    elif line[:1] == b'L':
+                        fromNodeId, fromStrand, toNodeId, toStrand, cigar, tag = parser.parseL(line)
+                        L.append({'fromNodeId':f'{fromNodeId}{fromStrand}','toNodeId':f'{toNodeId}{toStrand}','cigar':cigar})
+                    elif line[:1] == b'P':
+                        row = line.decode().strip().split()
+                        P[row[1]] = {'path':row[2].split(','),'cigar':row[3]}
+                    elif line[:1] == b'W':
+                        # walks are only carried over to the rGFA, with the steps as parsed
+                        pathName, stepIds, stepStrands, pathStart = parser.parsePath(line)
+                        W.append({'fields':line.decode().strip().split('\t')[1:6],'path':[stepId.decode() for stepId in stepIds],'strand':stepStrands})
             except:
                 logging.error(f'The file is in GFA v1, but error occurs during conversion at line {lineNum}. Abort!')
                 rect = 6 
@@ -134,13 +138,22 @@ class GFA2rGFA:
         for pathName in P:
             for idx, nodeId2 in enumerate(P[pathName]['path']):
                 nodeId, strand = nodeId2[:-1], nodeId2[-1]
-                if strand == '-':
+                if strand == '-' and nodeId in S:
                     newId = f'{nodeId}*'
                     S[newId] = {'seq':rev_comp(S[nodeId]['seq']),'len':S[nodeId]['len']}
                     del S[nodeId]
 
                     P[pathName]['path'][idx] = f'{newId}+'
 
+        # steps on nodes replaced by their reverse complement above, eg. 12- to 12*+, 12+ to 12*-
+        def renameStep(nodeId, strand):
+            if nodeId not in S and f'{nodeId}*' in S:
+                return f'{nodeId}*', '+' if strand == '-' else '-'
+            return nodeId, strand
+
+        for pathName in P:
+            P[pathName]['path'] = [''.join(renameStep(nodeId2[:-1], nodeId2[-1])) for nodeId2 in P[pathName]['path']]
+
         # update L
         for idx, edge in enumerate(L):
             fromNodeId, toNodeId = edge['fromNodeId'], edge['toNodeId']
@@ -223,6 +236,15 @@ class GFA2rGFA:
                 field = ['L', fromNodeId, fromStrand, toNodeId, toStrand, cigar]
                 print('\t'.join(field), file=f)
 
+            for pathName in P:
+                field = ['P', pathName, ','.join(P[pathName]['path']), P[pathName]['cigar']]
+                print('\t'.join(field), file=f)
+
+            for walk in W:
+                steps = [renameStep(nodeId, '-' if isRev else '+') for nodeId, isRev in zip(walk['path'], walk['strand'])]
+                field = ['W'] + walk['fields'] + [''.join(f"{'<' if strand == '-' else '>'}{nodeId}" for nodeId, strand in steps)]
+                print('\t'.join(field), file=f)
+
         return {}
 
 if __name__=="__main__":
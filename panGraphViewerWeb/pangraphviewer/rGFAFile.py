@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import zlib
+import struct
+import logging
+
+#============================= Function =================================
+##logging info
+DEBUG="" #change it when debugging
+logFormat = "%(asctime)s [%(levelname)s] %(message)s"
+level = "DEBUG" if DEBUG != "" else "INFO"
+logging.basicConfig( stream=sys.stderr, level=level, format=logFormat )
+#========================================================================
+
+# plain or bgzip-compressed (BGZF) rGFA files behind one interface
+#
+# with openRGFA(gfa) as f: f.seek(offset); line = f.readline()
+#
+# offsets of a BGZF file are virtual offsets, (compressed block start << 16) | offset
+# in the uncompressed block, as in tabix/samtools; they increase along the file like
+# plain offsets, so sorting them still gives file order, but they cannot be added to.
+# f.seek(n, 1) skips n uncompressed bytes in either kind of file
+
+bgzfMagic = b'\x1f\x8b\x08\x04'
+
+def isGzip(path):
+    with open(path, 'rb') as f:
+        return f.read(2) == bgzfMagic[:2]
+
+def isBgzf(path):
+    with open(path, 'rb') as f:
+        header = f.read(18)
+
+    return header[:4] == bgzfMagic and header[12:14] == b'BC'
+
+def openRGFA(path):
+    if isBgzf(path):
+        return BgzfReader(path)
+    if isGzip(path):
+        raise ValueError(f'{path} is gzip-compressed but not by bgzip; please recompress it with "bgzip" for random access')
+
+    return open(path, 'rb')
+
+# (offset, line) of the lines in [start, end) of a file; start and end must be line starts
+def scanLines(path, start=0, end=None):
+    if isBgzf(path):
+        with BgzfReader(path) as f:
+            f.seek(start)
+            for offset, line in f.iterLines():
+                if end is not None and offset >= end:
+                    break
+                yield offset, line
+        return
+
+    offset = start
+    with openRGFA(path) as f:
+        f.seek(start)
+        for line in f:
+            if end is not None and offset >= end:
+                break
+            yield offset, line
+            offset += len(line)
+
+class BgzfReader:
+    # decompressed blocks kept for seeks back into recently read blocks
+    cacheSize = 16
+
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'rb')
+        self.size = os.path.getsize(path)
+        self.cache = {}
+        self.blockStart, self.blockNext, self.data, self.pos = 0, 0, b'', 0
+        self.loadBlock(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.f.close()
+
+    # decompressed data and compressed size of the block at blockStart
+    def readBlock(self, blockStart):
+        if blockStart in self.cache:
+            return self.cache[blockStart]
+
+        self.f.seek(blockStart)
+        header = self.f.read(12)
+        if len(header) < 12:
+            return b'', 0
+        if header[:4] != bgzfMagic:
+            raise ValueError(f'{self.path}: no BGZF block at offset {blockStart}')
+
+        xlen = struct.unpack('<H', header[10:12])[0]
+        extra = self.f.read(xlen)
+        blockSize = None
+        pos = 0
+        while pos + 4 <= xlen:
+            slen = struct.unpack('<H', extra[pos+2:pos+4])[0]
+            if extra[pos:pos+2] == b'BC':
+                blockSize = struct.unpack('<H', extra[pos+4:pos+6])[0] + 1
+            pos += 4 + slen
+        if blockSize is None:
+            raise ValueError(f'{self.path}: BGZF block at offset {blockStart} has no block size')
+
+        data = zlib.decompress(self.f.read(blockSize - 12 - xlen - 8), -15)
+
+        if len(self.cache) >= self.cacheSize:
+            del self.cache[next(iter(self.cache))]
+        self.cache[blockStart] = (data, blockSize)
+
+        return data, blockSize
+
+    def loadBlock(self, blockStart):
+        self.data, blockSize = self.readBlock(blockStart)
+        self.blockStart, self.blockNext, self.pos = blockStart, blockStart + blockSize, 0
+
+    # move to the next block with data; False at the end of the file
+    def nextBlock(self):
+        while self.blockNext < self.size:
+            self.loadBlock(self.blockNext)
+            if self.data:
+                return True
+
+        return False
+
+    def tell(self):
+        if self.pos >= len(self.data):
+            self.nextBlock()
+
+        return (self.blockStart << 16) | self.pos
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            while offset > 0 and (self.pos < len(self.data) or self.nextBlock()):
+                skip = min(offset, len(self.data) - self.pos)
+                self.pos += skip
+                offset -= skip
+        else:
+            blockStart = offset >> 16
+            if blockStart != self.blockStart or not self.blockNext:
+                self.loadBlock(blockStart)
+            self.pos = offset & 0xffff
+
+        return self.tell()
+
+    def read(self, size=-1):
+        chunks = []
+        while size and (self.pos < len(self.data) or self.nextBlock()):
+            end = len(self.data) if size < 0 else min(len(self.data), self.pos + size)
+            chunks.append(self.data[self.pos:end])
+            size -= end - self.pos if size > 0 else 0
+            self.pos = end
+
+        return b''.join(chunks)
+
+    def readline(self):
+        chunks = []
+        while self.pos < len(self.data) or self.nextBlock():
+            lineEnd = self.data.find(b'\n', self.pos)
+            if lineEnd >= 0:
+                chunks.append(self.data[self.pos:lineEnd+1])
+                self.pos = lineEnd + 1
+                break
+            chunks.append(self.data[self.pos:])
+            self.pos = len(self.data)
+
+        return b''.join(chunks)
+
+    def __iter__(self):
+        return (line for offset, line in self.iterLines())
+
+    # (virtual offset, line) of the lines from the current position
+    def iterLines(self):
+        pending, pendingOffset = [], None
+        while self.pos < len(self.data) or self.nextBlock():
+            data, base = self.data, self.blockStart << 16
+            while self.pos < len(data):
+                pos = self.pos
+                lineEnd = data.find(b'\n', pos)
+                if lineEnd < 0:
+                    if not pending:
+                        pendingOffset = base | pos
+                    pending.append(data[pos:])
+                    self.pos = len(data)
+                    break
+
+                self.pos = lineEnd + 1
+                if pending:
+                    pending.append(data[pos:lineEnd+1])
+                    yield pendingOffset, b''.join(pending)
+                    pending = []
+                else:
+                    yield base | pos, data[pos:lineEnd+1]
+
+        if pending:
+            yield pendingOffset, b''.join(pending)
+
+    # compressed offset of the first BGZF block starting at or after pos, the file size if there
+    # is none. the file is searched a chunk at a time for the magic bytes, a match being taken
+    # only if a block can be read there; chunks overlap so that no header is cut in two
+    def blockStartAfter(self, pos):
+        chunkSize = 1 << 17
+        while pos < self.size:
+            self.f.seek(pos)
+            buf = self.f.read(chunkSize + 13)
+            i = buf.find(bgzfMagic)
+            while 0 <= i < chunkSize:
+                if buf[i+12:i+14] == b'BC':
+                    try:
+                        self.readBlock(pos + i)
+                        return pos + i
+                    except (ValueError, struct.error, zlib.error):
+                        pass
+                i = buf.find(bgzfMagic, i + 1)
+            pos += chunkSize
+
+        return self.size
+
+    # virtual offset of the first line starting at or after compressed offset pos
+    def lineStartAfter(self, pos):
+        blockStart = self.blockStartAfter(pos)
+        if blockStart >= self.size:
+            return self.size << 16
+
+        self.seek(blockStart << 16)
+        if blockStart:
+            self.readline()
+
+        return self.tell()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+
+from collections import deque
+
+import numpy as np
+
+#============================= Function =================================
+##logging info
+DEBUG="" #change it when debugging
+logFormat = "%(asctime)s [%(levelname)s] %(message)s"
+level = "DEBUG" if DEBUG != "" else "INFO"
+logging.basicConfig( stream=sys.stderr, level=level, format=logFormat )
+#========================================================================
+
+# directed graph of integer node indices in CSR form, used by PanGraph instead of networkx
+#
+#   nodeIds: node IDs (str) in insertion order; rows: nodeId -> node index
+#   edgeFrom, edgeTo, edgeStrand: edges sorted by from node, edgeStrand being a strand code
+#     (bit 0: from '-', bit 1: to '-'); the edges of one node are in insertion order
+#   outOffset: edges of node i are edgeFrom/edgeTo[outOffset[i]:outOffset[i+1]]
+#   inOffset/inEdge: the same for the edges into a node, as indices into the edge arrays
+#
+# as with nx.DiGraph.add_edge(), an edge added twice is kept once, at its first position
+# and with the strands/tags of the last one. edge tags are only looked up on request with
+# edgeTags(), tags being a list or a function of the position of the edge as given
+#
+# G.toNetworkx() gives the same graph as an nx.DiGraph
+#
+# connected components (ignoring the edge direction) are given as labels, the label of a
+# node being the smallest node index of its component; UnionFind builds them while the
+# edges are read, components() from edge arrays
+
+strandNames = ['++', '-+', '+-', '--']
+
+# concatenated [starts[i], ends[i]) ranges as one index array
+def gatherRanges(starts, ends):
+    counts = ends - starts
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+# labels of a parent array where parent[i] <= i, by pointer jumping
+def rootLabels(parent):
+    while True:
+        grandParent = parent[parent]
+        if np.array_equal(grandParent, parent):
+            return parent
+        parent = grandParent
+
+# component labels of n nodes and the given edges, hooking roots onto smaller roots
+# for all edges at once until no edge joins two components
+def components(n, edgeFrom, edgeTo):
+    parent = np.arange(n, dtype=np.int64)
+    fromIdx, toIdx = np.asarray(edgeFrom, dtype=np.int64), np.asarray(edgeTo, dtype=np.int64)
+    while len(fromIdx):
+        fromRoot, toRoot = parent[fromIdx], parent[toIdx]
+        join = fromRoot != toRoot
+        if not join.any():
+            break
+
+        fromIdx, toIdx, fromRoot, toRoot = fromIdx[join], toIdx[join], fromRoot[join], toRoot[join]
+        np.minimum.at(parent, np.maximum(fromRoot, toRoot), np.minimum(fromRoot, toRoot))
+        parent = rootLabels(parent)
+
+    return parent
+
+# (from, to) node indices of edges directed as drawn: an edge leaving a backbone node on its
+# '-' strand, or entering one on its '-' strand, and '--' edges are turned around, as in
+# PanGraph.loadRGFA()
+def drawingEdges(edgeFrom, edgeTo, edgeStrand, isBackbone):
+    fromRev, toRev = (edgeStrand & 1) > 0, (edgeStrand & 2) > 0
+    swap = (fromRev & ~toRev & isBackbone[edgeFrom]) | (toRev & ~fromRev & isBackbone[edgeTo]) | (fromRev & toRev)
+
+    return np.where(swap, edgeTo, edgeFrom), np.where(swap, edgeFrom, edgeTo)
+
+# (posStart, posEnd) of n nodes for drawing, the edges being directed as drawn: backbone
+# nodes are at [bbStart, bbEnd]; any other node is put at the end + 1 of the nearest backbone
+# node upstream (the one first in position order if several are as near), or -1 if no
+# backbone node leads to it. the nodes are placed outwards from the backbone one step at a time.
+# withAnchor also gives the backbone node each node is placed after (-1 if none)
+def nodeCoordinates(n, edgeFrom, edgeTo, isBackbone, bbStart, bbEnd, withAnchor=False):
+    edgeFrom, edgeTo = np.asarray(edgeFrom, dtype=np.int64), np.asarray(edgeTo, dtype=np.int64)
+    order = np.argsort(edgeFrom, kind='stable')
+    edgeFrom, edgeTo = edgeFrom[order], edgeTo[order]
+    outOffset = np.zeros(n+1, dtype=np.int64)
+    np.cumsum(np.bincount(edgeFrom, minlength=n), out=outOffset[1:])
+
+    posStart = np.where(isBackbone, bbStart, -1).astype(np.int64)
+    posEnd = np.where(isBackbone, bbEnd, -1).astype(np.int64)
+    nextPos = np.where(isBackbone, posEnd + 1, -1)
+    # position of the backbone node each node is placed after, to break ties
+    key = posStart.copy()
+    placed = np.array(isBackbone, dtype=bool)
+    anchor = np.where(placed, np.arange(n), -1)
+
+    frontier = np.flatnonzero(placed)
+    while len(frontier):
+        edges = gatherRanges(outOffset[frontier], outOffset[frontier+1])
+        src, dst = edgeFrom[edges], edgeTo[edges]
+        new = ~placed[dst]
+        if not new.any():
+            break
+
+        src, dst = src[new], dst[new]
+        order = np.lexsort((src, key[src], dst))
+        src, dst = src[order], dst[order]
+        first = np.flatnonzero(np.concatenate([[True], dst[1:] != dst[:-1]]))
+        src, dst = src[first], dst[first]
+
+        posStart[dst], posEnd[dst] = nextPos[src], nextPos[src]
+        nextPos[dst], key[dst], anchor[dst] = nextPos[src], key[src], anchor[src]
+        placed[dst] = True
+        frontier = dst
+
+    return (posStart, posEnd, anchor) if withAnchor else (posStart, posEnd)
+
+# SV sites (bubbles) of a graph with edges directed as drawn, as (source, sink, start, end,
+# members, memberOffset): non-backbone nodes placed after the same backbone node (source, see
+# nodeCoordinates()) and leading to the same nearest backbone node downstream (sink) form one
+# bubble, and a backbone edge skipping over backbone bases of its contig (a deletion without
+# an SV node) is a bubble without members. [start, end] spans the inner ends of source and
+# sink; the members of bubble i are members[memberOffset[i]:memberOffset[i+1]]. bubbles are
+# sorted by contig and start. source may be given as the anchor from nodeCoordinates()
+def bubbles(n, edgeFrom, edgeTo, isBackbone, bbStart, bbEnd, contig, source=None):
+    edgeFrom, edgeTo = np.asarray(edgeFrom, dtype=np.int64), np.asarray(edgeTo, dtype=np.int64)
+    isBackbone, bbStart, bbEnd, contig = np.asarray(isBackbone, dtype=bool), np.asarray(bbStart), np.asarray(bbEnd), np.asarray(contig)
+    if source is None:
+        source = nodeCoordinates(n, edgeFrom, edgeTo, isBackbone, bbStart, bbEnd, withAnchor=True)[2]
+    sink = nodeCoordinates(n, edgeTo, edgeFrom, isBackbone, bbStart, bbEnd, withAnchor=True)[2]
+
+    # SV nodes grouped by (source, sink), then deletions as bubbles of their own
+    memberIdx = np.flatnonzero(~isBackbone & (source >= 0) & (sink >= 0))
+    keys, memberGroup = np.unique(source[memberIdx] * n + sink[memberIdx], return_inverse=True)
+    memberGroup = memberGroup.reshape(-1)
+
+    bbEdge = isBackbone[edgeFrom] & isBackbone[edgeTo]
+    deletion = bbEdge & (contig[edgeFrom] == contig[edgeTo]) & (bbStart[edgeTo] > bbEnd[edgeFrom] + 1)
+    delKeys = np.unique(edgeFrom[deletion] * n + edgeTo[deletion])
+
+    bubbleSource = np.concatenate([keys // max(n, 1), delKeys // max(n, 1)]).astype(np.int64)
+    bubbleSink = np.concatenate([keys % max(n, 1), delKeys % max(n, 1)]).astype(np.int64)
+    memberCount = np.concatenate([np.bincount(memberGroup, minlength=len(keys)), np.zeros(len(delKeys), dtype=np.int64)])
+
+    innerFrom, innerTo = bbEnd[bubbleSource], bbStart[bubbleSink]
+    start, end = np.minimum(innerFrom, innerTo), np.maximum(innerFrom, innerTo)
+
+    order = np.lexsort((end, start, contig[bubbleSource]))
+    memberOffset = np.zeros(len(order)+1, dtype=np.int64)
+    np.cumsum(memberCount[order], out=memberOffset[1:])
+
+    # members in bubble order, each bubble's members in node order
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    members = memberIdx[np.argsort(rank[memberGroup], kind='stable')]
+
+    return bubbleSource[order], bubbleSink[order], start[order], end[order], members, memberOffset
+
+# nodes sorted by posStart, with the running maximum of posEnd, so that the nodes
+# overlapping a window are found with two binary searches
+class PositionIndex:
+    def __init__(self, nodeIdx, posStart, posEnd):
+        order = np.argsort(posStart, kind='stable')
+        self.nodeIdx = np.asarray(nodeIdx, dtype=np.int64)[order]
+        self.posStart, self.posEnd = np.asarray(posStart)[order], np.asarray(posEnd)[order]
+        self.maxEnd = np.maximum.accumulate(self.posEnd) if len(order) else self.posEnd
+
+    # nodes with posStart <= posTo and posEnd >= posFrom, a missing bound not being checked
+    def overlap(self, posFrom=None, posTo=None):
+        lo = np.searchsorted(self.maxEnd, posFrom, side='left') if posFrom else 0
+        hi = np.searchsorted(self.posStart, posTo, side='right') if posTo else len(self.posStart)
+
+        idx = np.arange(lo, max(lo, hi))
+        if posFrom:
+            idx = idx[self.posEnd[idx] >= posFrom]
+
+        return self.nodeIdx[idx]
+
+    # nodes with posFrom <= posStart <= posTo, by posStart
+    def starting(self, posFrom, posTo):
+        lo = np.searchsorted(self.posStart, posFrom, side='left')
+        hi = np.searchsorted(self.posStart, posTo, side='right')
+
+        return self.nodeIdx[lo:max(lo, hi)]
+
+# lane of each node for drawing along the backbone: 0 for backbone nodes, and 1, 2, ... for the
+# other nodes at the same posStart, in the order given. with group (e.g. the sample of each
+# node), the lanes of a group are below those of the groups with smaller codes, each group
+# having as many lanes as it needs at any one posStart
+def nodeLanes(posStart, isBackbone, group=None):
+    posStart, isBackbone = np.asarray(posStart), np.asarray(isBackbone, dtype=bool)
+    group = np.zeros(len(posStart), dtype=np.int64) if group is None else np.asarray(group)
+
+    svIdx = np.flatnonzero(~isBackbone)
+    svIdx = svIdx[np.lexsort((posStart[svIdx], group[svIdx]))]
+    svPos, svGroup = posStart[svIdx], group[svIdx]
+    first = np.flatnonzero(np.concatenate([[True], (svPos[1:] != svPos[:-1]) | (svGroup[1:] != svGroup[:-1])])) if len(svIdx) else np.zeros(0, dtype=np.int64)
+    subLane = np.arange(len(svIdx)) - np.repeat(first, np.diff(np.append(first, len(svIdx))))
+
+    # lanes taken by each group, stacked in group order
+    groups, groupIdx = np.unique(svGroup, return_inverse=True)
+    groupIdx = groupIdx.reshape(-1)
+    height = np.zeros(len(groups), dtype=np.int64)
+    np.maximum.at(height, groupIdx, subLane + 1)
+    offset = np.cumsum(height) - height
+
+    lane = np.zeros(len(posStart), dtype=np.int64)
+    lane[svIdx] = offset[groupIdx] + subLane + 1
+
+    return lane
+
+# summary group of each of n nodes for a level-of-detail view of at most budget groups, or
+# None if there is no backbone node to anchor the groups to. backbone nodes are taken in
+# position order and cut into runs of up to step nodes, step being doubled until the groups
+# fit; an SV node whose links all go to backbone nodes (a simple bubble) joins the run of the
+# backbone node it comes from. other SV nodes are kept alone, and so are the backbone nodes
+# linked to them, which keeps the complex parts of the graph as they are; only if these
+# alone are over the budget are all nodes grouped by position instead
+def summaryGroups(n, edgeFrom, edgeTo, isBackbone, posStart, budget):
+    edgeFrom, edgeTo = np.asarray(edgeFrom, dtype=np.int64), np.asarray(edgeTo, dtype=np.int64)
+    isBackbone = np.asarray(isBackbone, dtype=bool)
+    posStart = np.asarray(posStart)
+
+    bbIdx = np.flatnonzero(isBackbone)
+    if not len(bbIdx) or budget < 1:
+        return None
+    bbIdx = bbIdx[np.argsort(posStart[bbIdx], kind='stable')]
+
+    # SV nodes linked to other SV nodes, and the backbone nodes linked to them
+    svEdge = ~isBackbone[edgeFrom] & ~isBackbone[edgeTo]
+    isComplex = np.zeros(n, dtype=bool)
+    isComplex[edgeFrom[svEdge]], isComplex[edgeTo[svEdge]] = True, True
+    isBreak = np.zeros(n, dtype=bool)
+    isBreak[edgeFrom[isComplex[edgeTo]]], isBreak[edgeTo[isComplex[edgeFrom]]] = True, True
+    isBreak &= isBackbone
+
+    # backbone node each simple SV node is grouped with: the first one it comes from, else the
+    # first one it goes to; SV nodes without links are kept alone
+    anchor = np.full(n, -1, dtype=np.int64)
+    anchor[edgeFrom[::-1]] = edgeTo[::-1]
+    anchor[edgeTo[::-1]] = edgeFrom[::-1]
+    isComplex |= ~isBackbone & (anchor < 0)
+
+    # runs of backbone nodes between breakpoints, a breakpoint being a run of its own
+    cut = isBreak[bbIdx]
+    runStart = np.concatenate([[True], cut[1:] | cut[:-1]])
+    runId = np.cumsum(runStart) - 1
+    posInRun = np.arange(len(bbIdx)) - np.flatnonzero(runStart)[runId]
+    nComplex = int(isComplex.sum())
+
+    step = 1
+    while True:
+        piece = runId * (posInRun.max() + 1) + posInRun // step
+        pieceStart = np.concatenate([[True], piece[1:] != piece[:-1]])
+        if pieceStart.sum() + nComplex <= budget or step > posInRun.max():
+            break
+        step *= 2
+
+    groups = np.full(n, -1, dtype=np.int64)
+    if pieceStart.sum() + nComplex <= budget:
+        groups[bbIdx] = np.cumsum(pieceStart) - 1
+        simple = ~isBackbone & ~isComplex
+        groups[simple] = groups[anchor[simple]]
+        groups[isComplex] = groups.max() + 1 + np.arange(nComplex)
+    else:
+        # every node by position, into runs of step backbone nodes
+        step = -(-len(bbIdx) // budget)
+        runFirst = bbIdx[::step]
+        groups = np.searchsorted(posStart[runFirst], posStart, side='right') - 1
+        groups = np.maximum(groups, 0)
+
+    # groups numbered in order of their first node
+    _, first, groups = np.unique(groups, return_index=True, return_inverse=True)
+    order = np.argsort(np.argsort(first, kind='stable'), kind='stable')
+
+    return order[groups.reshape(-1)]
+
+# union-find over node indices added one by one, for components of a graph being read
+class UnionFind:
+    def __init__(self, n=0):
+        self.parent = list(range(n))
+
+    def add(self):
+        idx = len(self.parent)
+        self.parent.append(idx)
+        return idx
+
+    def find(self, idx):
+        parent = self.parent
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+
+        return idx
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a < b:
+            self.parent[b] = a
+        elif b < a:
+            self.parent[a] = b
+
+    def labels(self):
+        return rootLabels(np.array(self.parent, dtype=np.int64))
+
+class CSRGraph:
+    def __init__(self, nodeIds, fromIdx, toIdx, strand, tags=None, labels=None):
+        self.nodeIds = list(nodeIds)
+        self.rows = {nodeId:idx for idx, nodeId in enumerate(self.nodeIds)}
+        self.tags = tags
+        self.labels = labels
+
+        fromIdx = np.asarray(fromIdx, dtype=np.int64)
+        toIdx = np.asarray(toIdx, dtype=np.int64)
+        strand = np.asarray(strand, dtype=np.uint8)
+
+        # first and last position of each distinct edge
+        key = fromIdx * len(self.nodeIds) + toIdx
+        _, first = np.unique(key, return_index=True)
+        _, last = np.unique(key[::-1], return_index=True)
+        last = len(key) - 1 - last
+
+        order = np.lexsort((first, fromIdx[first]))
+        first, last = first[order], last[order]
+
+        self.setEdges(fromIdx[first], toIdx[first], strand[last], last)
+
+    # edge arrays already sorted and without duplicates; edgeKey is the position in tags
+    def setEdges(self, edgeFrom, edgeTo, edgeStrand, edgeKey):
+        n = len(self.nodeIds)
+        self.edgeFrom, self.edgeTo, self.edgeStrand, self.edgeKey = edgeFrom, edgeTo, edgeStrand, edgeKey
+
+        self.outOffset = np.zeros(n+1, dtype=np.int64)
+        np.cumsum(np.bincount(edgeFrom, minlength=n), out=self.outOffset[1:])
+
+        self.inEdge = np.argsort(edgeTo, kind='stable')
+        self.inOffset = np.zeros(n+1, dtype=np.int64)
+        np.cumsum(np.bincount(edgeTo, minlength=n), out=self.inOffset[1:])
+
+    def __len__(self):
+        return len(self.nodeIds)
+
+    def __contains__(self, nodeId):
+        return nodeId in self.rows
+
+    def numberOfEdges(self):
+        return len(self.edgeFrom)
+
+    # node indices of the given node IDs, -1 if not in the graph
+    def find(self, nodeIds):
+        rows = self.rows
+        return np.array([rows.get(nodeId, -1) for nodeId in nodeIds], dtype=np.int64)
+
+    def inDegree(self):
+        return np.diff(self.inOffset)
+
+    def outDegree(self):
+        return np.diff(self.outOffset)
+
+    def edgeTags(self, edge):
+        if self.tags is None:
+            return {}
+
+        key = int(self.edgeKey[edge])
+        return self.tags(key) if callable(self.tags) else self.tags[key]
+
+    # (fromNodeId, toNodeId) or (fromNodeId, toNodeId, {'strands':..., 'tags':...}) of each edge,
+    # as G.edges(data=True) of networkx; 'tags' only if the graph has tags
+    def edges(self, data=False):
+        nodeIds = self.nodeIds
+        for edge, (fromIdx, toIdx, strand) in enumerate(zip(self.edgeFrom.tolist(), self.edgeTo.tolist(), self.edgeStrand.tolist())):
+            if not data:
+                yield nodeIds[fromIdx], nodeIds[toIdx]
+            elif self.tags is None:
+                yield nodeIds[fromIdx], nodeIds[toIdx], {'strands':strandNames[strand]}
+            else:
+                yield nodeIds[fromIdx], nodeIds[toIdx], {'strands':strandNames[strand], 'tags':self.edgeTags(edge)}
+
+    # (from, to) node indices of the breadth-first tree edges from source, following the
+    # edge direction, in the same order as nx.bfs_edges()
+    def bfsEdges(self, source):
+        outOffset, edgeTo = self.outOffset.tolist(), self.edgeTo.tolist()
+
+        seen = bytearray(len(self.nodeIds))
+        seen[source] = 1
+        queue = deque([source])
+        while queue:
+            fromIdx = queue.popleft()
+            for toIdx in edgeTo[outOffset[fromIdx]:outOffset[fromIdx+1]]:
+                if not seen[toIdx]:
+                    seen[toIdx] = 1
+                    queue.append(toIdx)
+                    yield fromIdx, toIdx
+
+    # component label of each node, worked out once per graph
+    def componentLabels(self):
+        if self.labels is None:
+            self.labels = components(len(self.nodeIds), self.edgeFrom, self.edgeTo)
+
+        return self.labels
+
+    # sorted node indices of the component of source, ignoring the edge direction
+    def component(self, source):
+        labels = self.componentLabels()
+        return np.flatnonzero(labels == labels[source])
+
+    # nodeCoordinates() of the nodes of this graph
+    def nodeCoordinates(self, isBackbone, bbStart, bbEnd):
+        return nodeCoordinates(len(self.nodeIds), self.edgeFrom, self.edgeTo, isBackbone, bbStart, bbEnd)
+
+    # subgraph of the component of source
+    def componentGraph(self, source):
+        G = self.subgraph(self.component(source))
+        G.labels = np.zeros(len(G.nodeIds), dtype=np.int64)
+
+        return G
+
+    # graph of the given node indices and the edges between them; node and edge order are kept
+    def subgraph(self, nodeIdx):
+        keep = np.zeros(len(self.nodeIds), dtype=bool)
+        keep[np.asarray(nodeIdx, dtype=np.int64)] = True
+        newIdx = np.cumsum(keep) - 1
+
+        edgeKeep = keep[self.edgeFrom] & keep[self.edgeTo]
+
+        G = CSRGraph.__new__(CSRGraph)
+        G.nodeIds = [nodeId for nodeId, ok in zip(self.nodeIds, keep.tolist()) if ok]
+        G.rows = {nodeId:idx for idx, nodeId in enumerate(G.nodeIds)}
+        G.tags = self.tags
+        G.labels = None
+        G.setEdges(newIdx[self.edgeFrom[edgeKeep]], newIdx[self.edgeTo[edgeKeep]], self.edgeStrand[edgeKeep], self.edgeKey[edgeKeep])
+
+        return G
+
+    def toNetworkx(self):
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self.nodeIds)
+        G.add_edges_from(self.edges(data=True))
+
+        return G
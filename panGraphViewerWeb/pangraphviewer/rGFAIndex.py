@@ -0,0 +1,720 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import logging
+
+from array import array
+from multiprocessing import Pool
+
+import numpy as np
+
+try:
+    from scripts.rGFAFile import *
+    from scripts.rGFAParser import *
+    from scripts.rGFAGraph import *
+except ModuleNotFoundError:
+    try:
+        from rGFAFile import *
+        from rGFAParser import *
+        from rGFAGraph import *
+    except ModuleNotFoundError:
+        from pangraphviewer.rGFAFile import *
+        from pangraphviewer.rGFAParser import *
+        from pangraphviewer.rGFAGraph import *
+
+#============================= Function =================================
+##logging info
+DEBUG="" #change it when debugging
+logFormat = "%(asctime)s [%(levelname)s] %(message)s"
+level = "DEBUG" if DEBUG != "" else "INFO"
+logging.basicConfig( stream=sys.stderr, level=level, format=logFormat )
+#========================================================================
+
+# sidecar index of an rGFA file, saved as <gfa>.pgvidx
+#
+# node arrays are in file order:
+#   nodeId, fileOffset, lineLen, seqFieldLen, seqLen (LN), rank (SR, -1 if missing),
+#   sn (code of SN value in meta['SN']), lenBefore (SO), infOffset/infData (INF)
+# edge arrays are in file order:
+#   edgeFrom, edgeTo (node indices), edgeStrand (bit 0: from '-', bit 1: to '-'),
+#   edgeTagOffset/edgeTagData (tags after the overlap field)
+# lookup arrays:
+#   snNodes/snOffset (node indices grouped by SN value, sorted by SO), snMaxLen (max LN of each SN value),
+#   nodeEdges/nodeEdgeOffset (edge indices grouped by node, for either end of the edge),
+#   component (connected component label of each node over all edges, see rGFAGraph.components())
+# drawing coordinates:
+#   posStart/posEnd (see rGFAGraph.nodeCoordinates(), rank 0 nodes being the backbone and the
+#   edges oriented as in PanGraph.loadRGFA())
+# SV sites (see rGFAGraph.bubbles(), each SN value being a contig), sorted by SN and start:
+#   bubbleSource, bubbleSink (node indices), bubbleStart, bubbleEnd,
+#   bubbleMembers/bubbleMemberOffset (SV node indices of each bubble),
+#   bubbleSnOffset (bubbles of each SN value of the source), bubbleMaxLen (max span of each SN value)
+# paths (P and W lines, named in meta['paths'], see RGFAParser.parsePath()), steps on unknown
+# nodes being dropped:
+#   pathOffset (steps of each path), pathStart (start of each path, seqStart of W lines),
+#   pathNode (node index of each step), pathStrand (packed bits, 1 for '-' steps),
+#   pathLenBefore (length of the path before each step)
+#   pathPlaced/pathPlacedOffset (steps of each path with drawing coordinates, sorted by the SN
+#   value of the backbone node they are placed after and posStart), pathPlacedSn, pathPlacedPos
+#   (the sort keys), pathPlacedMaxLen (max node span of each SN value)
+
+# read the lines (bytes) at the given (fileOffset, lineLen) positions in file order
+def readLinesAt(f, positions):
+    for fileOffset, lineLen in sorted(positions):
+        f.seek(fileOffset)
+        yield f.read(lineLen)
+
+class RGFAIndex:
+    ext = '.pgvidx'
+    version = 6
+
+    # recently loaded indexes, keyed by index file
+    cache = {}
+    cacheSize = 2
+
+    def __init__(self, gfa):
+        self.gfa = gfa
+        self.indexFile = f'{gfa}{self.ext}'
+        self.meta = None
+        self.data = None
+
+    @classmethod
+    def open(cls, gfa, build=False, nthread=1):
+        if not gfa or not os.path.isfile(gfa):
+            return None
+
+        index = cls(gfa)
+        fileStat = index.fileStat()
+
+        cached = cls.cache.get(index.indexFile)
+        if cached and cached.meta['fileStat'] == fileStat:
+            return cached
+
+        try:
+            if os.path.isfile(index.indexFile):
+                index.load()
+                if index.meta['version'] != cls.version or index.meta['fileStat'] != fileStat:
+                    index.meta, index.data = None, None
+        except Exception as e:
+            logging.warning(f'Cannot load rGFA index {index.indexFile}: {e}')
+            index.meta, index.data = None, None
+
+        if not index.data:
+            if not build:
+                return None
+            index.build(nthread=nthread)
+
+        if len(cls.cache) >= cls.cacheSize:
+            del cls.cache[next(iter(cls.cache))]
+        cls.cache[index.indexFile] = index
+
+        return index
+
+    def fileStat(self):
+        stat = os.stat(self.gfa)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    # node and edge columns of the lines in [start, end) of an rGFA file, with SN codes
+    # local to the range; build() concatenates the ranges
+    @staticmethod
+    def scanRange(gfa, start=0, end=None):
+        nodeId = []
+        fileOffset, lineLen, seqFieldLen, seqLen, lenBefore = array('q'), array('q'), array('q'), array('q'), array('q')
+        rank, sn = array('h'), array('i')
+        snCodes = {}
+        infData, infOffset = bytearray(), array('q', [0])
+
+        edgeFromId, edgeToId, edgeStrand = [], [], array('B')
+        edgeTagData, edgeTagOffset = bytearray(), array('q', [0])
+
+        pathName, pathStart, pathOffset = [], array('q'), array('q', [0])
+        pathStepId, pathStrand = [], bytearray()
+
+        parser = RGFAParser()
+        # L, P and W lines are taken raw, S lines are parsed without reading the sequence
+        for lineNum, offset, lineSize, lineType, fields in parser.scan(gfa, start, end, rawTypes=b'LPW'):
+            if lineType == 'S':
+                lineNodeId, seq, lineSeqLen, tags = fields
+
+                nodeId.append(lineNodeId.encode())
+                fileOffset.append(offset)
+                lineLen.append(lineSize)
+                seqFieldLen.append(lineSeqLen)
+                seqLen.append(int(tags['LN']) if 'LN' in tags else lineSeqLen)
+                rank.append(int(tags['SR']) if 'SR' in tags else -1)
+                lenBefore.append(int(tags['SO']) if 'SO' in tags else 0)
+
+                res = tags['SN'] if 'SN' in tags else ''
+                if res not in snCodes:
+                    snCodes[res] = len(snCodes)
+                sn.append(snCodes[res])
+
+                if 'INF' in tags:
+                    infData += tags['INF'].encode()
+                infOffset.append(len(infData))
+            elif lineType == 'L':
+                row = fields.rstrip().split(b'\t')
+
+                # tag fields are kept as they are, see edgeTags()
+                edgeFromId.append(row[1])
+                edgeToId.append(row[3])
+                edgeStrand.append((row[2] == b'-') | (row[4] == b'-') << 1)
+                edgeTagData += b'\t'.join(row[6:])
+                edgeTagOffset.append(len(edgeTagData))
+            else:
+                name, stepIds, stepStrands, stepStart = parser.parsePath(fields)
+
+                pathName.append(name)
+                pathStart.append(stepStart)
+                pathStepId += stepIds
+                pathStrand += stepStrands
+                pathOffset.append(len(pathStepId))
+
+        return {
+            'nodeId':np.array(nodeId, dtype=bytes) if nodeId else np.zeros(0, dtype='S1'),
+            'fileOffset':np.frombuffer(fileOffset, dtype=np.int64),
+            'lineLen':np.frombuffer(lineLen, dtype=np.int64),
+            'seqFieldLen':np.frombuffer(seqFieldLen, dtype=np.int64),
+            'seqLen':np.frombuffer(seqLen, dtype=np.int64),
+            'rank':np.frombuffer(rank, dtype=np.int16),
+            'sn':np.frombuffer(sn, dtype=np.int32),
+            'SN':list(snCodes),
+            'lenBefore':np.frombuffer(lenBefore, dtype=np.int64),
+            'infOffset':np.frombuffer(infOffset, dtype=np.int64),
+            'infData':np.frombuffer(bytes(infData), dtype=np.uint8),
+            'edgeFromId':np.array(edgeFromId, dtype=bytes) if edgeFromId else np.zeros(0, dtype='S1'),
+            'edgeToId':np.array(edgeToId, dtype=bytes) if edgeToId else np.zeros(0, dtype='S1'),
+            'edgeStrand':np.frombuffer(edgeStrand, dtype=np.uint8),
+            'edgeTagOffset':np.frombuffer(edgeTagOffset, dtype=np.int64),
+            'edgeTagData':np.frombuffer(bytes(edgeTagData), dtype=np.uint8),
+            'pathName':pathName,
+            'pathStart':np.frombuffer(pathStart, dtype=np.int64),
+            'pathOffset':np.frombuffer(pathOffset, dtype=np.int64),
+            'pathStepId':np.array(pathStepId, dtype=bytes) if pathStepId else np.zeros(0, dtype='S1'),
+            'pathStrand':np.frombuffer(bytes(pathStrand), dtype=np.uint8),
+        }
+
+    # with nthread > 1, large files are cut into byte ranges scanned in a process pool
+    def build(self, save=True, nthread=1):
+        logging.info(f'Building rGFA index for {self.gfa}')
+
+        ranges = RGFAParser.splitRanges(self.gfa, nthread)
+        if len(ranges) > 1:
+            logging.info(f'Scanning {len(ranges)} ranges of the rGFA file in parallel')
+            with Pool(len(ranges)) as pool:
+                parts = pool.starmap(self.scanRange, [(self.gfa, start, end) for start, end in ranges])
+        else:
+            parts = [self.scanRange(self.gfa)]
+
+        # concatenate the ranges, re-coding SN values and shifting the INF/tag offsets
+        snCodes = {}
+        for part in parts:
+            codes = np.array([snCodes.setdefault(res, len(snCodes)) for res in part['SN']], dtype=np.int32)
+            part['sn'] = codes[part['sn']] if len(codes) else part['sn']
+
+        def concat(key):
+            return np.concatenate([part[key] for part in parts])
+
+        def concatOffsets(key, dataKey):
+            base = np.cumsum([0] + [len(part[dataKey]) for part in parts])
+            return np.concatenate([[0]] + [part[key][1:] + base[i] for i, part in enumerate(parts)]).astype(np.int64)
+
+        nodeId = concat('nodeId')
+        fileOffset, lineLen, seqFieldLen, seqLen = concat('fileOffset'), concat('lineLen'), concat('seqFieldLen'), concat('seqLen')
+        rank, sn, lenBefore = concat('rank'), concat('sn'), concat('lenBefore')
+        infOffset, infData = concatOffsets('infOffset', 'infData'), concat('infData')
+        edgeFromId, edgeToId, edgeStrand = concat('edgeFromId'), concat('edgeToId'), concat('edgeStrand')
+        edgeTagOffset, edgeTagData = concatOffsets('edgeTagOffset', 'edgeTagData'), concat('edgeTagData')
+        pathName = [name for part in parts for name in part['pathName']]
+        pathStart, pathOffset = concat('pathStart'), concatOffsets('pathOffset', 'pathStepId')
+        pathStepId, pathStrand = concat('pathStepId'), concat('pathStrand')
+
+        nodeOrder = np.argsort(nodeId, kind='stable')
+
+        # resolve edge node IDs to node indices; edges to unknown nodes are dropped
+        edgeFrom = self.lookup(nodeId, nodeOrder, edgeFromId)
+        edgeTo = self.lookup(nodeId, nodeOrder, edgeToId)
+        edgeKeep = (edgeFrom >= 0) & (edgeTo >= 0)
+        edgeTagStart, edgeTagEnd = edgeTagOffset[:-1][edgeKeep], edgeTagOffset[1:][edgeKeep]
+        if not edgeKeep.all():
+            edgeTagData = np.concatenate([edgeTagData[s:e] for s, e in zip(edgeTagStart, edgeTagEnd)] + [np.zeros(0, dtype=np.uint8)])
+        edgeTagOffset = np.concatenate([[0], np.cumsum(edgeTagEnd - edgeTagStart)]).astype(np.int64)
+
+        edgeFrom, edgeTo = edgeFrom[edgeKeep].astype(np.int32), edgeTo[edgeKeep].astype(np.int32)
+        edgeStrand = edgeStrand[edgeKeep]
+
+        # resolve path steps the same way, dropping steps on unknown nodes
+        pathNode = self.lookup(nodeId, nodeOrder, pathStepId)
+        stepKeep = pathNode >= 0
+        if not stepKeep.all():
+            logging.warning(f'{len(stepKeep) - stepKeep.sum()} path steps on unknown nodes are dropped')
+            pathOffset = np.concatenate([[0], np.cumsum(stepKeep)])[pathOffset]
+        pathNode, pathStrand = pathNode[stepKeep].astype(np.int32), pathStrand[stepKeep]
+
+        # interval lookup: nodes of each SN value sorted by SO
+        snNodes = np.lexsort((lenBefore, sn))
+        snOffset = np.searchsorted(sn[snNodes], np.arange(len(snCodes)+1))
+        snMaxLen = np.zeros(len(snCodes), dtype=np.int64)
+        np.maximum.at(snMaxLen, sn, seqLen)
+
+        # drawing coordinates, once for the whole file instead of per query
+        isBackbone = rank == 0
+        drawFrom, drawTo = drawingEdges(edgeFrom, edgeTo, edgeStrand, isBackbone)
+        posStart, posEnd, anchor = nodeCoordinates(len(nodeId), drawFrom, drawTo, isBackbone, lenBefore + 1, lenBefore + seqLen, withAnchor=True)
+
+        # SV sites for navigation by variant
+        bubbleSource, bubbleSink, bubbleStart, bubbleEnd, bubbleMembers, bubbleMemberOffset = \
+            bubbles(len(nodeId), drawFrom, drawTo, isBackbone, lenBefore + 1, lenBefore + seqLen, sn, source=anchor)
+        bubbleSnOffset = np.searchsorted(sn[bubbleSource], np.arange(len(snCodes)+1))
+        bubbleMaxLen = np.zeros(len(snCodes), dtype=np.int64)
+        np.maximum.at(bubbleMaxLen, sn[bubbleSource], bubbleEnd - bubbleStart + 1)
+
+        # path coordinates, and the placed steps of each path in drawing position order for
+        # window lookups
+        stepPath = np.repeat(np.arange(len(pathName)), np.diff(pathOffset))
+        stepLen = seqLen[pathNode]
+        lenSum = np.concatenate([[0], np.cumsum(stepLen)])
+        pathLenBefore = lenSum[:-1] - lenSum[pathOffset[:-1]][stepPath]
+
+        stepAnchor = anchor[pathNode]
+        pathPlaced = np.flatnonzero(stepAnchor >= 0)
+        placedSn, placedPos = sn[stepAnchor[pathPlaced]], posStart[pathNode[pathPlaced]]
+        order = np.lexsort((placedPos, placedSn, stepPath[pathPlaced]))
+        pathPlaced, pathPlacedSn, pathPlacedPos = pathPlaced[order], placedSn[order], placedPos[order]
+        pathPlacedOffset = np.searchsorted(stepPath[pathPlaced], np.arange(len(pathName)+1))
+        pathPlacedMaxLen = np.zeros(len(snCodes), dtype=np.int64)
+        np.maximum.at(pathPlacedMaxLen, pathPlacedSn, posEnd[pathNode[pathPlaced]] - pathPlacedPos + 1)
+
+        # incidence lookup: edges of each node
+        edgeNodes = np.concatenate([edgeFrom, edgeTo])
+        nodeEdges = np.argsort(edgeNodes, kind='stable') % max(len(edgeFrom), 1)
+        nodeEdgeOffset = np.searchsorted(np.sort(edgeNodes), np.arange(len(nodeId)+1))
+
+        self.meta = {'version':self.version, 'fileStat':self.fileStat(),
+                     'SN':list(snCodes), 'paths':pathName}
+        self.data = {
+            'nodeId':nodeId,
+            'nodeOrder':nodeOrder.astype(np.int64),
+            'fileOffset':fileOffset,
+            'lineLen':lineLen,
+            'seqFieldLen':seqFieldLen,
+            'seqLen':seqLen,
+            'rank':rank,
+            'sn':sn,
+            'lenBefore':lenBefore,
+            'infOffset':infOffset,
+            'infData':infData,
+            'edgeFrom':edgeFrom,
+            'edgeTo':edgeTo,
+            'edgeStrand':edgeStrand,
+            'edgeTagOffset':edgeTagOffset,
+            'edgeTagData':edgeTagData,
+            'snNodes':snNodes.astype(np.int64),
+            'snOffset':snOffset.astype(np.int64),
+            'snMaxLen':snMaxLen,
+            'nodeEdges':nodeEdges.astype(np.int64),
+            'nodeEdgeOffset':nodeEdgeOffset.astype(np.int64),
+            'component':components(len(nodeId), edgeFrom, edgeTo),
+            'posStart':posStart,
+            'posEnd':posEnd,
+            'bubbleSource':bubbleSource,
+            'bubbleSink':bubbleSink,
+            'bubbleStart':bubbleStart,
+            'bubbleEnd':bubbleEnd,
+            'bubbleMembers':bubbleMembers,
+            'bubbleMemberOffset':bubbleMemberOffset,
+            'bubbleSnOffset':bubbleSnOffset.astype(np.int64),
+            'bubbleMaxLen':bubbleMaxLen,
+            'pathOffset':pathOffset.astype(np.int64),
+            'pathStart':pathStart,
+            'pathNode':pathNode,
+            'pathStrand':np.packbits(pathStrand.astype(bool)),
+            'pathLenBefore':pathLenBefore.astype(np.int64),
+            'pathPlaced':pathPlaced.astype(np.int64),
+            'pathPlacedOffset':pathPlacedOffset.astype(np.int64),
+            'pathPlacedSn':pathPlacedSn.astype(np.int32),
+            'pathPlacedPos':pathPlacedPos.astype(np.int64),
+            'pathPlacedMaxLen':pathPlacedMaxLen,
+        }
+
+        logging.info(f'rGFA index: {len(nodeId)} nodes, {len(self.data["edgeFrom"])} edges, {len(pathName)} paths')
+
+        if save:
+            self.save()
+
+    def save(self):
+        tmpFile = f'{self.indexFile}.tmp'
+        try:
+            with open(tmpFile, 'wb') as f:
+                meta = np.frombuffer(json.dumps(self.meta).encode(), dtype=np.uint8)
+                np.savez(f, meta=meta, **self.data)
+            os.replace(tmpFile, self.indexFile)
+            logging.info(f'rGFA index saved to {self.indexFile}')
+        except OSError as e:
+            logging.warning(f'Cannot save rGFA index {self.indexFile}: {e}')
+            try:
+                os.remove(tmpFile)
+            except OSError:
+                pass
+
+    def load(self):
+        with np.load(self.indexFile) as npz:
+            data = {key:npz[key] for key in npz.files}
+
+        self.meta = json.loads(data.pop('meta').tobytes().decode())
+        self.data = data
+
+    @staticmethod
+    def lookup(nodeId, nodeOrder, queryIds):
+        if not len(queryIds) or not len(nodeId):
+            return np.full(len(queryIds), -1, dtype=np.int64)
+
+        query = np.array(queryIds, dtype=bytes)
+        pos = np.searchsorted(nodeId, query, sorter=nodeOrder)
+        idx = nodeOrder[np.minimum(pos, len(nodeOrder)-1)]
+        idx[nodeId[idx] != query] = -1
+
+        return idx
+
+    def __len__(self):
+        return len(self.data['nodeId'])
+
+    # node indices of the given node IDs, -1 if not found
+    def findNodes(self, nodeIds):
+        return self.lookup(self.data['nodeId'], self.data['nodeOrder'], [nodeId.encode() for nodeId in nodeIds])
+
+    # node indices with the given SN codes overlapping [start, end] (1-based, SO is 0-based), in file order
+    def findNodesInRange(self, snCodes, start=None, end=None):
+        data = self.data
+        snNodes, snOffset, lenBefore, seqLen = data['snNodes'], data['snOffset'], data['lenBefore'], data['seqLen']
+
+        starts, ends = [], []
+        for code in snCodes:
+            lo, hi = snOffset[code], snOffset[code+1]
+            nodeStart = lenBefore[snNodes[lo:hi]]
+            if end:
+                hi = lo + np.searchsorted(nodeStart, end, side='left')
+            if start:
+                lo += np.searchsorted(nodeStart, start - data['snMaxLen'][code], side='left')
+            starts.append(lo)
+            ends.append(max(lo, hi))
+
+        nodeIdx = snNodes[gatherRanges(np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64))]
+        if start:
+            nodeIdx = nodeIdx[start <= lenBefore[nodeIdx] + seqLen[nodeIdx]]
+
+        return np.sort(nodeIdx)
+
+    # bubble indices with the given SN codes overlapping [start, end], in position order
+    def findBubblesInRange(self, snCodes, start=None, end=None):
+        data = self.data
+        offset, bubbleStart, bubbleEnd = data['bubbleSnOffset'], data['bubbleStart'], data['bubbleEnd']
+
+        bubbleIdx = []
+        for code in snCodes:
+            lo, hi = offset[code], offset[code+1]
+            if end:
+                hi = lo + np.searchsorted(bubbleStart[lo:hi], end, side='right')
+            if start:
+                lo += np.searchsorted(bubbleStart[lo:hi], start - data['bubbleMaxLen'][code], side='left')
+            idx = np.arange(lo, max(lo, hi))
+            bubbleIdx.append(idx[bubbleEnd[idx] >= start] if start else idx)
+
+        bubbleIdx = np.concatenate(bubbleIdx) if bubbleIdx else np.zeros(0, dtype=np.int64)
+        return bubbleIdx[np.lexsort((bubbleEnd[bubbleIdx], bubbleStart[bubbleIdx]))]
+
+    # the first bubble with the given SN codes starting after pos, or the last one starting
+    # before pos if step < 0; None if there is none
+    def findBubbleNextTo(self, snCodes, pos, step=1):
+        data = self.data
+        offset, bubbleStart = data['bubbleSnOffset'], data['bubbleStart']
+
+        found = None
+        for code in snCodes:
+            lo, hi = offset[code], offset[code+1]
+            if step > 0:
+                idx = lo + np.searchsorted(bubbleStart[lo:hi], pos, side='right')
+                if idx < hi and (found is None or bubbleStart[idx] < bubbleStart[found]):
+                    found = int(idx)
+            else:
+                idx = lo + np.searchsorted(bubbleStart[lo:hi], pos, side='left') - 1
+                if idx >= lo and (found is None or bubbleStart[idx] > bubbleStart[found]):
+                    found = int(idx)
+
+        return found
+
+    def bubbleMembers(self, idx):
+        offset = self.data['bubbleMemberOffset']
+        return self.data['bubbleMembers'][offset[idx]:offset[idx+1]]
+
+    # index of a path in meta['paths'], None if there is no such path
+    def findPath(self, name):
+        paths = self.meta['paths']
+        return paths.index(name) if name in paths else None
+
+    # step range [lo, hi) of a path overlapping [start, end] of the path coordinates (1-based,
+    # from pathStart), a missing bound not being checked
+    def findPathStepsInRange(self, path, start=None, end=None):
+        data = self.data
+        lo, hi = data['pathOffset'][path:path+2]
+        lenBefore = data['pathLenBefore'][lo:hi] + data['pathStart'][path]
+        if end:
+            hi = lo + np.searchsorted(lenBefore, end, side='left')
+        if start:
+            lo += max(np.searchsorted(lenBefore, start, side='left') - 1, 0)
+
+        return int(lo), int(max(lo, hi))
+
+    # step range [lo, hi) of a path from its first to its last step placed in [start, end] of
+    # the given SN codes (see nodeCoordinates()); (lo, lo) if none is
+    def findPathStepsInRegion(self, path, snCodes, start=None, end=None):
+        data = self.data
+        placed, placedSn, placedPos = data['pathPlaced'], data['pathPlacedSn'], data['pathPlacedPos']
+        pathLo, pathHi = data['pathPlacedOffset'][path:path+2]
+
+        steps = []
+        for code in snCodes:
+            lo = pathLo + np.searchsorted(placedSn[pathLo:pathHi], code, side='left')
+            hi = pathLo + np.searchsorted(placedSn[pathLo:pathHi], code, side='right')
+            if end:
+                hi = lo + np.searchsorted(placedPos[lo:hi], end, side='right')
+            if start:
+                lo += np.searchsorted(placedPos[lo:hi], start - data['pathPlacedMaxLen'][code] + 1, side='left')
+            idx = placed[lo:max(lo, hi)]
+            if start:
+                idx = idx[data['posEnd'][data['pathNode'][idx]] >= start]
+            steps.append(idx)
+
+        steps = np.concatenate(steps) if steps else np.zeros(0, dtype=np.int64)
+        if not len(steps):
+            lo = int(data['pathOffset'][path])
+            return lo, lo
+
+        return int(steps.min()), int(steps.max()) + 1
+
+    # strands of the steps [lo, hi), 1 for '-'
+    def pathStrands(self, lo, hi):
+        bits = np.unpackbits(self.data['pathStrand'][lo//8:(hi+7)//8])
+        return bits[lo%8:lo%8+hi-lo]
+
+    # edge indices with both ends in the given sorted node indices, in file order
+    def findEdgesWithin(self, nodeIdx):
+        data = self.data
+        offset = data['nodeEdgeOffset']
+        edgeIdx = np.unique(data['nodeEdges'][gatherRanges(offset[nodeIdx], offset[nodeIdx+1])])
+
+        return edgeIdx[self.isIn(data['edgeFrom'][edgeIdx], nodeIdx) & self.isIn(data['edgeTo'][edgeIdx], nodeIdx)]
+
+    @staticmethod
+    def isIn(idx, sortedIdx):
+        if not len(sortedIdx):
+            return np.zeros(len(idx), dtype=bool)
+
+        pos = np.minimum(np.searchsorted(sortedIdx, idx), len(sortedIdx)-1)
+        return sortedIdx[pos] == idx
+
+    def nodeIdStr(self, idx):
+        return self.data['nodeId'][idx].decode()
+
+    def rankStr(self, idx):
+        rank = self.data['rank'][idx]
+        return str(rank) if rank >= 0 else ''
+
+    def snStr(self, idx):
+        return self.meta['SN'][self.data['sn'][idx]]
+
+    def infStr(self, idx):
+        offset = self.data['infOffset']
+        return self.data['infData'][offset[idx]:offset[idx+1]].tobytes().decode()
+
+    def edgeTags(self, idx):
+        offset = self.data['edgeTagOffset']
+        tags = self.data['edgeTagData'][offset[idx]:offset[idx+1]].tobytes().decode()
+
+        return RGFAParser.parseTags(tags.split('\t')) if tags else {}
+
+    # S lines of the given node indices, in file order
+    def iterLines(self, nodeIdx):
+        positions = zip(self.data['fileOffset'][nodeIdx].tolist(), self.data['lineLen'][nodeIdx].tolist())
+        with openRGFA(self.gfa) as f:
+            yield from readLinesAt(f, positions)
+
+    # first and last n bases of a node sequence, without reading the whole line;
+    # f is from openRGFA(), seeks inside the line are relative as offsets may be virtual
+    def readSeqDesc(self, f, idx, n):
+        seqFieldLen = int(self.data['seqFieldLen'][idx])
+
+        f.seek(int(self.data['fileOffset'][idx]))
+        f.seek(len(self.data['nodeId'][idx]) + 3, 1)
+        if seqFieldLen <= n:
+            seq = f.read(seqFieldLen).decode()
+            return seq, seq
+
+        seqDesc = f.read(n).decode()
+        f.seek(seqFieldLen - 2*n, 1)
+        seqLastDesc = f.read(n).decode()
+
+        return seqDesc, seqLastDesc
+
+# compact node store of PanGraph.parseRGFA(), read like a dict of
+# [fileOffset, lineLen, rank, contig, lenBefore, seqLen] lists (see RAWNODEDATA)
+class RawNodeData:
+    def __init__(self):
+        self.nodeId = []
+        self.fileOffset, self.lineLen, self.lenBefore, self.seqLen = array('q'), array('q'), array('q'), array('q')
+        self.rank = array('h')
+        self.sample, self.contig = array('i'), array('i')
+        self.sampleNames, self.contigNames = {}, {}
+        self.nodeOrder = None
+
+    @classmethod
+    def fromIndex(cls, index, nodeIdx, snSample, snContig):
+        self = cls()
+        data = index.data
+
+        sampleNames, contigNames = {}, {}
+        sampleCodes = np.array([sampleNames.setdefault(name, len(sampleNames)) for name in snSample], dtype=np.int32)
+        contigCodes = np.array([contigNames.setdefault(name, len(contigNames)) for name in snContig], dtype=np.int32)
+        self.sampleNames, self.contigNames = list(sampleNames), list(contigNames)
+
+        self.nodeId = data['nodeId'][nodeIdx]
+        self.fileOffset, self.lineLen = data['fileOffset'][nodeIdx], data['lineLen'][nodeIdx]
+        self.lenBefore, self.seqLen = data['lenBefore'][nodeIdx], data['seqLen'][nodeIdx]
+        self.rank = data['rank'][nodeIdx]
+        self.sample, self.contig = sampleCodes[data['sn'][nodeIdx]], contigCodes[data['sn'][nodeIdx]]
+        self.nodeOrder = np.argsort(self.nodeId, kind='stable')
+
+        return self
+
+    def append(self, nodeId, fileOffset, lineLen, rank, sample, contig, lenBefore, seqLen):
+        self.nodeId.append(nodeId.encode())
+        self.fileOffset.append(fileOffset)
+        self.lineLen.append(lineLen)
+        self.rank.append(int(rank) if rank != '' else -1)
+        self.sample.append(self.sampleNames.setdefault(sample, len(self.sampleNames)))
+        self.contig.append(self.contigNames.setdefault(contig, len(self.contigNames)))
+        self.lenBefore.append(lenBefore)
+        self.seqLen.append(seqLen)
+
+    # convert the appended columns to arrays
+    def finalize(self):
+        self.nodeId = np.array(self.nodeId, dtype=bytes) if self.nodeId else np.zeros(0, dtype='S1')
+        self.fileOffset, self.lineLen = np.frombuffer(self.fileOffset, dtype=np.int64), np.frombuffer(self.lineLen, dtype=np.int64)
+        self.lenBefore, self.seqLen = np.frombuffer(self.lenBefore, dtype=np.int64), np.frombuffer(self.seqLen, dtype=np.int64)
+        self.rank = np.frombuffer(self.rank, dtype=np.int16)
+        self.sample, self.contig = np.frombuffer(self.sample, dtype=np.int32), np.frombuffer(self.contig, dtype=np.int32)
+        self.sampleNames, self.contigNames = list(self.sampleNames), list(self.contigNames)
+        self.nodeOrder = np.argsort(self.nodeId, kind='stable')
+
+        return self
+
+    # finalized parts concatenated in order, sample and contig codes merged
+    @classmethod
+    def concat(cls, parts):
+        if len(parts) == 1:
+            return parts[0]
+
+        self = cls()
+        sampleNames, contigNames = {}, {}
+        sample, contig = [], []
+        for part in parts:
+            sampleCodes = np.array([sampleNames.setdefault(name, len(sampleNames)) for name in part.sampleNames] + [0], dtype=np.int32)
+            contigCodes = np.array([contigNames.setdefault(name, len(contigNames)) for name in part.contigNames] + [0], dtype=np.int32)
+            sample.append(sampleCodes[part.sample])
+            contig.append(contigCodes[part.contig])
+        self.sampleNames, self.contigNames = list(sampleNames), list(contigNames)
+
+        self.nodeId = np.concatenate([part.nodeId for part in parts])
+        self.fileOffset = np.concatenate([part.fileOffset for part in parts])
+        self.lineLen = np.concatenate([part.lineLen for part in parts])
+        self.lenBefore = np.concatenate([part.lenBefore for part in parts])
+        self.seqLen = np.concatenate([part.seqLen for part in parts])
+        self.rank = np.concatenate([part.rank for part in parts])
+        self.sample, self.contig = np.concatenate(sample), np.concatenate(contig)
+        self.nodeOrder = np.argsort(self.nodeId, kind='stable')
+
+        return self
+
+    # node indices of the given node IDs, -1 if not found
+    def find(self, nodeIds):
+        return RGFAIndex.lookup(self.nodeId, self.nodeOrder, [nodeId.encode() for nodeId in nodeIds])
+
+    def __len__(self):
+        return len(self.nodeId)
+
+    def __contains__(self, nodeId):
+        return self.find([nodeId])[0] >= 0
+
+    def __getitem__(self, nodeId):
+        idx = self.find([nodeId])[0]
+        if idx < 0:
+            raise KeyError(nodeId)
+
+        return self.row(idx)
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        return (nodeId.decode() for nodeId in self.nodeId)
+
+    def rankStr(self, idx):
+        rank = self.rank[idx]
+        return str(rank) if rank >= 0 else ''
+
+    def row(self, idx):
+        return [int(self.fileOffset[idx]), int(self.lineLen[idx]), self.rankStr(idx), self.contigNames[self.contig[idx]],
+                int(self.lenBefore[idx]), int(self.seqLen[idx])]
+
+# compact edge store of PanGraph.parseRGFA(), iterated as (fromNodeId, fromStrand, toNodeId, toStrand)
+class RawEdgeData:
+    def __init__(self):
+        self.fromNodeId, self.toNodeId = [], []
+        self.strand = array('B')
+        self.nodeData = None
+        self.edgeFrom, self.edgeTo = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def fromIndex(cls, index, nodeIdx, nodeData):
+        self = cls()
+        edgeIdx = index.findEdgesWithin(nodeIdx)
+
+        self.nodeData = nodeData
+        self.edgeFrom = np.searchsorted(nodeIdx, index.data['edgeFrom'][edgeIdx]).astype(np.int32)
+        self.edgeTo = np.searchsorted(nodeIdx, index.data['edgeTo'][edgeIdx]).astype(np.int32)
+        self.strand = index.data['edgeStrand'][edgeIdx]
+
+        return self
+
+    def append(self, fromNodeId, fromStrand, toNodeId, toStrand):
+        self.fromNodeId.append(fromNodeId)
+        self.toNodeId.append(toNodeId)
+        self.strand.append((fromStrand == '-') | (toStrand == '-') << 1)
+
+    # append the edges of another RawEdgeData that is not finalized yet
+    def extend(self, other):
+        self.fromNodeId += other.fromNodeId
+        self.toNodeId += other.toNodeId
+        self.strand += other.strand
+
+    # resolve node IDs to indices of nodeData; edges to unknown nodes are dropped
+    def finalize(self, nodeData):
+        edgeFrom, edgeTo = nodeData.find(self.fromNodeId), nodeData.find(self.toNodeId)
+        keep = (edgeFrom >= 0) & (edgeTo >= 0)
+
+        self.nodeData = nodeData
+        self.edgeFrom, self.edgeTo = edgeFrom[keep].astype(np.int32), edgeTo[keep].astype(np.int32)
+        self.strand = np.frombuffer(self.strand, dtype=np.uint8)[keep]
+        self.fromNodeId, self.toNodeId = [], []
+
+        return self
+
+    def __len__(self):
+        return len(self.edgeFrom)
+
+    def __iter__(self):
+        nodeId = self.nodeData.nodeId
+        for fromIdx, toIdx, strand in zip(self.edgeFrom.tolist(), self.edgeTo.tolist(), self.strand.tolist()):
+            yield nodeId[fromIdx].decode(), '-' if strand & 1 else '+', nodeId[toIdx].decode(), '-' if strand & 2 else '+'
@@ -17,6 +17,7 @@ urlpatterns = [
 
     # supporting pages
     path('getdata', views.getdata, name='getdata'),
+    path('graph_tiles', views.graph_tiles, name='graph_tiles'),
     path('parse_gfa', views.parse_gfa, name='parse_gfa'),
     path('parse_vcf', views.parse_vcf, name='parse_vcf'),
     path('parse_bed', views.parse_bed, name='parse_bed'),
@@ -33,4 +34,5 @@ urlpatterns = [
 
     path('draw_overlap_gene', views.draw_overlap_gene, name='draw_overlap_gene'),
     path('check_node_id', views.check_node_id, name='check_node_id'),
+    path('bubble', views.bubble, name='bubble'),
 ]
@@ -3,6 +3,7 @@ import os
 import sys
 import shlex
 import logging
+import time
 
 from configparser import ConfigParser
 
@@ -14,27 +15,94 @@ level = "DEBUG" if DEBUG != "" else "INFO"
 logging.basicConfig( stream=sys.stderr, level=level, format=logFormat )
 #========================================================================
 
-#config = None
 script_directory = os.path.dirname(os.path.realpath(__file__))
 copied = os.path.join(script_directory, '..', "config.ini")
 
-def getVar(cfg, group, var, mustHave=False, forceRead=True):
-    #global config
-    config = None
-
-    if not config or forceRead:
-        config = ConfigParser()
-        config.read(cfg)
-
-    try:
-        return config.get(group, var)
-    except:
-        if mustHave:
-            raise
+# process-wide snapshot of the config files read by getVar(); a file is read again
+# only if its mtime or size has changed, which is checked at most every checkInterval seconds
+class ConfigSnapshot:
+    checkInterval = 1.0
+
+    def __init__(self):
+        self.configs = {}
+
+    def get(self, cfg):
+        now = time.monotonic()
+        entry = self.configs.get(cfg)
+        if entry and now - entry['checked'] < self.checkInterval:
+            return entry
+
+        try:
+            stat = os.stat(cfg)
+            fileStat = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            fileStat = None
+
+        if not entry or entry['fileStat'] != fileStat:
+            config = ConfigParser()
+            config.read(cfg)
+            entry = self.configs[cfg] = {'fileStat':fileStat, 'config':config, 'values':{}}
+        entry['checked'] = now
+
+        return entry
+
+    # drop the snapshot of cfg (all files if None) so that the next getVar() reads it again
+    def reload(self, cfg=None):
+        if cfg:
+            self.configs.pop(cfg, None)
         else:
-            logging.info(f'Config value [{group}][{var}] not found')
+            self.configs.clear()
+
+configSnapshot = ConfigSnapshot()
+
+# to be called after writing a config file
+def reloadConfig(cfg=None):
+    configSnapshot.reload(cfg)
+
+# cached in place of a value missing from the config file
+missingValue = object()
+
+def getVar(cfg, group, var, mustHave=False, forceRead=False):
+    if forceRead:
+        reloadConfig(cfg)
+
+    entry = configSnapshot.get(cfg)
+    values = entry['values']
+    if (group, var) not in values:
+        try:
+            values[(group, var)] = entry['config'].get(group, var)
+        except:
+            if mustHave:
+                raise
+            else:
+                logging.info(f'Config value [{group}][{var}] not found')
+            values[(group, var)] = missingValue
+
+    value = values[(group, var)]
+    if value is missingValue:
+        # a miss cached by an earlier read still raises the ConfigParser error when mustHave
+        if mustHave:
+            entry['config'].get(group, var)
         return None
 
+    return value
+
+# class attribute read through getVar() on every access, so that it follows config changes
+#   maxNodesDisplay = ConfigVar('nodes', 'maxNodesDisplay', int)
+class ConfigVar:
+    def __init__(self, group, var, convert=None, default=None, mustHave=False, cfg=copied):
+        self.group, self.var = group, var
+        self.convert, self.default = convert, default
+        self.mustHave = mustHave
+        self.cfg = cfg
+
+    def __get__(self, obj, objtype=None):
+        value = getVar(self.cfg, self.group, self.var, self.mustHave)
+        if value is None:
+            return self.default
+
+        return self.convert(value) if self.convert else value
+
 def rev_comp(seq):
     trans = str.maketrans('ACGTN*', 'TGCAN*')
     return seq.translate(trans)[::-1]
@@ -3,6 +3,7 @@ from django.shortcuts import render
 from django.http import JsonResponse, HttpResponse
 from rest_framework.decorators import api_view
 import json
+import hashlib
 
 from .forms import UploadForm
 
@@ -18,6 +19,7 @@ from pangraphviewer.gfa2rGFA import *
 from .models import *
 
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_GET, condition
 import datetime
 
 
@@ -27,7 +29,7 @@ from django.db import IntegrityError, transaction
 
 work_base_dir = None
 
-upload_file_ext = {'gfa':['.gfa','.rgfa'],
+upload_file_ext = {'gfa':['.gfa','.rgfa','.gfa.gz','.rgfa.gz'],
                    'vcf':['.vcf'],
                    'fasta':['.fa','.fasta','.fna'],
                    'bed':['.bed','.gtf','.gff','.gff3']}
@@ -61,7 +63,7 @@ def get_uploaded_list(request):
     file_type = request.POST.get('file_type','')
 
     work_dir = get_work_dir(request, [file_type])
-    files = sorted([name for name in listdir(work_dir) if isfile(join(work_dir, name)) and f".{name.split('.')[-1].lower()}" in upload_file_ext[file_type]])
+    files = sorted([name for name in listdir(work_dir) if isfile(join(work_dir, name)) and name.lower().endswith(tuple(upload_file_ext[file_type]))])
     status = 200
 
     return JsonResponse({'files':files,'work_dir':work_dir}, safe=False, status=status)
@@ -121,12 +123,63 @@ def getdata(request):
     status = 400 if drawGraphResult['error'] else 200
 
     cyData = graph.genCyDataFromDrawGraphResult(drawGraphResult)
+    legend = get_legend(drawGraphResult)
+
+    return JsonResponse({'error':error,'warning':warning,'cyData':cyData,'gfa':os.path.basename(gfa),'legend':legend}, safe=False, status=status)
+
+def get_legend(drawGraphResult):
     colors = {node['sample']:node['color'] for node in drawGraphResult['nodes_data'] if 'sample' in node and ',' not in node['sample']}
     shapes = {node['sv_type']:node['shape_cy'] for node in drawGraphResult['nodes_data'] if 'sv_type' in node and node['sv_type']}
     hasReversed = True if [node for node in drawGraphResult['nodes_data'] if node['id'][-1] == '*'] else False
-    legend = {'colors':colors, 'shapes':shapes, 'has_reversed': hasReversed}
 
-    return JsonResponse({'error':error,'warning':warning,'cyData':cyData,'gfa':os.path.basename(gfa),'legend':legend}, safe=False, status=status)
+    return {'colors':colors, 'shapes':shapes, 'has_reversed': hasReversed}
+
+# rGFA file of a graph_tiles request, a VCF being looked up in the rGFA file it was converted to
+def get_tile_gfa(request):
+    input_type = request.GET.get('input_type','')
+    backbone = request.GET.get('backbone','')
+    chr = request.GET.get('chr','')
+
+    if input_type == 'vcf':
+        vcf = request.GET.get('vcf','')
+        return get_work_dir(request, ['gfa'], f'{backbone}_{os.path.splitext(os.path.basename(vcf))[0]}_{chr}.gfa')
+
+    return get_work_dir(request, ['gfa'], request.GET.get('gfa',''))
+
+# a tile only changes with the rGFA file and the tile size, so browsers can revalidate it
+def graph_tiles_etag(request):
+    try:
+        gfa = get_tile_gfa(request)
+        stat = os.stat(gfa)
+    except Exception:
+        return None
+
+    keys = [gfa, stat.st_size, stat.st_mtime_ns, PanGraph.tileSize] + [request.GET.get(key,'') for key in ['backbone','chr','tile']]
+    return hashlib.sha1(json.dumps(keys).encode()).hexdigest()
+
+# nodes and edges of one tile of a backbone contig (see PanGraph.drawGraphTile()), tile k
+# covering [k*tile_size+1, (k+1)*tile_size]
+@login_required
+@require_GET
+@condition(etag_func=graph_tiles_etag)
+def graph_tiles(request):
+    input_type = request.GET.get('input_type','')
+    backbone = request.GET.get('backbone','')
+    chr = request.GET.get('chr','')
+    tile = int(request.GET.get('tile',0)) if request.GET.get('tile','').isdigit() else None
+
+    if not backbone or not chr or tile is None or not request.GET.get('vcf' if input_type == 'vcf' else 'gfa'):
+        return JsonResponse({'error':True, 'msg': 'missing value'}, safe=False, status=400)
+
+    gfa = get_tile_gfa(request)
+    if not os.path.isfile(gfa):
+        return JsonResponse({'error':True, 'msg': 'please plot the VCF file first' if input_type == 'vcf' else 'file not found'}, safe=False, status=400)
+
+    graph = PanGraph(gfa, outdir=get_work_dir(request), parseRGFA=False)
+    drawGraphResult = graph.drawGraphTile(backbone, None, chr, tile)
+
+    return JsonResponse({'error':False, 'tile':tile, 'tile_size':graph.tileSize, 'start':drawGraphResult['start'], 'end':drawGraphResult['end'],
+                         'cyData':drawGraphResult['cy_data'], 'legend':get_legend(drawGraphResult)}, safe=False, status=200)
 
 @login_required
 def parse_gfa(request):
@@ -259,6 +312,7 @@ def graph(request):
         'start': start,
         'end': end,
         'plot': plot,
+        'tile_size': PanGraph.tileSize,
         'upload_file_ext': {type:','.join(upload_file_ext[type]) for type in upload_file_ext}
     }
 
@@ -500,6 +554,17 @@ def manage_file(request):
         except:
             status = 400
 
+        # remove the rGFA index and zoom levels as well, with their loaded copies
+        if file_type == 'gfa':
+            for sidecar in (RGFAIndex, RGFAPyramid):
+                sidecarFile = f'{file_path}{sidecar.ext}'
+                sidecar.cache.pop(sidecarFile, None)
+                if os.path.isfile(sidecarFile):
+                    try:
+                        os.remove(sidecarFile)
+                    except OSError:
+                        pass
+
     return JsonResponse(results, safe=False, status=status)
 
 def draw_overlap_gene(request):
@@ -524,6 +589,38 @@ def draw_overlap_gene(request):
 
     return response
 
+@login_required
+def bubble(request):
+    input_type = request.POST.get('input_type','')
+    gfa = request.POST.get('gfa','')
+    vcf = request.POST.get('vcf','')
+    backbone = request.POST.get('backbone','')
+    chr = request.POST.get('chr','')
+    action = request.POST.get('action','next')
+    pos = int(request.POST.get('pos',0)) if request.POST.get('pos') else 0
+    start = int(request.POST.get('start',0)) if request.POST.get('start') else None
+    end = int(request.POST.get('end',0)) if request.POST.get('end') else None
+
+    if not backbone or not chr or not (vcf if input_type == 'vcf' else gfa):
+        return JsonResponse({'error':True, 'msg': 'missing value'}, safe=False, status=400)
+
+    # a VCF is looked up in the rGFA file it was converted to when plotted
+    if input_type == 'vcf':
+        prefix = f'{backbone}_{os.path.splitext(os.path.basename(vcf))[0]}_{chr}'
+        gfa = get_work_dir(request, ['gfa'], f'{prefix}.gfa')
+        if not os.path.isfile(gfa):
+            return JsonResponse({'error':True, 'msg': 'please plot the VCF file first'}, safe=False, status=400)
+    else:
+        gfa = get_work_dir(request, ['gfa'], gfa)
+
+    graph = PanGraph(gfa, outdir=get_work_dir(request), parseRGFA=False)
+    if action == 'list':
+        return JsonResponse({'error':False, 'bubbles':graph.listBubbles(backbone, chr, start, end)}, safe=False, status=200)
+
+    bubble = graph.nextBubble(backbone, chr, pos, step=-1 if action == 'prev' else 1)
+
+    return JsonResponse({'error':False, 'bubble':bubble}, safe=False, status=200)
+
 def check_node_id(request):
     start_time = time.time()
 
@@ -9,9 +9,22 @@ const parse_gfa_url = document.getElementById('parse_gfa_url').value
 const parse_vcf_url = document.getElementById('parse_vcf_url').value
 const parse_bed_url = document.getElementById('parse_bed_url').value
 const getdata_url = document.getElementById('getdata_url').value
+const bubble_url = document.getElementById('bubble_url').value
+const graph_tiles_url = document.getElementById('graph_tiles_url').value
+const tile_size = parseInt(document.getElementById('tile_size').value)
+// bases shown on either side of an SV when jumping to it
+const bubble_flank = 100;
 var sample_list = '';
+// start of the SV last jumped to, null once the region is changed by hand
+var bubble_pos = null;
 var gene_info;
 var backbone_info;
+// browsing by tiles: nodes are drawn at their position on the backbone, browse_bp_per_px bases
+// per pixel, and lane (see PanGraph.drawGraphTile()) browse_lane_height pixels apart
+const browse_bp_per_px = 5;
+const browse_lane_height = 40;
+// tiles loaded for one view at most, around its middle
+const browse_max_tiles = 10;
 
 function gen_graph(chr, start, end, tabHeader, by_node_id=false) {
     var url = getdata_url;
@@ -88,6 +101,63 @@ function gen_graph(chr, start, end, tabHeader, by_node_id=false) {
     });
 }
 
+// plot the next or previous SV site of the selected chr, looked up in the rGFA index
+function goto_bubble(action) {
+    var chr = document.getElementById('chr').value;
+    var pos = bubble_pos;
+    if (pos === null) pos = action == 'next' ? $('#start').val() : ($('#end').val() || $('#start').val());
+
+    data = {'csrfmiddlewaretoken': csrf[0].value,'input_type':document.getElementById('input_type').value,
+            'gfa':document.getElementById('gfa_path').value,'vcf':document.getElementById('vcf_path').value,
+            'backbone':document.getElementById('backbone').value,'chr':chr,'pos':pos,'action':action}
+
+    $.ajax({
+        type:'POST',
+        url: bubble_url,
+        data: data,
+        dataType: 'json',
+        success: function(result) {
+            bubble = result.bubble;
+            if (!bubble) {
+                update_alert_box(`No ${action == 'next' ? 'next' : 'previous'} SV on ${chr}`, 'alert-info')
+                return;
+            }
+
+            bubble_pos = bubble.start;
+            $('#start').val(Math.max(1, bubble.start - bubble_flank));
+            $('#end').val(bubble.end + bubble_flank);
+            gen_graph(null, null, null, `${chr}: ${bubble.type} ${bubble.start} - ${bubble.end}`);
+        },
+        error: function(result) {
+            obj = result.responseJSON;
+            str = 'SV lookup failed';
+            if (obj && 'msg' in obj) str += ': '+ obj.msg;
+            update_alert_box(str, 'alert-danger')
+        }
+    });
+}
+
+$('#start, #end').on('input', function() {
+    bubble_pos = null;
+});
+
+// browse the selected chr from start, the graph being loaded tile by tile (see graph_tiles)
+function browse_graph() {
+    var input_type = document.getElementById('input_type').value;
+    var gfa = document.getElementById('gfa_path').value;
+    var vcf = document.getElementById('vcf_path').value;
+    var backbone = document.getElementById('backbone').value;
+    var chr = document.getElementById('chr').value;
+    var start = parseInt($('#start').val()) || 1;
+
+    // a VCF is browsed in the rGFA file it was converted to when plotted
+    if (input_type == 'vcf') gfa = `${backbone}_${vcf.replace(/\.[^.]*$/, '')}_${chr}.gfa`;
+
+    tiles = {'input_type':input_type,'gfa':gfa,'vcf':vcf,'backbone':backbone,'chr':chr,'start':start};
+    legend = {'colors':{}, 'shapes':{}, 'has_reversed':false};
+    addOutputTab(`${chr}: from ${start}`, null, gfa, legend, null, tiles);
+}
+
 $( "#input-form" ).submit(function( event ) {
     event.preventDefault();
 
@@ -160,6 +230,9 @@ $('#parse-btn').click(function() {
             $('#chr').prop('disabled', true);
             $('#start').prop('disabled', true);
             $('#end').prop('disabled', true);
+            $('#prev-bubble-btn').prop('disabled', true);
+            $('#next-bubble-btn').prop('disabled', true);
+            $('#browse-btn').prop('disabled', true);
 
             // disable specific controls
             btn = ['extract_node_view_btn',
@@ -385,6 +458,7 @@ function backbone_onchange() {
     $("#chr").prop('disabled', false);
     $('#start').val('');
     $('#end').val('');
+    bubble_pos = null;
 }
 
 function chr_onchange() {
@@ -392,6 +466,10 @@ function chr_onchange() {
     $("#start").prop('disabled', false);
     $('#end').val('');
     $("#end").prop('disabled', false);
+    $("#prev-bubble-btn").prop('disabled', false);
+    $("#next-bubble-btn").prop('disabled', false);
+    $("#browse-btn").prop('disabled', false);
+    bubble_pos = null;
 }
 
 function download_sequence(ids, gfa_path) {
@@ -410,22 +488,22 @@ function view_sequence(ids, gfa_path) {
     form.appendTo('body').submit().remove();
 }
 
-function drawGraph2(loadStatusId, cyId, cyData) {
+function makePopper(ele) {
+    let ref = ele.popperRef();
 
-    function makePopper(ele) {
-        let ref = ele.popperRef();
+    ele.tippy = tippy(ref, {
+        content: () => {
+            let content = document.createElement('div');
 
-        ele.tippy = tippy(ref, {
-            content: () => {
-                let content = document.createElement('div');
+            content.innerHTML = ele.data('title');
 
-                content.innerHTML = ele.data('title');
+            return content;
+        },
+        trigger: 'manual'
+    });
+}
 
-                return content;
-            },
-            trigger: 'manual'
-        });
-    }
+function drawGraph2(loadStatusId, cyId, cyData, layoutName='dagre') {
 
     var cy = window.cy = cytoscape({
         container: document.getElementById(cyId),
@@ -433,7 +511,7 @@ function drawGraph2(loadStatusId, cyId, cyData) {
         layout: {
             //name: 'euler',
             //name: 'fcose',
-            name: 'dagre', rankDir: 'LR',
+            name: layoutName, rankDir: 'LR',
             randomize: true,
             animate: false,
 
@@ -584,6 +662,8 @@ function drawGraph2(loadStatusId, cyId, cyData) {
     cy.nodes().unbind('mouseout');
     cy.nodes().bind('mouseout', (event) => event.target.tippy.hide());
 
+    if (cy.nodes().empty()) return cy;
+
     var minX=null, minY=null, maxX=null, maxY=null;
     cy.nodes().forEach(function(ele) {
         var x = ele.position().x;
@@ -610,6 +690,95 @@ function drawGraph2(loadStatusId, cyId, cyData) {
             {group:'edges', data:{ id:'border3', weight:edge_weight, source:'nodeC', target:'nodeD', color:color, arrow:'none', sourceLabel:'', targetLabel:''}},
             {group:'edges', data:{ id:'border4', weight:edge_weight, source:'nodeD', target:'nodeA', color:color, arrow:'none', sourceLabel:'', targetLabel:''}},
     ]);
+
+    return cy;
+}
+
+// an empty graph filled in with the tiles coming into view; the edges of a tile leading to
+// nodes of tiles not loaded yet are added with these tiles
+function drawTiledGraph(loadStatusId, cyId, tiles, id) {
+    var cy = drawGraph2(loadStatusId, cyId, [], 'preset');
+    var requested = {};
+    var pending = [];
+    var legend = {'colors':{}, 'shapes':{}, 'has_reversed':false};
+    var timer = null;
+
+    function load_tile(tile) {
+        requested[tile] = true;
+
+        data = {'input_type':tiles.input_type,'gfa':tiles.gfa,'vcf':tiles.vcf,'backbone':tiles.backbone,'chr':tiles.chr,'tile':tile};
+
+        $.ajax({
+            type:'GET',
+            url: graph_tiles_url,
+            data: data,
+            dataType: 'json',
+            success: function(result) {
+                var nodes = [];
+                var edges = pending;
+                $.each(result.cyData, function(index, ele) {
+                    if ('source' in ele.data) edges.push(ele);
+                    else nodes.push({group:'nodes', data:ele.data, position:{x:ele.data.pos / browse_bp_per_px, y:ele.data.lane * browse_lane_height}});
+                });
+                var added = cy.add(nodes);
+
+                pending = [];
+                var ready = [];
+                $.each(edges, function(index, ele) {
+                    if (cy.getElementById(ele.data.source).empty() || cy.getElementById(ele.data.target).empty()) pending.push(ele);
+                    else ready.push({group:'edges', data:ele.data});
+                });
+                added = added.union(cy.add(ready));
+
+                added.forEach(function(ele) {
+                    makePopper(ele);
+                });
+                added.nodes().bind('mouseover', (event) => event.target.tippy.show());
+                added.nodes().bind('mouseout', (event) => event.target.tippy.hide());
+
+                $.extend(legend.colors, result.legend.colors);
+                $.extend(legend.shapes, result.legend.shapes);
+                legend.has_reversed = legend.has_reversed || result.legend.has_reversed;
+                $('#colorTable' + id).empty();
+                $('#shapeTable' + id).empty();
+                add_legend(id, legend);
+            },
+            error: function(result) {
+                delete requested[tile];
+                obj = result.responseJSON;
+                str = 'Loading the graph failed';
+                if (obj && 'msg' in obj) str += ': '+ obj.msg;
+                update_alert_box(str, 'alert-danger')
+            }
+        });
+    }
+
+    // tiles of the bases in view, at most browse_max_tiles
+    function load_view() {
+        var extent = cy.extent();
+        var first = Math.max(0, Math.floor((extent.x1 * browse_bp_per_px - 1) / tile_size));
+        var last = Math.max(0, Math.floor((extent.x2 * browse_bp_per_px - 1) / tile_size));
+        if (last - first + 1 > browse_max_tiles) {
+            first = Math.max(0, Math.floor((first + last + 1 - browse_max_tiles) / 2));
+            last = first + browse_max_tiles - 1;
+        }
+
+        for (var tile = first; tile <= last; tile++) {
+            if (!(tile in requested)) load_tile(tile);
+        }
+    }
+
+    cy.on('viewport', function() {
+        clearTimeout(timer);
+        timer = setTimeout(load_view, 200);
+    });
+
+    $('#' + loadStatusId).val(1);
+    $('#loading').hide();
+
+    cy.zoom(1);
+    cy.pan({x:cy.width() / 10 - tiles.start / browse_bp_per_px, y:cy.height() / 3});
+    load_view();
 }
 
 var gId=1;
@@ -618,7 +787,7 @@ function getId() {
     return gId++;
 }
 
-function addOutputTab(title, cyData, gfa, legend, tabHeader) {
+function addOutputTab(title, cyData, gfa, legend, tabHeader, tiles=null) {
     id = getId();
     tabId = 'tab' + id;
     tabContentId = 'tabContent' + id;
@@ -664,7 +833,8 @@ function addOutputTab(title, cyData, gfa, legend, tabHeader) {
        if (loadStatus == -1) {
           $('#loading').show();
           $('#' + loadStatusId).val(0);
-          drawGraph2(loadStatusId, cyId, cyData);
+          if (tiles) drawTiledGraph(loadStatusId, cyId, tiles, id);
+          else drawGraph2(loadStatusId, cyId, cyData, cyData.length > 0 && 'position' in cyData[0] ? 'preset' : 'dagre');
        } else if (loadStatus == 0) {
           $('#loading').show();
        } else {
@@ -826,7 +996,7 @@ function control_plot_input(file_type, action) {
         });
 
         //input_ids = ['backbone','chr','start','end','plot-btn']
-        input_ids = ['backbone','chr','start','end','plot-btn',
+        input_ids = ['backbone','chr','start','end','plot-btn','browse-btn','prev-bubble-btn','next-bubble-btn',
                      'extract_node_node_id','extract_node_checked_node_id','extract_node_view_btn','extract_node_plot_btn','extract_node_download_btn',
                      'bed_path','gene','parse-bed-btn','plot-gene-btn']
         $.each(input_ids, function(index, value) {